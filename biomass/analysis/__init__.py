@@ -1,3 +1,5 @@
+from .global_sensitivity import GlobalSensitivity, MorrisIndices, SobolIndices
 from .initial_condition import InitialConditionSensitivity
 from .parameter import ParameterSensitivity
 from .reaction import ReactionSensitivity
+from .util import TrajectoryStore, axis_aware
@@ -0,0 +1,365 @@
+import json
+import os
+import shutil
+import sys
+import warnings
+from dataclasses import dataclass
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from scipy.stats import qmc
+
+from ..dynamics.ensemble import simulate_batch
+from ..model_object import ModelObject
+from .util import SignalingMetric, SignalingMetricCache, _map_tasks
+
+
+class SobolIndices(NamedTuple):
+    """
+    Variance-based sensitivity indices.
+
+    Attributes
+    ----------
+    names : list of str
+        Parameters and species varied in the analysis.
+    first_order : numpy array
+        First-order indices with shape (len(names), len(observables), len(conditions)).
+    first_order_ci : numpy array
+        Bootstrap confidence intervals of ``first_order``, (lower, upper) in the first axis.
+    total : numpy array
+        Total-effect indices with shape (len(names), len(observables), len(conditions)).
+    total_ci : numpy array
+        Bootstrap confidence intervals of ``total``, (lower, upper) in the first axis.
+    """
+
+    names: List[str]
+    first_order: np.ndarray
+    first_order_ci: np.ndarray
+    total: np.ndarray
+    total_ci: np.ndarray
+
+
+class MorrisIndices(NamedTuple):
+    """
+    Statistics of elementary effects.
+
+    Attributes
+    ----------
+    names : list of str
+        Parameters and species varied in the analysis.
+    mu : numpy array
+        Mean of elementary effects with shape (len(names), len(observables), len(conditions)).
+    mu_star : numpy array
+        Mean of absolute elementary effects.
+    mu_star_ci : numpy array
+        Bootstrap confidence intervals of ``mu_star``, (lower, upper) in the first axis.
+    sigma : numpy array
+        Standard deviation of elementary effects.
+    """
+
+    names: List[str]
+    mu: np.ndarray
+    mu_star: np.ndarray
+    mu_star_ci: np.ndarray
+    sigma: np.ndarray
+
+
+def _sobol_indices(
+    f_A: np.ndarray, f_B: np.ndarray, f_AB: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First-order (Saltelli, 2010) and total-effect (Jansen, 1999) estimators,
+    where ``f_AB[i]`` is evaluated on A with the i-th column taken from B.
+    Samples with any failed simulation are excluded.
+    """
+    valid = np.isfinite(f_A) & np.isfinite(f_B) & np.all(np.isfinite(f_AB), axis=0)
+    f_A = np.where(valid, f_A, np.nan)
+    f_B = np.where(valid, f_B, np.nan)
+    f_AB = np.where(valid, f_AB, np.nan)
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        variance = np.nanvar(np.concatenate([f_A, f_B]), axis=0)
+        first_order = np.nanmean(f_B * (f_AB - f_A), axis=1) / variance
+        total = 0.5 * np.nanmean((f_A - f_AB) ** 2, axis=1) / variance
+    return first_order, total
+
+
+def _morris_indices(ee: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mean, mean of absolute values and standard deviation of elementary effects
+    with shape (n_trajectories, len(names), ...).
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return (
+            np.nanmean(ee, axis=0),
+            np.nanmean(np.abs(ee), axis=0),
+            np.nanstd(ee, axis=0, ddof=1),
+        )
+
+
+def _bootstrap_ci(
+    statistic: Callable[[np.ndarray], Tuple[np.ndarray, ...]],
+    n: int,
+    n_bootstrap: int,
+    confidence_level: float,
+    rng: np.random.Generator,
+) -> List[np.ndarray]:
+    """
+    Percentile confidence intervals of ``statistic`` evaluated on ``n_bootstrap``
+    resamples of ``n`` indices with replacement.
+    """
+    replicates = [statistic(rng.integers(0, n, n)) for _ in range(n_bootstrap)]
+    alpha = 0.5 * (1.0 - confidence_level)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return [
+            np.nanquantile(np.stack(values), [alpha, 1.0 - alpha], axis=0)
+            for values in zip(*replicates)
+        ]
+
+
+@dataclass
+class GlobalSensitivity(SignalingMetric):
+    """Global sensitivity over the search region of parameters and initial values"""
+
+    model: ModelObject
+    create_metrics: Optional[Dict[str, Callable[[np.ndarray], Union[int, float]]]]
+
+    def __post_init__(self) -> None:
+        self._path: Callable[[str], str] = lambda method: os.path.join(
+            self.model.path,
+            "sensitivity_coefficients",
+            "global",
+            f"{method}",
+        )
+        if self.create_metrics is not None:
+            for name, function in self.create_metrics.items():
+                self.quantification[name] = function
+
+    @property
+    def names(self) -> List[str]:
+        return [self.model.parameters[i] for i in self.model.problem.idx_params] + [
+            self.model.species[i] for i in self.model.problem.idx_initials
+        ]
+
+    def _sobol_design(self, n_samples: int, sampler: str, rng: np.random.Generator) -> np.ndarray:
+        """
+        Rows of A, B and A with the i-th column taken from B for each i,
+        with shape ((len(names) + 2) * n_samples, len(names)).
+        """
+        d = len(self.model.search_space)
+        if sampler == "sobol":
+            engine = qmc.Sobol(2 * d, seed=rng)
+        elif sampler == "lhs":
+            engine = qmc.LatinHypercube(2 * d, seed=rng)
+        else:
+            raise ValueError("Available samplers are: 'sobol', 'lhs'")
+        with warnings.catch_warnings():
+            # The balance properties of Sobol' points are lost unless n_samples is 2**m
+            warnings.simplefilter("ignore", UserWarning)
+            samples = engine.random(n_samples)
+        A, B = samples[:, :d], samples[:, d:]
+        AB = np.repeat(A[np.newaxis], d, axis=0)
+        AB[np.arange(d), :, np.arange(d)] = B.T
+        return np.concatenate([A, B, AB.reshape(-1, d)])
+
+    def _morris_design(
+        self, n_trajectories: int, n_levels: int, rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Trajectories changing one factor at a time by ``n_levels / (2 * (n_levels - 1))``
+        on a grid of ``n_levels`` levels, with shape ((len(names) + 1) * n_trajectories,
+        len(names)).
+        """
+        if n_levels < 2 or n_levels % 2 != 0:
+            raise ValueError("n_levels must be an even number.")
+        d = len(self.model.search_space)
+        delta = n_levels / (2 * (n_levels - 1))
+        design = np.empty((n_trajectories, d + 1, d))
+        for r in range(n_trajectories):
+            genes = rng.integers(0, n_levels, d) / (n_levels - 1)
+            design[r, 0] = genes
+            for step, i in enumerate(rng.permutation(d)):
+                genes = genes.copy()
+                genes[i] += delta if genes[i] + delta <= 1.0 + 1e-12 else -delta
+                design[r, step + 1] = np.clip(genes, 0.0, 1.0)
+        return design.reshape(-1, d)
+
+    def _load_design(
+        self,
+        method: str,
+        settings: dict,
+        overwrite: bool,
+        rng: np.random.Generator,
+    ) -> np.ndarray:
+        """
+        Load the design of ``method`` saved with the same ``settings``, or create it.
+        """
+        path = self._path(method)
+        if overwrite and os.path.isdir(path):
+            shutil.rmtree(path)
+        settings = dict(
+            settings,
+            names=self.names,
+            lower=self.model.search_space.lower.tolist(),
+            upper=self.model.search_space.upper.tolist(),
+            context=SignalingMetricCache._digest(
+                list(self.model.observables),
+                list(self.model.problem.conditions),
+                np.asarray(self.model.problem.t, dtype=float),
+            ),
+        )
+        if os.path.isfile(os.path.join(path, "design.json")):
+            with open(os.path.join(path, "design.json"), encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved != settings:
+                raise ValueError(
+                    f"{path} was created with different settings or a different model. "
+                    "Set overwrite=True to start a new analysis."
+                )
+            return np.load(os.path.join(path, "design.npy"))
+        if method == "sobol":
+            design = self._sobol_design(settings["n_samples"], settings["sampler"], rng)
+        else:
+            design = self._morris_design(settings["n_samples"], settings["n_levels"], rng)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "design.npy"), design)
+        # design.json is written last, marking the design as complete
+        tmp_path = os.path.join(path, f"design.json.{os.getpid()}")
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump(settings, f)
+        os.replace(tmp_path, os.path.join(path, "design.json"))
+        return design
+
+    def _run_task(self, task: tuple) -> Tuple[np.ndarray, np.ndarray]:
+        metric, rows, genes = task
+        X, Y0 = [], []
+        for indiv in self.model.gene2val(genes):
+            x, y0 = self.model.problem.update(indiv)
+            X.append(x)
+            Y0.append(y0)
+        simulations, success = simulate_batch(self.model.problem, X, Y0)
+        return rows, self._quantify(metric, simulations, success)
+
+    def _evaluate(
+        self,
+        method: str,
+        metric: str,
+        design: np.ndarray,
+        chunk_size: int,
+        show_progress: bool,
+        n_proc: int,
+    ) -> np.ndarray:
+        """
+        Compute the signaling metric of every row of ``design``, streaming results
+        to ``signaling_metric/{metric}.npy``. Rows already computed are skipped.
+        """
+        path = os.path.join(self._path(method), "signaling_metric")
+        shape = (len(design), len(self.model.observables), len(self.model.problem.conditions))
+        if os.path.isfile(os.path.join(path, f"{metric}.done.npy")):
+            values = np.load(os.path.join(path, f"{metric}.npy"), mmap_mode="r+")
+            done = np.load(os.path.join(path, f"{metric}.done.npy"), mmap_mode="r+")
+        else:
+            os.makedirs(path, exist_ok=True)
+            values = np.lib.format.open_memmap(
+                os.path.join(path, f"{metric}.npy"), mode="w+", dtype=float, shape=shape
+            )
+            values[:] = np.nan
+            values.flush()
+            done = np.lib.format.open_memmap(
+                os.path.join(path, f"{metric}.done.npy"), mode="w+", dtype=bool, shape=shape[:1]
+            )
+        rows = np.flatnonzero(~done)
+        tasks = [
+            (metric, rows[start : start + chunk_size], design[rows[start : start + chunk_size]])
+            for start in range(0, len(rows), chunk_size)
+        ]
+        n_done = len(design) - len(rows)
+        for chunk, chunk_values in _map_tasks(self, tasks, n_proc):
+            values[chunk] = chunk_values
+            values.flush()
+            # Rows are marked after their values are written
+            done[chunk] = True
+            done.flush()
+            n_done += len(chunk)
+            if show_progress:
+                sys.stdout.write(f"\r{n_done:d} / {len(design):d}")
+        return np.array(values)
+
+    def analyze(
+        self,
+        *,
+        method: str,
+        metric: str,
+        n_samples: int,
+        sampler: str,
+        n_levels: int,
+        n_bootstrap: int,
+        confidence_level: float,
+        seed: Optional[int],
+        chunk_size: int,
+        show_progress: bool,
+        overwrite: bool,
+        n_proc: int = 1,
+    ) -> Union[SobolIndices, MorrisIndices]:
+        """
+        Perform global sensitivity analysis.
+        """
+        if method not in ["sobol", "morris"]:
+            raise ValueError("Available methods are: 'sobol', 'morris'")
+        if metric not in self.quantification:
+            raise ValueError(
+                "Available metrics are: '{}'".format("', '".join(self.quantification))
+            )
+        if not 0.0 < confidence_level < 1.0:
+            raise ValueError("confidence_level must be in (0, 1).")
+        # Bootstrap samples do not depend on whether the design is created or loaded
+        design_rng, bootstrap_rng = [
+            np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2)
+        ]
+        settings = (
+            dict(method=method, n_samples=n_samples, sampler=sampler, seed=seed)
+            if method == "sobol"
+            else dict(method=method, n_samples=n_samples, n_levels=n_levels, seed=seed)
+        )
+        design = self._load_design(method, settings, overwrite, design_rng)
+        values = self._evaluate(method, metric, design, chunk_size, show_progress, n_proc)
+        d = len(self.names)
+        if method == "sobol":
+            f_A, f_B = values[:n_samples], values[n_samples : 2 * n_samples]
+            f_AB = values[2 * n_samples :].reshape((d, n_samples, *values.shape[1:]))
+            first_order, total = _sobol_indices(f_A, f_B, f_AB)
+            first_order_ci, total_ci = _bootstrap_ci(
+                lambda idx: _sobol_indices(f_A[idx], f_B[idx], f_AB[:, idx]),
+                n_samples,
+                n_bootstrap,
+                confidence_level,
+                bootstrap_rng,
+            )
+            indices = SobolIndices(self.names, first_order, first_order_ci, total, total_ci)
+        else:
+            genes = design.reshape((n_samples, d + 1, d))
+            steps = np.diff(genes, axis=1)
+            f = values.reshape((n_samples, d + 1, *values.shape[1:]))
+            ee = np.empty((n_samples, d, *values.shape[1:]))
+            for r in range(n_samples):
+                factors = np.argmax(np.abs(steps[r]), axis=1)
+                ee[r, factors] = (
+                    np.diff(f[r], axis=0)
+                    / steps[r, np.arange(d), factors][:, np.newaxis, np.newaxis]
+                )
+            mu, mu_star, sigma = _morris_indices(ee)
+            (mu_star_ci,) = _bootstrap_ci(
+                lambda idx: _morris_indices(ee[idx])[1:2],
+                n_samples,
+                n_bootstrap,
+                confidence_level,
+                bootstrap_rng,
+            )
+            indices = MorrisIndices(self.names, mu, mu_star, mu_star_ci, sigma)
+        np.savez(
+            os.path.join(self._path(method), f"{metric}.npz"),
+            **{key: np.asarray(value) for key, value in indices._asdict().items()},
+        )
+        return indices
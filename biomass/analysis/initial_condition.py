@@ -1,15 +1,15 @@
 import os
-import sys
 from dataclasses import dataclass
-from typing import Callable, Dict, Final, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 
+from ..dynamics.ensemble import simulate_batch
 from ..model_object import ModelObject
 from ..plotting import SensitivityOptions
-from .util import SignalingMetric, dlnyi_dlnxj, remove_nan
+from .util import RATE, SignalingMetric, remove_nan
 
 
 @dataclass
@@ -49,105 +49,18 @@ class InitialConditionSensitivity(SignalingMetric):
 
         return nonzero_indices
 
-    def _calc_sensitivity_coefficients(
+    def _simulate(
         self,
-        metric: str,
-        nonzero_indices: List[int],
-        show_progress: bool,
-    ) -> np.ndarray:
-        """Calculating Sensitivity Coefficients
-        Parameters
-        ----------
-        metric : str
-            The signaling metric used for sensitivity analysis.
-        nonzero_indices : list of int
-            List of species index with nonzero initial conditions.
-        Returns
-        -------
-        sensitivity_coefficients : numpy array
-        """
-
-        rate: Final[float] = 1.01  # 1% change
-        n_file = self.model.get_executable()
-
-        signaling_metric = np.full(
-            (
-                len(n_file),
-                len(nonzero_indices) + 1,
-                len(self.model.observables),
-                len(self.model.problem.conditions),
-            ),
-            np.nan,
-        )
-        for i, nth_paramset in enumerate(n_file):
-            optimized = self.model.load_param(nth_paramset)
-            for j, idx in enumerate(nonzero_indices):
-                y0 = optimized.initials[:]
-                y0[idx] = optimized.initials[idx] * rate
-                if self.model.problem.simulate(optimized.params, y0) is None:
-                    for k, _ in enumerate(self.model.observables):
-                        for l, _ in enumerate(self.model.problem.conditions):
-                            signaling_metric[i, j, k, l] = self.quantification[metric](
-                                self.model.problem.simulations[k, l]
-                            )
-                if show_progress:
-                    sys.stdout.write(
-                        "\r{:d} / {:d}".format(
-                            i * len(nonzero_indices) + j + 1,
-                            len(n_file) * len(nonzero_indices),
-                        )
-                    )
-            # Signaling metric without perturbation (j=-1)
-            y0 = optimized.initials[:]
-            if self.model.problem.simulate(optimized.params, y0) is None:
-                for k, _ in enumerate(self.model.observables):
-                    for l, _ in enumerate(self.model.problem.conditions):
-                        signaling_metric[i, -1, k, l] = self.quantification[metric](
-                            self.model.problem.simulations[k, l]
-                        )
-        sensitivity_coefficients = dlnyi_dlnxj(
-            signaling_metric,
-            len(n_file),
-            len(nonzero_indices),
-            len(self.model.observables),
-            len(self.model.problem.conditions),
-            rate,
-        )
-
-        return sensitivity_coefficients
-
-    def _load_sc(
-        self,
-        metric: str,
-        nonzero_indices: List[int],
-        show_progress: bool,
-    ) -> np.ndarray:
-        """
-        Load (or calculate) sensitivity coefficients.
-        """
-        if not os.path.isfile(self._coefficients(metric)):
-            os.makedirs(
-                os.path.join(
-                    self.model.path,
-                    "sensitivity_coefficients",
-                    "initial_condition",
-                ),
-                exist_ok=True,
-            )
-            sensitivity_coefficients = self._calc_sensitivity_coefficients(
-                metric, nonzero_indices, show_progress
-            )
-            np.save(self._coefficients(metric), sensitivity_coefficients)
-        else:
-            sensitivity_coefficients = np.load(self._coefficients(metric))
-            if len(nonzero_indices) != sensitivity_coefficients.shape[1]:
-                # User changed options['excluded_initials'] after the last trial
-                sensitivity_coefficients = self._calc_sensitivity_coefficients(
-                    metric, nonzero_indices, show_progress
-                )
-                np.save(self._coefficients(metric), sensitivity_coefficients)
-
-        return sensitivity_coefficients
+        nth_paramset: int,
+        indices: List[int],
+        positions: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        optimized = self.model.load_param(nth_paramset)
+        # One species is perturbed in each row, except for j == len(indices).
+        perturbed = np.flatnonzero(positions < len(indices))
+        Y0 = np.tile(np.asarray(optimized.initials, dtype=float), (len(positions), 1))
+        Y0[perturbed, np.asarray(indices)[positions[perturbed]]] *= RATE
+        return simulate_batch(self.model.problem, np.tile(optimized.params, (len(Y0), 1)), Y0)
 
     def _barplot_sensitivity(
         self,
@@ -256,14 +169,20 @@ class InitialConditionSensitivity(SignalingMetric):
         clustermap_kws: dict,
         cbar_ax_tick_params: dict,
         options: dict,
+        n_proc: int = 1,
     ) -> None:
         """
         Perform sensitivity analysis.
         """
-        if options["overwrite"] and os.path.isfile(self._coefficients(metric)):
-            os.remove(self._coefficients(metric))
         nonzero_indices = self._get_nonzero_indices(options["excluded_initials"])
-        sensitivity_coefficients = self._load_sc(metric, nonzero_indices, show_progress)
+        sensitivity_coefficients = self._sensitivity_coefficients(
+            metric,
+            nonzero_indices,
+            show_progress,
+            n_proc,
+            options["overwrite"],
+            options["trajectories"],
+        )
         if style == "barplot":
             self._barplot_sensitivity(
                 metric,
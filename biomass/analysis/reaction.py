@@ -1,15 +1,15 @@
 import os
-import sys
 from dataclasses import dataclass
-from typing import Callable, Dict, Final, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 
+from ..dynamics.perturbation import FluxScaling
 from ..model_object import ModelObject
 from ..plotting import SensitivityOptions
-from .util import SignalingMetric, dlnyi_dlnxj, remove_nan
+from .util import RATE, SignalingMetric, remove_nan
 
 
 @dataclass
@@ -38,97 +38,39 @@ class ReactionSensitivity(SignalingMetric):
             for name, function in self.create_metrics.items():
                 self.quantification[name] = function
 
-    def _calc_sensitivity_coefficients(
-        self, metric: str, reaction_indices: List[int], show_progress: bool
-    ) -> np.ndarray:
-        """Calculating Sensitivity Coefficients
-        Parameters
-        ----------
-        metric : str
-            The signaling metric used for sensitivity analysis.
-        reaction_indices : list of int
-            List of reaction indices.
-        Returns
-        -------
-        sensitivity_coefficients : numpy array
-        """
-        rate: Final[float] = 1.01  # 1% change
-        n_file = self.model.get_executable()
-        signaling_metric = np.full(
+    def _simulate(
+        self,
+        nth_paramset: int,
+        indices: List[int],
+        positions: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        optimized = self.model.load_param(nth_paramset)
+        simulations = np.full(
             (
-                len(n_file),
-                len(reaction_indices) + 1,
+                len(positions),
                 len(self.model.observables),
                 len(self.model.problem.conditions),
+                len(self.model.problem.t),
             ),
             np.nan,
         )
-        for i, nth_paramset in enumerate(n_file):
-            optimized = self.model.load_param(nth_paramset)
-            for j, rxn_idx in enumerate(reaction_indices):
-                perturbation: Dict[int, float] = {}
-                for idx in reaction_indices:
-                    perturbation[idx] = 1.0
-                perturbation[rxn_idx] = rate
-                if (
-                    self.model.problem.simulate(optimized.params, optimized.initials, perturbation)
-                    is None
-                ):
-                    for k, _ in enumerate(self.model.observables):
-                        for l, _ in enumerate(self.model.problem.conditions):
-                            signaling_metric[i, j, k, l] = self.quantification[metric](
-                                self.model.problem.simulations[k, l]
-                            )
-                if show_progress:
-                    sys.stdout.write(
-                        "\r{:d} / {:d}".format(
-                            i * len(reaction_indices) + j + 1,
-                            len(n_file) * len(reaction_indices),
-                        )
-                    )
-            if self.model.problem.simulate(optimized.params, optimized.initials) is None:
-                for k, _ in enumerate(self.model.observables):
-                    for l, _ in enumerate(self.model.problem.conditions):
-                        signaling_metric[i, -1, k, l] = self.quantification[metric](
-                            self.model.problem.simulations[k, l]
-                        )
-        sensitivity_coefficients = dlnyi_dlnxj(
-            signaling_metric,
-            len(n_file),
-            len(reaction_indices),
-            len(self.model.observables),
-            len(self.model.problem.conditions),
-            rate,
-        )
-
-        return sensitivity_coefficients
-
-    def _load_sc(
-        self,
-        metric: str,
-        reaction_indices: List[int],
-        show_progress: bool,
-    ) -> np.ndarray:
-        """
-        Load (or calculate) sensitivity coefficients.
-        """
-        if not os.path.isfile(self._coefficients(metric)):
-            os.makedirs(
-                os.path.join(
-                    self.model.path,
-                    "sensitivity_coefficients",
-                    "reaction",
-                ),
-                exist_ok=True,
-            )
-            sensitivity_coefficients = self._calc_sensitivity_coefficients(
-                metric, reaction_indices, show_progress
-            )
-            np.save(self._coefficients(metric), sensitivity_coefficients)
-        else:
-            sensitivity_coefficients = np.load(self._coefficients(metric))
-
-        return sensitivity_coefficients
+        success = np.zeros(len(positions), dtype=bool)
+        # A single entry of the scaling vector is changed between simulations,
+        # and j == len(indices) is unperturbed.
+        perturbation = FluxScaling(num_fluxes=max(indices) + 1)
+        original = self.model.problem.perturbation
+        self.model.problem.perturbation = perturbation
+        try:
+            for j, position in enumerate(positions):
+                if position < len(indices):
+                    perturbation[indices[position]] = RATE
+                if self.model.problem.simulate(optimized.params, optimized.initials) is None:
+                    simulations[j] = self.model.problem.simulations
+                    success[j] = True
+                perturbation.reset()
+        finally:
+            self.model.problem.perturbation = original
+        return simulations, success
 
     @staticmethod
     def _draw_vertical_span(
@@ -296,17 +238,23 @@ class ReactionSensitivity(SignalingMetric):
         clustermap_kws: dict,
         cbar_ax_tick_params: dict,
         options: dict,
+        n_proc: int = 1,
     ) -> None:
         """
         Perform sensitivity analysis.
         """
-        if options["overwrite"] and os.path.isfile(self._coefficients(metric)):
-            os.remove(self._coefficients(metric))
         if not self.model.rxn.reactions:
             raise ValueError("Define reaction indices (reactions) in reaction_network.py")
         biological_processes = self._group()
         reaction_indices = sum(biological_processes, [])
-        sensitivity_coefficients = self._load_sc(metric, reaction_indices, show_progress)
+        sensitivity_coefficients = self._sensitivity_coefficients(
+            metric,
+            reaction_indices,
+            show_progress,
+            n_proc,
+            options["overwrite"],
+            options["trajectories"],
+        )
 
         if style == "barplot":
             self._barplot_sensitivity(
@@ -1,11 +1,55 @@
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
 from dataclasses import dataclass, field
 from math import isnan, log
-from typing import Callable, Dict, Union
+from typing import Callable, Dict, Final, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from numba import njit
 from scipy.integrate import simpson
 
+from ..model_object import ModelObject
+
+RATE: Final[float] = 1.01  # 1% change
+
+
+def axis_aware(function: Callable) -> Callable:
+    """
+    Mark a signaling metric as reducing the last axis of an array when called with
+    ``axis=-1``, so that it is computed once over all observables and conditions of
+    simulations instead of once per time course.
+
+    ``function`` is marked in place, so library functions should be wrapped first, e.g.,
+    ``axis_aware(functools.partial(np.argmax))``. Functions which do not accept
+    attributes, e.g., built-in ones, are wrapped.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from biomass import run_analysis
+    >>> from biomass.analysis import axis_aware
+    >>> @axis_aware
+    ... def amplitude(y, axis=-1):
+    ...     return np.max(y, axis=axis) - np.min(y, axis=axis)
+    >>> run_analysis(
+    ...     model, target='parameter', metric='amplitude', create_metrics={'amplitude': amplitude}
+    ... )
+    """
+    try:
+        function.axis_aware = True
+    except AttributeError:
+        function = functools.partial(function)
+        function.axis_aware = True
+    return function
+
+
+# Default signaling metrics reducing the last axis with axis=-1
+_AXIS_AWARE: Final[Tuple[Callable, ...]] = (np.max, np.min, simpson)
+
 
 @dataclass
 class SignalingMetric(object):
@@ -26,6 +70,512 @@ class SignalingMetric(object):
         init=False,
     )
 
+    def _simulate(
+        self,
+        nth_paramset: int,
+        indices: List[int],
+        positions: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Simulate the parameter set ``nth_paramset`` with the ``indices[j]``-th target perturbed
+        for each ``j`` in ``positions``, or unperturbed if ``j == len(indices)``.
+        Return the simulations with shape (len(positions), len(observables), len(conditions),
+        len(t)), NaN if failed, and whether each simulation succeeded.
+        Implemented by each sensitivity analysis.
+        """
+        raise NotImplementedError
+
+    def _quantify(self, metric: str, simulations: np.ndarray, success: np.ndarray) -> np.ndarray:
+        """
+        Signaling metric of ``simulations`` with shape (len(simulations), len(observables),
+        len(conditions)). Failed simulations are NaN.
+
+        Metrics marked with :func:`axis_aware` and the default ones are computed over
+        all successful simulations at once. Others are called on each time course.
+        """
+        function = self.quantification[metric]
+        values = np.full(simulations.shape[:3], np.nan)
+        if getattr(function, "axis_aware", False) or function in _AXIS_AWARE:
+            if np.any(success):
+                values[success] = function(simulations[success], axis=-1)
+            return values
+        for j in np.flatnonzero(success):
+            for k in range(simulations.shape[1]):
+                for l in range(simulations.shape[2]):
+                    values[j, k, l] = function(simulations[j, k, l])
+        return values
+
+    def _run_task(self, task: tuple) -> Tuple[int, np.ndarray, object]:
+        """
+        Run a task of :meth:`_calc_signaling_metric`, in this process or in a worker.
+        Simulations are returned instead of the signaling metric if ``metric`` is
+        :obj:`None`.
+        """
+        i, metric, nth_paramset, indices, positions = task
+        simulations, success = self._simulate(nth_paramset, indices, positions)
+        if metric is None:
+            return i, positions, (simulations, success)
+        return i, positions, self._quantify(metric, simulations, success)
+
+    def _calc_signaling_metric(
+        self,
+        metric: str,
+        indices: List[int],
+        show_progress: bool,
+        n_proc: int = 1,
+        overwrite: bool = True,
+        trajectories: bool = False,
+    ) -> np.ndarray:
+        """
+        Compute the signaling metric of every parameter set in ``out/`` with shape
+        (len(n_file), len(indices) + 1, len(observables), len(conditions)),
+        where the last row of the second axis is unperturbed.
+
+        Values are read from the :class:`SignalingMetricCache` of the metric, unless
+        ``overwrite`` is :obj:`True`, and only the missing ones are simulated.
+        Simulations are divided into (parameter set, perturbations) tasks, which are run
+        in ``n_proc`` processes if ``n_proc`` > 1. Each worker creates the model once.
+        Results are gathered in the same order as in a single process,
+        and the progress is reported by this process.
+
+        If ``trajectories`` is :obj:`True`, simulations are also written to the
+        :class:`TrajectoryStore` in ``trajectories/``, which is recreated if ``overwrite``
+        is :obj:`True` or it holds other parameter sets or targets. Missing values are
+        then quantified from the stored simulations, and only the simulations not yet
+        written are run.
+        """
+        n_file = self.model.get_executable()
+        directory = os.path.dirname(self._coefficients(metric))
+        cache = SignalingMetricCache(
+            os.path.join(directory, "signaling_metric", f"{metric}.npz"), self.model
+        )
+        if overwrite:
+            cache.clear()
+        signaling_metric = np.full(
+            (
+                len(n_file),
+                len(indices) + 1,
+                len(self.model.observables),
+                len(self.model.problem.conditions),
+            ),
+            np.nan,
+        )
+        paramsets: List[str] = []
+        keys: List[List[str]] = []
+        missing: List[np.ndarray] = []
+        for i, nth_paramset in enumerate(n_file):
+            optimized = self.model.load_param(nth_paramset)
+            paramset = cache.paramset_key(optimized.params, optimized.initials)
+            paramsets.append(paramset)
+            keys.append([cache.key(paramset, index) for index in [*indices, -1]])
+            positions = []
+            for j, key in enumerate(keys[i]):
+                value = cache.get(key)
+                if value is None:
+                    positions.append(j)
+                else:
+                    signaling_metric[i, j] = value
+            missing.append(np.array(positions, dtype=int))
+        store = None
+        if trajectories:
+            store = TrajectoryStore(os.path.join(directory, "trajectories"))
+            if overwrite or not store.matches(paramsets, indices, cache.context):
+                store.create(
+                    paramsets,
+                    indices,
+                    cache.context,
+                    (
+                        len(self.model.observables),
+                        len(self.model.problem.conditions),
+                        len(self.model.problem.t),
+                    ),
+                )
+            done = np.asarray(store.load("done"))
+            for i, positions in enumerate(missing):
+                stored = positions[done[i, positions]]
+                if stored.size:
+                    values = self._quantify(
+                        metric,
+                        np.asarray(store.load("trajectories")[i, stored]),
+                        np.asarray(store.load("success")[i, stored]),
+                    )
+                    signaling_metric[i, stored] = values
+                    for j, value in zip(stored, values):
+                        cache.put(keys[i][j], value)
+                # Every simulation is stored, including those with cached values
+                missing[i] = np.flatnonzero(~done[i])
+        # Several tasks per process balance the load among processes
+        n_chunks = 1 if n_proc == 1 else -(-4 * n_proc // max(len(n_file), 1))
+        tasks = [
+            (i, None if trajectories else metric, nth_paramset, indices, chunk)
+            for i, nth_paramset in enumerate(n_file)
+            if missing[i].size
+            for chunk in np.array_split(missing[i], min(missing[i].size, n_chunks))
+        ]
+        n_total = sum(np.count_nonzero(positions < len(indices)) for positions in missing)
+        n_done = 0
+        try:
+            for i, chunk, values in _map_tasks(self, tasks, n_proc):
+                if store is not None:
+                    store.write(i, chunk, *values)
+                    values = self._quantify(metric, *values)
+                signaling_metric[i, chunk] = values
+                for j, value in zip(chunk, values):
+                    cache.put(keys[i][j], value)
+                n_done += np.count_nonzero(chunk < len(indices))
+                if show_progress:
+                    sys.stdout.write(f"\r{n_done:d} / {n_total:d}")
+        finally:
+            # Keep finished simulations if interrupted
+            cache.save()
+        return signaling_metric
+
+    def _sensitivity_coefficients(
+        self,
+        metric: str,
+        indices: List[int],
+        show_progress: bool,
+        n_proc: int = 1,
+        overwrite: bool = True,
+        trajectories: bool = False,
+    ) -> np.ndarray:
+        """
+        Calculate sensitivity coefficients for the perturbed ``indices``
+        and save them to ``sensitivity_coefficients/{target}/{metric}.npy``.
+        """
+        signaling_metric = self._calc_signaling_metric(
+            metric, indices, show_progress, n_proc, overwrite, trajectories
+        )
+        sensitivity_coefficients = dlnyi_dlnxj(
+            signaling_metric,
+            signaling_metric.shape[0],
+            len(indices),
+            len(self.model.observables),
+            len(self.model.problem.conditions),
+            RATE,
+        )
+        os.makedirs(os.path.dirname(self._coefficients(metric)), exist_ok=True)
+        np.save(self._coefficients(metric), sensitivity_coefficients)
+
+        return sensitivity_coefficients
+
+
+class SignalingMetricCache(object):
+    """
+    Signaling metrics of simulations with one target perturbed, keyed by the content of
+    the parameter set and the perturbed index (-1 if unperturbed).
+
+    Entries are discarded when the observables, experimental conditions or time points
+    of the model differ from those the cache was saved with.
+
+    Parameters
+    ----------
+    path : str
+        Path to the ``.npz`` file the entries are saved to.
+    model : :class:`biomass.model_object.ModelObject`
+        Model for which signaling metrics are computed.
+    """
+
+    def __init__(self, path: str, model: ModelObject) -> None:
+        self.path = path
+        self.shape = (len(model.observables), len(model.problem.conditions))
+        self.context = self._digest(
+            list(model.observables),
+            list(model.problem.conditions),
+            np.asarray(model.problem.t, dtype=float),
+        )
+        self._entries: Dict[str, np.ndarray] = {}
+        self._modified = False
+        if os.path.isfile(path):
+            with np.load(path) as data:
+                if str(data["context"]) == self.context:
+                    self._entries = dict(zip(data["keys"].tolist(), data["values"]))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @staticmethod
+    def _digest(*items: object) -> str:
+        h = hashlib.sha1()
+        for item in items:
+            if isinstance(item, np.ndarray):
+                h.update(np.ascontiguousarray(item).tobytes())
+            else:
+                h.update(repr(item).encode("utf-8"))
+            h.update(b"|")
+        return h.hexdigest()
+
+    def paramset_key(self, x: Sequence[float], y0: Sequence[float]) -> str:
+        """
+        Return the content hash of a parameter set.
+        """
+        return self._digest(np.asarray(x, dtype=float), np.asarray(y0, dtype=float))
+
+    @staticmethod
+    def key(paramset: str, index: int) -> str:
+        """
+        Return the key of the entry of ``paramset`` with the ``index``-th target perturbed.
+        """
+        return f"{paramset}:{index:d}"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Return the signaling metric with shape (len(observables), len(conditions)),
+        or :obj:`None` on a miss.
+        """
+        return self._entries.get(key)
+
+    def put(self, key: str, value: np.ndarray) -> None:
+        self._entries[key] = np.asarray(value, dtype=float)
+        self._modified = True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._modified = True
+
+    def save(self) -> None:
+        """
+        Write the entries to ``path`` if they have been modified.
+        """
+        if not self._modified:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path[:-len('.npz')]}.{os.getpid()}.npz"
+        np.savez(
+            tmp_path,
+            context=np.array(self.context),
+            keys=np.array(list(self._entries), dtype=str),
+            values=np.array(list(self._entries.values()), dtype=float).reshape(
+                (len(self._entries), *self.shape)
+            ),
+        )
+        os.replace(tmp_path, self.path)
+        self._modified = False
+
+
+class TrajectoryStore(object):
+    """
+    Simulations of sensitivity analysis stored in memory-mapped ``.npy`` files.
+
+    ``trajectories.npy`` has shape (len(paramsets), len(indices) + 1, len(observables),
+    len(conditions), len(t)), where the last row of the second axis is unperturbed,
+    ``success.npy`` tells whether each simulation succeeded and ``done.npy``
+    whether it has been written. ``index.json`` records the parameter sets
+    (content hashes) and the perturbed indices.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the files, ``sensitivity_coefficients/{target}/trajectories``.
+
+    Examples
+    --------
+    >>> from biomass import run_analysis
+    >>> from biomass.analysis import TrajectoryStore
+    >>> run_analysis(model, target='reaction', options={'trajectories': True})
+    >>> store = TrajectoryStore(
+    ...     os.path.join(model.path, 'sensitivity_coefficients', 'reaction', 'trajectories')
+    ... )
+    >>> curves = store.sensitivity_curves()
+    """
+
+    INDEX = "index.json"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._index: Optional[dict] = None
+
+    @property
+    def index(self) -> Optional[dict]:
+        """
+        Contents of ``index.json``, :obj:`None` if the store is not created.
+        """
+        if self._index is None:
+            try:
+                with open(os.path.join(self.path, self.INDEX), encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                pass
+        return self._index
+
+    @property
+    def paramsets(self) -> List[str]:
+        return self.index["paramsets"]
+
+    @property
+    def indices(self) -> List[int]:
+        return self.index["indices"]
+
+    def matches(self, paramsets: List[str], indices: List[int], context: str) -> bool:
+        """
+        Whether the store holds ``paramsets`` perturbed at ``indices`` for the same model.
+        """
+        return self.index is not None and self.index == dict(
+            paramsets=list(paramsets), indices=list(indices), context=context
+        )
+
+    def create(
+        self,
+        paramsets: List[str],
+        indices: List[int],
+        context: str,
+        shape: Tuple[int, int, int],
+    ) -> None:
+        """
+        Create empty files for ``paramsets`` perturbed at ``indices``, where ``shape`` is
+        (len(observables), len(conditions), len(t)). Existing files are replaced.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.isfile(os.path.join(self.path, self.INDEX)):
+            os.remove(os.path.join(self.path, self.INDEX))
+        self._index = None
+        rows = (len(paramsets), len(indices) + 1)
+        for name, dtype, row_shape in [
+            ("trajectories", float, (*rows, *shape)),
+            ("success", bool, rows),
+            ("done", bool, rows),
+        ]:
+            array = np.lib.format.open_memmap(
+                os.path.join(self.path, f"{name}.npy"), mode="w+", dtype=dtype, shape=row_shape
+            )
+            array.flush()
+            del array
+        # index.json is written last, marking the files as complete
+        tmp_path = os.path.join(self.path, f"{self.INDEX}.{os.getpid()}")
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump(dict(paramsets=list(paramsets), indices=list(indices), context=context), f)
+        os.replace(tmp_path, os.path.join(self.path, self.INDEX))
+
+    def load(self, name: str = "trajectories", mmap_mode: str = "r") -> np.memmap:
+        """
+        Open ``trajectories``, ``success`` or ``done`` as a memory-mapped array.
+        """
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    def write(
+        self,
+        i: int,
+        positions: np.ndarray,
+        simulations: np.ndarray,
+        success: np.ndarray,
+    ) -> None:
+        """
+        Write simulations of the ``i``-th parameter set at ``positions``.
+        """
+        trajectories = self.load("trajectories", "r+")
+        trajectories[i, positions] = simulations
+        trajectories.flush()
+        flags = self.load("success", "r+")
+        flags[i, positions] = success
+        flags.flush()
+        # Rows are marked after their values are written
+        done = self.load("done", "r+")
+        done[i, positions] = True
+        done.flush()
+
+    def chunks(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """
+        Yield the index, trajectories and success flags of each parameter set in turn,
+        so that only one parameter set is loaded into memory at a time.
+        """
+        trajectories = self.load("trajectories")
+        success = self.load("success")
+        for i in range(trajectories.shape[0]):
+            yield i, np.asarray(trajectories[i]), np.asarray(success[i])
+
+    def sensitivity_curves(self, rate: float = RATE) -> np.memmap:
+        """
+        Time-resolved sensitivity coefficients, d ln y(t) / d ln x, computed one parameter
+        set at a time and saved to ``sensitivity_curves.npy`` with shape (len(paramsets),
+        len(indices), len(observables), len(conditions), len(t)).
+
+        As in :func:`dlnyi_dlnxj`, coefficients are zero where the
+        unperturbed value or the change is too small, and NaN where simulations failed
+        or have not been written.
+        """
+        EPS = 2.0**-52.0
+        done = self.load("done")
+        shape = self.load("trajectories").shape
+        curves = np.lib.format.open_memmap(
+            os.path.join(self.path, "sensitivity_curves.npy"),
+            mode="w+",
+            dtype=float,
+            shape=(shape[0], shape[1] - 1, *shape[2:]),
+        )
+        for i, trajectories, success in self.chunks():
+            perturbed, unperturbed = trajectories[:-1], trajectories[-1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = perturbed / unperturbed
+                values = np.where(
+                    (np.abs(unperturbed) < EPS)
+                    | (np.abs(perturbed - unperturbed) < EPS)
+                    | (ratio <= 0),
+                    0.0,
+                    np.log(ratio) / log(rate),
+                )
+            valid = success[:-1] & done[i, :-1] & success[-1] & done[i, -1]
+            values[~valid] = np.nan
+            curves[i] = values
+        curves.flush()
+        del curves
+        return self.load("sensitivity_curves")
+
+
+# Sensitivity analysis created once in each worker process of run_analysis
+_worker_analysis: Optional[SignalingMetric] = None
+
+
+def _init_worker(
+    pkg_name: str,
+    use_compile: bool,
+    analysis: type,
+    create_metrics: Optional[Dict[str, Callable[[np.ndarray], Union[int, float]]]],
+) -> None:
+    from ..core import _load_worker_model
+
+    global _worker_analysis
+    _worker_analysis = analysis(_load_worker_model(pkg_name, use_compile), create_metrics)
+
+
+def _run_task(analysis: SignalingMetric, task: tuple) -> tuple:
+    return analysis._run_task(task)
+
+
+def _run_task_in_worker(task: tuple) -> tuple:
+    return _run_task(_worker_analysis, task)
+
+
+def _map_tasks(analysis: SignalingMetric, tasks: Sequence[tuple], n_proc: int):
+    """
+    Yield the results of tasks, computed in this process if ``n_proc`` is 1,
+    otherwise in a pool of ``n_proc`` worker processes, as they complete.
+    """
+    if n_proc < 1:
+        raise ValueError("n_proc must be a positive integer.")
+    if n_proc == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_task(analysis, task)
+        return
+    model = analysis.model
+    p = multiprocessing.Pool(
+        processes=min(n_proc, len(tasks)),
+        initializer=_init_worker,
+        initargs=(
+            model.path.replace(os.sep, "."),
+            model.is_compiled,
+            type(analysis),
+            analysis.create_metrics,
+        ),
+    )
+    try:
+        yield from p.imap_unordered(_run_task_in_worker, tasks)
+    finally:
+        p.close()
+        p.join()
+
 
 @njit(cache=True, fastmath=True)
 def dlnyi_dlnxj(
@@ -2,6 +2,7 @@ from typing import Dict, List
 
 import numpy as np
 
+from biomass.dynamics.perturbation import FluxScaling
 from biomass.dynamics.solver import *
 
 from .name2idx import C, V
@@ -57,7 +58,7 @@ class Observable(DifferentialEquation):
 
     def simulate(self, x: list, y0: list, _perturbation: dict = {}):
         if _perturbation:
-            self.perturbation = _perturbation
+            self.perturbation = FluxScaling(_perturbation)
         # unperturbed steady state
 
         for i, condition in enumerate(self.conditions):
@@ -7,6 +7,11 @@ from typing import Dict, Final, List, Literal, Optional
 import numpy as np
 from scipy.sparse import csr_matrix, lil_matrix
 
+from ..dynamics.jacobian import (
+    NotDifferentiableError,
+    generate_jacobian_from_source,
+    sparsity_from_stoichiometry,
+)
 from . import julia_template as jl
 from .reaction_rules import ReactionRules
 
@@ -296,6 +301,47 @@ class Text2Model(ReactionRules):
             ) as f:
                 f.write("\n".join(lines))
 
+    def _update_jacobian(self) -> None:
+        """
+        Add the analytic Jacobian matrix (``jacobian``) and its sparsity structure
+        (``jac_sparsity``) to ``DifferentialEquation`` in ode.py.
+        These are used by implicit solvers, e.g., 'BDF', 'Radau' and 'LSODA'.
+        """
+        with open(os.path.join(f"{self.name}", "ode.py"), encoding="utf-8", mode="r") as f:
+            ode_source = f.read()
+        with open(
+            os.path.join(f"{self.name}", "reaction_network.py"), encoding="utf-8", mode="r"
+        ) as f:
+            reaction_network_source = f.read()
+        rate_dependencies = []
+        for reaction in self.kinetics:
+            names = set(re.findall(r"\w+", reaction.rate)) | set(reaction.reactants)
+            names |= set(reaction.modifiers)
+            rate_dependencies.append(
+                {self.species.index(name) for name in names if name in self.species}
+            )
+        try:
+            methods = generate_jacobian_from_source(
+                ode_source,
+                reaction_network_source,
+                self.parameters,
+                self.species,
+                sparsity_from_stoichiometry(self.stoichiometry_matrix, rate_dependencies),
+            )
+        except NotDifferentiableError as e:
+            print(f"Analytic Jacobian was not generated: {e}")
+            return
+        methods = "\n".join(
+            self.indentation + line if line else line for line in methods.splitlines()
+        )
+        ode_source = ode_source.replace(
+            2 * self.indentation + "return dydt\n",
+            2 * self.indentation + "return dydt\n\n" + methods + "\n",
+            1,
+        )
+        with open(os.path.join(f"{self.name}", "ode.py"), encoding="utf-8", mode="w") as f:
+            f.write(ode_source)
+
     def _update_search_param(self) -> None:
         """
         Update search_param.py
@@ -747,6 +793,8 @@ class Text2Model(ReactionRules):
         self._update_parameters()
         self._update_species()
         self._update_diffeq()
+        if self.lang == "python":
+            self._update_jacobian()
         self._update_search_param()
         self._update_observable()
         if self.lang == "julia":
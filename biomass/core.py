@@ -1,22 +1,40 @@
 """BioMASS core functions"""
 
+import multiprocessing
 import os
+import time
 import warnings
 from dataclasses import dataclass
 from importlib import import_module
 from pathlib import Path
 from types import ModuleType
-from typing import Callable, Dict, Literal, Optional, Union
+from typing import Callable, Dict, Iterable, List, Literal, NamedTuple, Optional, Union
 
 import numpy as np
-from scipy.optimize import differential_evolution
-
-from .analysis import InitialConditionSensitivity, ParameterSensitivity, ReactionSensitivity
+from scipy.optimize import OptimizeResult, differential_evolution
+
+from .analysis import (
+    GlobalSensitivity,
+    InitialConditionSensitivity,
+    MorrisIndices,
+    ParameterSensitivity,
+    ReactionSensitivity,
+    SobolIndices,
+)
 from .dynamics import SignalingSystems
-from .estimation import Optimizer
+from .estimation import MultiFidelityObjective, Optimizer, VectorizedObjective
+from .estimation.optimizer import _call_callback
 from .model_object import ModelObject
 
-__all__ = ["Model", "create_model", "optimize", "run_simulation", "run_analysis"]
+__all__ = [
+    "Model",
+    "create_model",
+    "optimize",
+    "optimize_many",
+    "run_simulation",
+    "run_analysis",
+    "run_global_analysis",
+]
 
 
 class BiomassIndexError(Exception):
@@ -221,6 +239,13 @@ def optimize(
     disp_here: bool = False,
     overwrite: bool = False,
     optimizer_options: Optional[dict] = None,
+    refine: bool = False,
+    refine_options: Optional[dict] = None,
+    checkpoint_every: Optional[int] = None,
+    resume: bool = False,
+    early_abort: Optional[float] = None,
+    multi_fidelity: bool = False,
+    multi_fidelity_options: Optional[dict] = None,
 ) -> None:
     """
     Estimate model parameters from experimental data.
@@ -238,6 +263,34 @@ def optimize(
     optimizer_options : dict, optional
         Keyword arguments to pass to ``scipy.optimize.differential_evolution``.
         For details, please refer to https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.differential_evolution.html.
+        If ``optimizer_options['vectorized']`` is :obj:`True`, each generation is evaluated
+        at once by :class:`biomass.estimation.VectorizedObjective`, which splits it among
+        ``optimizer_options['workers']`` persistent processes.
+    refine : bool (default: :obj:`False`)
+        If :obj:`True`, the result of differential evolution is polished with
+        ``scipy.optimize.least_squares`` (see :meth:`biomass.estimation.Optimizer.refine`).
+        ``residuals`` must be defined in ``problem.py``.
+    refine_options : dict, optional
+        Keyword arguments to pass to :meth:`biomass.estimation.Optimizer.refine`.
+    checkpoint_every : int, optional
+        Save the state of differential evolution to ``out/x_id/checkpoint.npz``
+        every ``checkpoint_every`` generations.
+    resume : bool (default: :obj:`False`)
+        If :obj:`True`, continue an interrupted optimization from ``out/x_id/checkpoint.npz``.
+        A new optimization is started if no checkpoint exists.
+    early_abort : float, optional
+        Stop simulating a trial parameter set once its error is known to exceed
+        ``early_abort`` times the worst objective value in the population
+        (see :class:`biomass.estimation.Optimizer`). Must be at least 1, so that the result
+        is not changed; as the bound is loose, the time saved is small.
+        Not available with ``optimizer_options['vectorized']``.
+    multi_fidelity : bool (default: :obj:`False`)
+        If :obj:`True`, candidates are screened with loose solver tolerances and evaluated
+        at full accuracy only if they can enter the population
+        (see :class:`biomass.estimation.MultiFidelityObjective`).
+        Not available with ``optimizer_options['vectorized']``.
+    multi_fidelity_options : dict, optional
+        Keyword arguments to pass to :class:`biomass.estimation.MultiFidelityObjective`.
 
     Examples
     --------
@@ -246,6 +299,13 @@ def optimize(
     >>> copy_to_current("Nakakuki_Cell_2010")
     >>> model = create_model("Nakakuki_Cell_2010")
     >>> optimize(model, x_id=1)
+    >>> optimize(model, x_id=2, optimizer_options={"maxiter": 10}, refine=True)
+    >>> optimize(model, x_id=3, optimizer_options={"vectorized": True, "workers": 4})
+    >>> # After being killed, continue from the last checkpoint
+    >>> optimize(model, x_id=4, checkpoint_every=5)
+    >>> optimize(model, x_id=4, checkpoint_every=5, resume=True)
+    >>> optimize(model, x_id=5, early_abort=1.0)
+    >>> optimize(model, x_id=6, multi_fidelity=True, multi_fidelity_options={"rtol": 1e-5})
 
     Notes
     -----
@@ -255,6 +315,37 @@ def optimize(
     * Set lower/upper bounds of parameters to be estimated in ``search_param.py``
 
     """
+    _optimize(
+        model,
+        x_id,
+        disp_here=disp_here,
+        overwrite=overwrite,
+        optimizer_options=optimizer_options,
+        refine=refine,
+        refine_options=refine_options,
+        checkpoint_every=checkpoint_every,
+        resume=resume,
+        early_abort=early_abort,
+        multi_fidelity=multi_fidelity,
+        multi_fidelity_options=multi_fidelity_options,
+    )
+
+
+def _optimize(
+    model: ModelObject,
+    x_id: int,
+    *,
+    disp_here: bool,
+    overwrite: bool,
+    optimizer_options: Optional[dict],
+    refine: bool,
+    refine_options: Optional[dict],
+    checkpoint_every: Optional[int],
+    resume: bool,
+    early_abort: Optional[float],
+    multi_fidelity: bool,
+    multi_fidelity_options: Optional[dict],
+) -> OptimizeResult:
     if optimizer_options is None:
         optimizer_options = {}
     optimizer_options.setdefault("strategy", "best1bin")
@@ -278,15 +369,270 @@ def optimize(
             "Setting optimizer_options['polish'] to False is highly recommended.",
             UserWarning,
         )
-
-    optimizer = Optimizer(model, differential_evolution, x_id, disp_here, overwrite)
-    res = optimizer.minimize(
-        model.get_obj_val,
-        [(0, 1) for _ in range(len(model.problem.bounds))],
-        **optimizer_options,
+    if early_abort is not None and optimizer_options.get("vectorized", False):
+        raise ValueError("early_abort is not available with optimizer_options['vectorized'].")
+    if multi_fidelity and optimizer_options.get("vectorized", False):
+        raise ValueError("multi_fidelity is not available with optimizer_options['vectorized'].")
+
+    optimizer = Optimizer(
+        model,
+        differential_evolution,
+        x_id,
+        disp_here,
+        overwrite,
+        checkpoint_every=checkpoint_every,
+        resume=resume,
+        early_abort=early_abort,
     )
-    param_values = model.gene2val(res.x)
+    if optimizer_options.get("vectorized", False):
+        # The population is split among worker processes by VectorizedObjective
+        de_options = dict(optimizer_options)
+        de_options.setdefault("updating", "deferred")
+        with VectorizedObjective(model, n_workers=de_options.pop("workers")) as obj_fun:
+            res = optimizer.minimize(
+                obj_fun,
+                [(0, 1) for _ in range(len(model.problem.bounds))],
+                **de_options,
+            )
+    else:
+        res = optimizer.minimize(
+            (
+                MultiFidelityObjective(model, **(multi_fidelity_options or {}))
+                if multi_fidelity
+                else model.get_obj_val
+            ),
+            [(0, 1) for _ in range(len(model.problem.bounds))],
+            **optimizer_options,
+        )
+    indiv_gene = res.x
+    if refine:
+        indiv_gene = optimizer.refine(indiv_gene, **(refine_options or {}))
+    param_values = model.gene2val(indiv_gene)
     optimizer.import_solution(param_values)
+    return res
+
+
+class RunSummary(NamedTuple):
+    """
+    Summary of a parameter estimation run by :func:`optimize_many`.
+
+    Attributes
+    ----------
+    x_id : int
+        Index of parameter set.
+    status : str
+        'finished', 'stopped (budget)' (stopped early at ``time_limit``),
+        'skipped' (already finished before), 'failed',
+        or 'budget exceeded' (not started within ``time_limit``).
+    fun : float
+        Objective function value of the solution, NaN unless finished or stopped.
+    nit : int
+        Number of generations.
+    nfev : int
+        Number of evaluations of the objective function.
+    wall_time : float
+        Elapsed time in seconds.
+    message : str
+        Message from the optimizer, or the error if failed.
+    """
+
+    x_id: int
+    status: str
+    fun: float
+    nit: int
+    nfev: int
+    wall_time: float
+    message: str
+
+
+# Model created once in each worker process of optimize_many
+_worker_model: Optional[ModelObject] = None
+
+
+def _load_worker_model(pkg_name: str, use_compile: bool) -> ModelObject:
+    """
+    Create the model in a worker process, shared by :func:`optimize_many`
+    and :class:`~biomass.estimation.VectorizedObjective`.
+    """
+    model = create_model(pkg_name)
+    if use_compile:
+        model.compile()
+    return model
+
+
+def _init_worker(pkg_name: str, use_compile: bool) -> None:
+    global _worker_model
+    _worker_model = _load_worker_model(pkg_name, use_compile)
+
+
+def _run_in_worker(args: tuple) -> RunSummary:
+    return _run_optimization(_worker_model, *args)
+
+
+def _run_optimization(
+    model: ModelObject,
+    x_id: int,
+    deadline: Optional[float],
+    kwargs: dict,
+) -> RunSummary:
+    if deadline is not None and time.time() >= deadline:
+        return RunSummary(x_id, "budget exceeded", np.nan, 0, 0, 0.0, "")
+    optimizer_options = dict(kwargs.pop("optimizer_options") or {})
+    stopped = False
+    if deadline is not None:
+        callback = optimizer_options.get("callback")
+
+        def stop_at_deadline(intermediate_result):
+            nonlocal stopped
+            if callback is not None and (value := _call_callback(callback, intermediate_result)):
+                return value
+            stopped = time.time() >= deadline
+            return stopped
+
+        optimizer_options["callback"] = stop_at_deadline
+    start = time.perf_counter()
+    try:
+        res = _optimize(model, x_id, optimizer_options=optimizer_options, **kwargs)
+    except Exception as e:
+        return RunSummary(
+            x_id, "failed", np.nan, 0, 0, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+        )
+    return RunSummary(
+        x_id,
+        "stopped (budget)" if stopped else "finished",
+        model.results_store.get(x_id).best_fitness,
+        int(res.nit),
+        int(res.nfev),
+        time.perf_counter() - start,
+        str(res.message),
+    )
+
+
+def optimize_many(
+    model: ModelObject,
+    x_ids: Iterable[int],
+    *,
+    n_workers: int = 1,
+    time_limit: Optional[float] = None,
+    overwrite: bool = False,
+    optimizer_options: Optional[dict] = None,
+    refine: bool = False,
+    refine_options: Optional[dict] = None,
+    checkpoint_every: Optional[int] = None,
+    resume: bool = False,
+    early_abort: Optional[float] = None,
+    multi_fidelity: bool = False,
+    multi_fidelity_options: Optional[dict] = None,
+) -> List[RunSummary]:
+    """
+    Run independent parameter estimations for multiple parameter sets.
+
+    Each worker process creates the model once and runs :func:`optimize`
+    for the ``x_ids`` assigned to it.
+
+    Parameters
+    ----------
+    model : ModelObject
+        Model for parameter estimation.
+    x_ids : Iterable[int]
+        Indices of parameter sets to estimate.
+        Those already finished (found by ``model.get_executable()``) are skipped
+        unless ``overwrite`` is :obj:`True`.
+    n_workers : int (default: 1)
+        Number of processes to use. If 1, runs are executed one by one in this process
+        using ``model`` itself; otherwise each worker creates the model from ``model.path``,
+        compiled if ``model`` is compiled.
+    time_limit : float, optional
+        Wall-clock budget in seconds shared by all runs.
+        Running optimizations stop at the end of the generation in which the budget is
+        exhausted and their best solutions are saved; runs not started by then are not executed.
+    overwrite : bool (default: :obj:`False`)
+        If :obj:`True`, finished parameter sets are estimated again and existing ``out/x_id``
+        are overwritten, see :func:`optimize`. Otherwise runs whose ``out/x_id`` exists
+        fail, unless they are resumed.
+    optimizer_options : dict, optional
+        Keyword arguments to pass to ``scipy.optimize.differential_evolution``.
+        ``optimizer_options['workers']`` must be 1 when ``n_workers`` > 1.
+    refine : bool (default: :obj:`False`)
+        Whether to polish each solution, see :func:`optimize`.
+    refine_options : dict, optional
+        Keyword arguments to pass to :meth:`biomass.estimation.Optimizer.refine`.
+    checkpoint_every : int, optional
+        Checkpoint interval of each run, see :func:`optimize`.
+    resume : bool (default: :obj:`False`)
+        If :obj:`True`, unfinished runs continue from their checkpoints.
+    early_abort : float, optional
+        Error bound factor of each run, see :func:`optimize`.
+    multi_fidelity : bool (default: :obj:`False`)
+        Whether to screen candidates at low accuracy, see :func:`optimize`.
+    multi_fidelity_options : dict, optional
+        Keyword arguments to pass to :class:`biomass.estimation.MultiFidelityObjective`.
+
+    Returns
+    -------
+    summaries : List[RunSummary]
+        Summary of each run, in the order of ``x_ids``.
+
+    Examples
+    --------
+    >>> from biomass import create_model, optimize_many
+    >>> from biomass.models import copy_to_current
+    >>> copy_to_current("Nakakuki_Cell_2010")
+    >>> model = create_model("Nakakuki_Cell_2010")
+    >>> summaries = optimize_many(model, range(1, 11), n_workers=4, time_limit=3600)
+    >>> for summary in summaries:
+    ...     print(summary.x_id, summary.status, summary.fun, summary.nfev, summary.wall_time)
+    """
+    x_ids = list(x_ids)
+    if len(set(x_ids)) != len(x_ids):
+        raise ValueError("x_ids must not contain duplicates.")
+    if n_workers < 1:
+        raise ValueError("n_workers must be a positive integer.")
+    if n_workers > 1 and (optimizer_options or {}).get("workers", 1) != 1:
+        raise ValueError("Set optimizer_options['workers'] to 1 when n_workers > 1.")
+    deadline = None if time_limit is None else time.time() + time_limit
+    kwargs = dict(
+        disp_here=False,
+        overwrite=overwrite,
+        optimizer_options=optimizer_options,
+        refine=refine,
+        refine_options=refine_options,
+        checkpoint_every=checkpoint_every,
+        resume=resume,
+        early_abort=early_abort,
+        multi_fidelity=multi_fidelity,
+        multi_fidelity_options=multi_fidelity_options,
+    )
+    summaries: Dict[int, RunSummary] = {}
+    pending = []
+    finished = set(model.get_executable())
+    for x_id in x_ids:
+        if not overwrite and x_id in finished:
+            summaries[x_id] = RunSummary(x_id, "skipped", np.nan, 0, 0, 0.0, "")
+        else:
+            pending.append((x_id, deadline, dict(kwargs)))
+    if n_workers == 1 or len(pending) <= 1:
+        for args in pending:
+            summaries[args[0]] = _run_optimization(model, *args)
+    else:
+        p = multiprocessing.Pool(
+            processes=min(n_workers, len(pending)),
+            initializer=_init_worker,
+            initargs=(model.path.replace(os.sep, "."), model.is_compiled),
+        )
+        try:
+            for summary in p.imap_unordered(_run_in_worker, pending):
+                summaries[summary.x_id] = summary
+        finally:
+            p.close()
+            p.join()
+    for x_id in x_ids:
+        if summaries[x_id].status == "failed":
+            warnings.warn(
+                f"Parameter estimation failed. #{x_id:d}: {summaries[x_id].message}",
+                RuntimeWarning,
+            )
+    return [summaries[x_id] for x_id in x_ids]
 
 
 def run_simulation(
@@ -295,6 +641,8 @@ def run_simulation(
     viz_type: str = "original",
     show_all: bool = False,
     stdev: bool = False,
+    n_proc: int = 1,
+    figures: bool = True,
 ) -> None:
     """
     Simulate ODE model with estimated parameter values.
@@ -319,6 +667,13 @@ def run_simulation(
     stdev : bool (default: :obj:`False`)
         If :obj:`True`, the standard deviation of simulated values will be shown
         (only available for 'average' visualization type).
+    n_proc : int (default: 1)
+        Number of processes to use. If larger than 1, parameter sets in ``out/`` are
+        simulated and figures are rendered in parallel, each process creating the model
+        from ``model.path``, compiled if ``model`` is compiled.
+    figures : bool (default: :obj:`True`)
+        If :obj:`False`, only simulated values are saved to ``simulation_data/``,
+        without drawing figures.
 
     Examples
     --------
@@ -333,6 +688,10 @@ def run_simulation(
     ...     stdev=True,
     ... )
 
+    Simulation of all parameter sets using 4 processes, without figures
+
+    >>> run_simulation(model, viz_type='average', n_proc=4, figures=False)
+
     """
     if viz_type not in ["best", "average", "original", "experiment"] and not viz_type.isdecimal():
         raise ValueError(
@@ -343,6 +702,8 @@ def run_simulation(
         viz_type=viz_type,
         show_all=show_all,
         stdev=stdev,
+        n_proc=n_proc,
+        figures=figures,
     )
 
 
@@ -357,6 +718,7 @@ def run_analysis(
     clustermap_kws: Optional[dict] = None,
     cbar_ax_tick_params: Optional[dict] = None,
     options: Optional[dict] = None,
+    n_proc: int = 1,
 ) -> None:
     """
     Employ sensitivity analysis to identify critical parameters, species or
@@ -375,7 +737,9 @@ def run_analysis(
     metric : str (default: 'integral')
         A word to specify the signaling metric.
     create_metrics : Dict[str, Callable[[np.ndarray], Union[int, float]]], optional
-        Create user-defined signaling metrics.
+        Create user-defined signaling metrics. Functions marked with
+        :func:`biomass.analysis.axis_aware` are called once on all simulations with
+        ``axis=-1``, and others once per observable and condition.
     style :  Literal["barplot", "heatmap"] (default: 'barplot')
         * 'barplot'
         * 'heatmap'
@@ -397,7 +761,24 @@ def run_analysis(
             (``target`` == 'initial_condition') List of species which are not used for analysis.
 
         * overwrite : bool (default: :obj:`True`)
-            If :obj:`True`, the sensitivity_coefficients/{target}/{metric}.npy file will be overwritten.
+            If :obj:`True`, all signaling metrics are simulated again. Otherwise, those cached in
+            sensitivity_coefficients/{target}/signaling_metric/{metric}.npz for the same parameter
+            set and perturbed target are reused and only the missing ones are simulated,
+            e.g., after adding parameter sets to out/ or changing excluded parameters.
+            The sensitivity_coefficients/{target}/{metric}.npy file is overwritten in both cases.
+
+        * trajectories : bool (default: :obj:`False`)
+            If :obj:`True`, simulations are also stored as memory-mapped arrays in
+            sensitivity_coefficients/{target}/trajectories/, see
+            :class:`biomass.analysis.TrajectoryStore`. With ``overwrite`` set to :obj:`False`,
+            other signaling metrics, including those in ``create_metrics``, are then computed
+            from the stored simulations without simulating again.
+
+    n_proc : int (default: 1)
+        Number of processes to use. If larger than 1, simulations of (parameter set,
+        perturbations) tasks are distributed among processes, each creating the model
+        from ``model.path``, compiled if ``model`` is compiled. Functions in
+        ``create_metrics`` must then be picklable, e.g., defined at module level.
 
     Examples
     --------
@@ -426,6 +807,20 @@ def run_analysis(
 
     >>> run_analysis(model, target='reaction')
 
+    Reaction, using 4 processes
+
+    >>> run_analysis(model, target='reaction', n_proc=4)
+
+    Reaction, storing simulations to compute another metric later
+
+    >>> run_analysis(model, target='reaction', options={'trajectories': True})
+    >>> run_analysis(
+    ...     model,
+    ...     target='reaction',
+    ...     metric='maximum',
+    ...     options={'trajectories': True, 'overwrite': False},
+    ... )
+
     """
     if clustermap_kws is None:
         clustermap_kws = {}
@@ -448,6 +843,7 @@ def run_analysis(
     options.setdefault("excluded_params", [])
     options.setdefault("excluded_initials", [])
     options.setdefault("overwrite", True)
+    options.setdefault("trajectories", False)
 
     if target == "reaction":
         ReactionSensitivity(model, create_metrics).analyze(
@@ -457,6 +853,7 @@ def run_analysis(
             clustermap_kws=clustermap_kws,
             cbar_ax_tick_params=cbar_ax_tick_params,
             options=options,
+            n_proc=n_proc,
         )
     elif target == "parameter":
         ParameterSensitivity(model, create_metrics).analyze(
@@ -466,6 +863,7 @@ def run_analysis(
             clustermap_kws=clustermap_kws,
             cbar_ax_tick_params=cbar_ax_tick_params,
             options=options,
+            n_proc=n_proc,
         )
     elif target == "initial_condition":
         InitialConditionSensitivity(model, create_metrics).analyze(
@@ -475,6 +873,7 @@ def run_analysis(
             clustermap_kws=clustermap_kws,
             cbar_ax_tick_params=cbar_ax_tick_params,
             options=options,
+            n_proc=n_proc,
         )
     else:
         raise ValueError(
@@ -482,3 +881,103 @@ def run_analysis(
                 "', '".join(["reaction", "parameter", "initial_condition"]) + "'."
             )
         )
+
+
+def run_global_analysis(
+    model: ModelObject,
+    *,
+    method: Literal["sobol", "morris"] = "sobol",
+    metric: str = "integral",
+    create_metrics: Optional[Dict[str, Callable[[np.ndarray], Union[int, float]]]] = None,
+    n_samples: int = 1024,
+    sampler: Literal["sobol", "lhs"] = "sobol",
+    n_levels: int = 4,
+    n_bootstrap: int = 1000,
+    confidence_level: float = 0.95,
+    seed: Optional[int] = None,
+    chunk_size: int = 64,
+    show_progress: bool = True,
+    overwrite: bool = False,
+    n_proc: int = 1,
+) -> Union[SobolIndices, MorrisIndices]:
+    """
+    Employ global sensitivity analysis over the search region of parameters and
+    initial conditions defined in search_param.py, which are varied uniformly in log10 scale.
+
+    Signaling metrics are written to
+    sensitivity_coefficients/global/{method}/signaling_metric/{metric}.npy as soon as
+    each chunk of simulations finishes, so that an interrupted analysis resumes
+    where it stopped when called again with the same settings.
+    Indices are saved to sensitivity_coefficients/global/{method}/{metric}.npz.
+
+    Parameters
+    ----------
+    model : ModelObject
+        Model for sensitivity analysis.
+    method : Literal["sobol", "morris"] (default: 'sobol')
+        * 'sobol' : First-order and total-effect Sobol' indices,
+          requiring (number of varied parameters + 2) * ``n_samples`` simulations.
+        * 'morris' : Elementary effects of ``n_samples`` trajectories,
+          requiring (number of varied parameters + 1) * ``n_samples`` simulations.
+    metric : str (default: 'integral')
+        A word to specify the signaling metric.
+    create_metrics : Dict[str, Callable[[np.ndarray], Union[int, float]]], optional
+        Create user-defined signaling metrics, see :func:`run_analysis`.
+    n_samples : int (default: 1024)
+        Number of base samples ('sobol'), preferably a power of 2, or trajectories ('morris').
+    sampler : Literal["sobol", "lhs"] (default: 'sobol')
+        ('sobol') Scrambled Sobol' sequence or Latin hypercube to draw base samples.
+    n_levels : int (default: 4)
+        ('morris') Even number of grid levels.
+    n_bootstrap : int (default: 1000)
+        Number of bootstrap resamples for confidence intervals.
+    confidence_level : float (default: 0.95)
+        Confidence level of the intervals.
+    seed : int, optional
+        Seed of the design and of bootstrap resampling.
+    chunk_size : int (default: 64)
+        Number of simulations in each task, after which results are written.
+    show_progress : bool (default: :obj:`True`)
+        Set to :obj:`True` to show the progress indicator.
+    overwrite : bool (default: :obj:`False`)
+        If :obj:`True`, results of ``method`` are removed and the analysis starts over.
+        Otherwise, a saved analysis with other settings raises :class:`ValueError`.
+    n_proc : int (default: 1)
+        Number of processes to use, as in :func:`run_analysis`.
+
+    Returns
+    -------
+    indices : :class:`biomass.analysis.SobolIndices` or :class:`biomass.analysis.MorrisIndices`
+        Indices with shape (number of varied parameters, len(observables), len(conditions)),
+        and their confidence intervals with (lower, upper) added as the first axis.
+
+    Examples
+    --------
+    >>> from biomass import create_model, run_global_analysis
+    >>> from biomass.models import copy_to_current
+    >>> copy_to_current("Nakakuki_Cell_2010")
+    >>> model = create_model("Nakakuki_Cell_2010")
+
+    Sobol' indices, using 4 processes
+
+    >>> sobol = run_global_analysis(model, method='sobol', n_samples=256, n_proc=4)
+
+    Morris elementary effects
+
+    >>> morris = run_global_analysis(model, method='morris', n_samples=20)
+
+    """
+    return GlobalSensitivity(model, create_metrics).analyze(
+        method=method,
+        metric=metric,
+        n_samples=n_samples,
+        sampler=sampler,
+        n_levels=n_levels,
+        n_bootstrap=n_bootstrap,
+        confidence_level=confidence_level,
+        seed=seed,
+        chunk_size=chunk_size,
+        show_progress=show_progress,
+        overwrite=overwrite,
+        n_proc=n_proc,
+    )
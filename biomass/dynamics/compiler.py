@@ -0,0 +1,557 @@
+"""Compile the right-hand side of a BioMASS model into a Numba-jitted function"""
+
+import ast
+import hashlib
+import inspect
+import textwrap
+from importlib import import_module
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numba import njit
+from scipy.sparse import csc_matrix
+
+from .jacobian import (
+    PERTURBATION_MARK,
+    ForwardDiff,
+    NotDifferentiableError,
+    reads,
+    sparsity_pattern,
+)
+
+__all__ = ["CompilationError", "CompiledDiffeq", "compile_diffeq"]
+
+# Jitted functions shared by every CompiledDiffeq built from the same source.
+# Unpickled copies (e.g., in multiprocessing workers) look them up here
+# instead of triggering another compilation.
+_DISPATCHERS: Dict[str, Dict[str, Callable]] = {}
+
+
+class CompilationError(Exception):
+    """
+    Error in converting ``diffeq`` into a Numba-compatible function.
+    """
+
+    pass
+
+
+def parse_function(func: Callable) -> ast.FunctionDef:
+    """
+    Return the syntax tree of a function or method without decorators.
+    """
+    source = textwrap.dedent(inspect.getsource(func))
+    node = ast.parse(source).body[0]
+    if not isinstance(node, ast.FunctionDef):
+        raise CompilationError(f"Cannot parse the source of {func.__qualname__}.")
+    node.decorator_list = []
+    node.returns = None
+    return node
+
+
+def _is_self_attribute(node: ast.AST, attr: Optional[str] = None) -> bool:
+    return (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "self"
+        and (attr is None or node.attr == attr)
+    )
+
+
+def _is_docstring(stmt: ast.stmt) -> bool:
+    return isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant)
+
+
+def is_list_allocation(node: ast.AST) -> bool:
+    """``[0] * V.NUM``"""
+    return (
+        isinstance(node, ast.BinOp)
+        and isinstance(node.op, ast.Mult)
+        and isinstance(node.left, ast.List)
+        and len(node.left.elts) == 1
+        and isinstance(node.left.elts[0], ast.Constant)
+    )
+
+
+class _IndexResolver(ast.NodeTransformer):
+    """
+    Replace ``C.name`` and ``V.name`` with integer constants.
+    """
+
+    def __init__(self, indices: Dict[str, Dict[str, int]]):
+        self.indices = indices
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if (
+            isinstance(node.value, ast.Name)
+            and node.value.id in self.indices
+            and node.attr in self.indices[node.value.id]
+        ):
+            return ast.copy_location(
+                ast.Constant(self.indices[node.value.id][node.attr]),
+                node,
+            )
+        return self.generic_visit(node)
+
+
+class _Renamer(ast.NodeTransformer):
+    def __init__(self, mapping: Dict[str, str]):
+        self.mapping = mapping
+
+    def visit_Name(self, node: ast.Name) -> ast.Name:
+        if node.id in self.mapping:
+            node.id = self.mapping[node.id]
+        return node
+
+
+class _HelperCalls(ast.NodeTransformer):
+    """
+    Replace ``self.helper(...)`` with a call to the jitted helper.
+    """
+
+    def __init__(self, helpers: List[str]):
+        self.helpers = helpers
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        if _is_self_attribute(node.func):
+            self.helpers.append(node.func.attr)
+            node.func = ast.copy_location(ast.Name(f"_{node.func.attr}", ast.Load()), node.func)
+        return node
+
+
+def get_indices(namespace: dict) -> Dict[str, Dict[str, int]]:
+    """
+    Return indices of parameters (C) and species (V) defined in a model module.
+    """
+    indices: Dict[str, Dict[str, int]] = {}
+    for name in ["C", "V"]:
+        if name in namespace and hasattr(namespace[name], "NAMES"):
+            indices[name] = {key: getattr(namespace[name], key) for key in namespace[name].NAMES}
+            indices[name]["NUM"] = namespace[name].NUM
+    if "V" not in indices or "C" not in indices:
+        raise CompilationError("C and V must be imported in ode.py.")
+    return indices
+
+
+def inline_flux(
+    diffeq: ast.FunctionDef,
+    flux: Optional[ast.FunctionDef],
+    *,
+    keep_call: bool,
+) -> Tuple[List[ast.stmt], Optional[str]]:
+    """
+    Inline the statements of ``flux`` into the body of ``diffeq``.
+
+    Parameters
+    ----------
+    diffeq, flux : ast.FunctionDef
+        Syntax trees of ``DifferentialEquation.diffeq`` and ``ReactionNetwork.flux``.
+    keep_call : bool
+        If :obj:`True`, ``v = self.flux(t, y, x)`` is kept and assignments to ``v``
+        are inlined after it, otherwise ``v`` is computed only by the inlined statements.
+
+    Returns
+    -------
+    body : List[ast.stmt]
+        Statements of ``diffeq`` (docstring removed). The ``if self.perturbation:`` block
+        is marked with the name of the flux array.
+    buffer : str, optional
+        Name of the flux array in ``diffeq``, :obj:`None` if ``flux`` is not called.
+    """
+    body: List[ast.stmt] = []
+    buffer = None
+    for stmt in diffeq.body:
+        if _is_docstring(stmt):
+            continue
+        if (
+            isinstance(stmt, ast.Assign)
+            and isinstance(stmt.value, ast.Call)
+            and _is_self_attribute(stmt.value.func, "flux")
+        ):
+            if flux is None or not isinstance(stmt.targets[0], ast.Name):
+                raise CompilationError("Cannot find the definition of flux.")
+            buffer = stmt.targets[0].id
+            if keep_call:
+                body.append(stmt)
+            body.extend(_flux_statements(flux, stmt.value, buffer))
+            continue
+        if isinstance(stmt, ast.If) and _is_self_attribute(stmt.test, "perturbation"):
+            setattr(stmt, PERTURBATION_MARK, buffer)
+        body.append(stmt)
+    return body, buffer
+
+
+def _flux_statements(flux: ast.FunctionDef, call: ast.Call, buffer: str) -> List[ast.stmt]:
+    params = [arg.arg for arg in flux.args.args if arg.arg != "self"]
+    if len(params) != len(call.args) or not all(isinstance(a, ast.Name) for a in call.args):
+        raise CompilationError("self.flux must be called with (t, y, x).")
+    mapping = {p: a.id for p, a in zip(params, call.args)}
+    body: List[ast.stmt] = []
+    local = None
+    for stmt in flux.body:
+        if _is_docstring(stmt):
+            continue
+        if isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Dict):
+            local = stmt.targets[0].id
+            continue
+        if isinstance(stmt, ast.Return):
+            if not (isinstance(stmt.value, ast.Name) and stmt.value.id == local):
+                raise CompilationError("flux must return the dictionary of reaction rates.")
+            continue
+        body.append(stmt)
+    if local is None:
+        raise CompilationError("flux must initialize reaction rates with an empty dict.")
+    mapping[local] = buffer
+    renamer = _Renamer(mapping)
+    return [renamer.visit(stmt) for stmt in body]
+
+
+def _count_fluxes(body: List[ast.stmt], buffer: Optional[str]) -> int:
+    num_fluxes = 0
+    for stmt in body:
+        if hasattr(stmt, PERTURBATION_MARK):
+            continue
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Subscript)
+                and isinstance(node.ctx, ast.Store)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == buffer
+            ):
+                if not isinstance(node.slice, ast.Constant) or not isinstance(
+                    node.slice.value, int
+                ):
+                    raise CompilationError("Reaction indices must be integer literals.")
+                num_fluxes = max(num_fluxes, node.slice.value + 1)
+    return num_fluxes
+
+
+def _function(name: str, args: List[str], body: List[ast.stmt]) -> ast.FunctionDef:
+    return ast.FunctionDef(
+        name=name,
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg) for arg in args],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        body=body,
+        decorator_list=[],
+    )
+
+
+class _Translation(object):
+    """
+    Source code of the jitted functions generated from a model.
+    """
+
+    def __init__(self, problem: object):
+        cls = type(problem)
+        diffeq = parse_function(cls.diffeq)
+        if diffeq.args.vararg is None:
+            raise CompilationError("diffeq must be defined as diffeq(self, t, y, *x).")
+        self.t_name, self.y_name = [arg.arg for arg in diffeq.args.args if arg.arg != "self"][:2]
+        self.x_name = diffeq.args.vararg.arg
+        flux = parse_function(cls.flux) if hasattr(cls, "flux") else None
+        body, buffer = inline_flux(diffeq, flux, keep_call=False)
+        self.modules = list(
+            dict.fromkeys(
+                [cls.flux.__module__, cls.diffeq.__module__] if flux else [cls.diffeq.__module__]
+            )
+        )
+        namespace: dict = {}
+        for name in self.modules:
+            namespace.update(vars(import_module(name)))
+        self.indices = get_indices(namespace)
+        self.num_species = self.indices["V"]["NUM"]
+        self.num_fluxes = _count_fluxes(body, buffer)
+
+        self.output: Optional[str] = None
+        statements: List[ast.stmt] = []
+        for stmt in body:
+            if hasattr(stmt, PERTURBATION_MARK):
+                block = ast.parse(
+                    "if _scaled:\n"
+                    "    for _i in range(_v.shape[0]):\n"
+                    "        _v[_i] = _v[_i] * _scale[_i]\n"
+                ).body[0]
+                setattr(block, PERTURBATION_MARK, "_v")
+                statements.append(block)
+                continue
+            if isinstance(stmt, ast.Assign) and is_list_allocation(stmt.value):
+                stmt.value = ast.parse(f"np.zeros_like({self.y_name})", mode="eval").body
+                self.output = stmt.targets[0].id
+            statements.append(stmt)
+        if buffer is not None:
+            statements = [_Renamer({buffer: "_v"}).visit(stmt) for stmt in statements]
+        self.body = statements
+        self.helpers = self._find_helpers(cls)
+
+    def _find_helpers(self, cls: type) -> List[ast.FunctionDef]:
+        names: List[str] = []
+        module = ast.Module(body=self.body, type_ignores=[])
+        _HelperCalls(names).visit(module)
+        helpers = []
+        for name in dict.fromkeys(names):
+            attr = inspect.getattr_static(cls, name, None)
+            if not isinstance(attr, staticmethod):
+                raise CompilationError(
+                    f"self.{name} cannot be compiled. Only staticmethods can be called in diffeq."
+                )
+            helper = parse_function(attr.__func__)
+            helper.name = f"_{name}"
+            helpers.append(helper)
+        return helpers
+
+    @property
+    def args(self) -> List[str]:
+        return [self.t_name, self.y_name, self.x_name, "_scale", "_scaled", "_v"]
+
+    def differentiate(self, structural: bool = False) -> Tuple[List[ast.stmt], Dict]:
+        """
+        Forward-mode differentiation of the right-hand side with respect to y.
+        """
+        if self.output is None:
+            raise NotDifferentiableError("dydt must be initialized as [0] * V.NUM.")
+        ad = ForwardDiff(
+            {self.y_name: self.num_species},
+            self.indices,
+            lambda base, idx: str(idx),
+            structural=structural,
+            drop_primal=set() if reads(self.body, self.output) else {self.output},
+            scale=lambda i: ast.parse(f"_scale[{i:d}]", mode="eval").body,
+        )
+        statements = ad.visit(self.body)
+        entries = {(row, col[1]): name for (row, col), name in ad.outputs(self.output).items()}
+        return statements, entries
+
+    def source(self, jac_body: Optional[List[ast.stmt]]) -> str:
+        functions = list(self.helpers)
+        functions.append(_function("_rhs", self.args, self.body))
+        if jac_body is not None:
+            functions.append(_function("_jac", self.args, jac_body))
+        module = ast.Module(body=functions, type_ignores=[])
+        module = _IndexResolver(self.indices).visit(module)
+        for node in ast.walk(module):
+            if isinstance(node, ast.Name) and node.id == "self":
+                raise CompilationError(
+                    f"line {getattr(node, 'lineno', '?')}: "
+                    "'self' cannot be used in compiled diffeq."
+                )
+        ast.fix_missing_locations(module)
+        return ast.unparse(module)
+
+
+def _jit(source: str, modules: List[str]) -> Dict[str, Callable]:
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    if key not in _DISPATCHERS:
+        namespace: dict = {}
+        for name in modules:
+            namespace.update(vars(import_module(name)))
+        namespace["np"] = np
+        exec(compile(source, f"<biomass-compiled-{key[:8]}>", "exec"), namespace)
+        for node in ast.parse(source).body:
+            namespace[node.name] = njit(namespace[node.name])
+        _DISPATCHERS[key] = {
+            name: namespace[name] for name in ("_rhs", "_jac") if name in namespace
+        }
+    return _DISPATCHERS[key]
+
+
+class CompiledDiffeq(object):
+    """
+    Jitted right-hand side of the differential equations over flat NumPy arrays.
+
+    Instances are drop-in replacements for ``DifferentialEquation.diffeq``, i.e.,
+    ``f(t, y, *x)``, and :func:`biomass.dynamics.solver.solve_ode` calls the jitted
+    function directly via :meth:`bind` without unpacking parameters at every step.
+
+    Attributes
+    ----------
+    owner : object
+        Model object whose ``perturbation`` is applied to reaction rates.
+    source : str
+        Generated source code of the jitted functions.
+    num_fluxes : int
+        Size of the flux buffer, i.e., the largest reaction index + 1.
+    num_species : int
+        Number of species.
+    jac_sparsity : scipy.sparse.csc_matrix, optional
+        Sparsity structure of the Jacobian matrix.
+    """
+
+    def __init__(
+        self,
+        owner: object,
+        source: str,
+        num_fluxes: int,
+        num_species: int,
+        modules: List[str],
+        jac_entries: Optional[List[Tuple[int, int]]] = None,
+    ):
+        self.owner = owner
+        self.source = source
+        self.num_fluxes = num_fluxes
+        self.num_species = num_species
+        self._modules = modules
+        self._functions = _jit(source, modules)
+        self._flux_buffer = np.zeros(max(num_fluxes, 1))
+        self._scale = np.ones(max(num_fluxes, 1))
+        self.jac_sparsity: Optional[csc_matrix] = None
+        if jac_entries is not None:
+            self.jac_sparsity = sparsity_pattern(jac_entries, num_species)
+            self._jac_indices = self.jac_sparsity.indices
+            self._jac_indptr = self.jac_sparsity.indptr
+            # Order of entries returned by _jac (column-major)
+            order = sorted(jac_entries, key=lambda entry: (entry[1], entry[0]))
+            self._jac_rows = np.array([row for row, _ in order], dtype=np.intp)
+            self._jac_cols = np.array([col for _, col in order], dtype=np.intp)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_functions"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._functions = _jit(self.source, self._modules)
+
+    @property
+    def has_jacobian(self) -> bool:
+        """Whether the analytic Jacobian matrix is available."""
+        return "_jac" in self._functions
+
+    def _get_scale(self) -> Tuple[np.ndarray, bool]:
+        perturbation = getattr(self.owner, "perturbation", None)
+        if not perturbation:
+            return self._scale, False
+        # Rebuilt at every call, as factors can be changed in place between simulations
+        scale = np.ones(max(self.num_fluxes, 1))
+        for i, dv in perturbation.items():
+            scale[i] = dv
+        return scale, True
+
+    def bind(self, f_params: Tuple[float, ...]) -> Callable[[float, np.ndarray], np.ndarray]:
+        """
+        Fix model parameters and return ``f(t, y)``.
+        """
+        x = np.asarray(f_params, dtype=np.float64)
+        scale, scaled = self._get_scale()
+        v = self._flux_buffer
+        rhs = self._functions["_rhs"]
+
+        def fun(t: float, y: np.ndarray) -> np.ndarray:
+            return rhs(t, np.real(y).astype(np.float64, copy=False), x, scale, scaled, v)
+
+        return fun
+
+    def bind_jacobian(
+        self,
+        f_params: Tuple[float, ...],
+        sparse: bool = True,
+    ) -> Callable[[float, np.ndarray], Union[np.ndarray, csc_matrix]]:
+        """
+        Fix model parameters and return the analytic Jacobian ``jac(t, y)``.
+
+        Parameters
+        ----------
+        f_params : tuple
+            Model parameters.
+        sparse : bool (default: :obj:`True`)
+            If :obj:`True`, return ``scipy.sparse.csc_matrix``, otherwise ``numpy.ndarray``.
+        """
+        if not self.has_jacobian:
+            raise CompilationError("The analytic Jacobian is not available.")
+        x = np.asarray(f_params, dtype=np.float64)
+        scale, scaled = self._get_scale()
+        v = self._flux_buffer
+        jac = self._functions["_jac"]
+        n = self.num_species
+        indices, indptr = self._jac_indices, self._jac_indptr
+        rows, cols = self._jac_rows, self._jac_cols
+
+        def jac_sparse(t: float, y: np.ndarray) -> csc_matrix:
+            data = jac(t, np.real(y).astype(np.float64, copy=False), x, scale, scaled, v)
+            return csc_matrix((data, indices, indptr), shape=(n, n))
+
+        def jac_dense(t: float, y: np.ndarray) -> np.ndarray:
+            dense = np.zeros((n, n))
+            dense[rows, cols] = jac(
+                t, np.real(y).astype(np.float64, copy=False), x, scale, scaled, v
+            )
+            return dense
+
+        return jac_sparse if sparse else jac_dense
+
+    def __call__(self, t: float, y: np.ndarray, *x: float) -> np.ndarray:
+        return self.bind(x)(t, np.asarray(y))
+
+
+def compile_diffeq(problem: object, y0: list, x: list) -> CompiledDiffeq:
+    """
+    Convert ``problem.diffeq`` (and ``problem.flux``) into a jitted function.
+    The analytic Jacobian matrix is generated as well if all rate expressions
+    can be differentiated symbolically.
+
+    Parameters
+    ----------
+    problem : object
+        Instance of a model class inheriting ``DifferentialEquation``.
+    y0 : list
+        Initial values used to trigger compilation.
+    x : list
+        Parameter values used to trigger compilation.
+
+    Returns
+    -------
+    compiled : :class:`CompiledDiffeq`
+        Jitted right-hand side.
+
+    Raises
+    ------
+    CompilationError
+        If ``diffeq`` uses features that cannot be compiled in nopython mode.
+    """
+    try:
+        translation = _Translation(problem)
+    except (OSError, TypeError, SyntaxError) as e:
+        raise CompilationError(str(e)) from e
+    jac_body: Optional[List[ast.stmt]] = None
+    jac_entries: Optional[List[Tuple[int, int]]] = None
+    try:
+        statements, entries = translation.differentiate()
+        jac_entries = list(entries)
+        order = sorted(entries, key=lambda entry: (entry[1], entry[0]))
+        jac_body = statements + ast.parse(f"_data = np.empty({len(order):d})").body
+        for k, entry in enumerate(order):
+            jac_body.extend(ast.parse(f"_data[{k:d}] = {entries[entry]}").body)
+        jac_body.extend(ast.parse("return _data").body)
+    except NotDifferentiableError:
+        try:
+            _, entries = translation.differentiate(structural=True)
+            jac_entries = list(entries)
+        except NotDifferentiableError:
+            pass
+    source = translation.source(jac_body)
+    compiled = CompiledDiffeq(
+        problem,
+        source,
+        translation.num_fluxes,
+        translation.num_species,
+        translation.modules,
+        jac_entries,
+    )
+    y = np.asarray(y0, dtype=np.float64)
+    try:
+        dydt = compiled(0.0, y, *x)
+        if compiled.has_jacobian:
+            compiled.bind_jacobian(tuple(x))(0.0, y)
+    except Exception as e:
+        _DISPATCHERS.pop(hashlib.sha1(source.encode("utf-8")).hexdigest(), None)
+        raise CompilationError(f"Numba failed to compile diffeq: {e}") from e
+    if dydt.shape != (translation.num_species,):
+        raise CompilationError(
+            f"diffeq must return {translation.num_species} values, got {dydt.shape}."
+        )
+    return compiled
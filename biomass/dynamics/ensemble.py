@@ -0,0 +1,148 @@
+import warnings
+from typing import Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .solver import EnsembleNotSupported, _is_array_truthiness_error, ensemble
+
+__all__ = ["simulate_batch"]
+
+# Models already warned of being simulated one parameter set at a time
+_serial_models: Set[str] = set()
+
+
+def simulate_batch(
+    problem,
+    X: Union[list, np.ndarray],
+    Y0: Union[list, np.ndarray],
+    *,
+    batch_size: int = 32,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate many parameter sets, integrating up to ``batch_size`` of them as one system.
+
+    ``problem.simulate`` is called once per batch with every parameter and initial value
+    replaced by an array over the batch, so that each evaluation of ``diffeq`` covers all
+    members. Models whose ``simulate`` or ``diffeq`` cannot handle arrays, i.e., those
+    raising :class:`~biomass.dynamics.solver.EnsembleNotSupported`, e.g., for steady-state
+    calculation, or using ``if`` statements on parameter values, are simulated
+    one parameter set at a time, with a warning issued once per model.
+    If the integration of a batch fails, it is split in half until the failing members
+    are isolated.
+
+    Parameters
+    ----------
+    problem : OptimizationProblem
+        ``model.problem``.
+    X : array
+        Parameter values with shape (N, len(x)).
+    Y0 : array
+        Initial values with shape (N, len(y0)), or (len(y0), ) if shared by all parameter sets.
+    batch_size : int (default: 32)
+        Maximum number of parameter sets integrated together.
+
+    Returns
+    -------
+    simulations : ``numpy.ndarray``
+        Simulated values with shape (N, len(obs_names), len(conditions), len(t)).
+        Failed simulations are filled with NaN.
+    success : ``numpy.ndarray``
+        Boolean array of shape (N, ), :obj:`True` if the simulation succeeded.
+
+    Examples
+    --------
+    >>> from biomass import create_model
+    >>> from biomass.dynamics.ensemble import simulate_batch
+    >>> from biomass.models import pan_rtk
+    >>> model = create_model(pan_rtk.__package__)
+    >>> X = np.array(model.pval()) * np.random.lognormal(0, 0.1, (10, len(model.parameters)))
+    >>> simulations, success = simulate_batch(model.problem, X, model.ival())
+    >>> simulations.shape
+    (10, 6, 5, 241)
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    Y0 = np.asarray(Y0, dtype=float)
+    if Y0.ndim == 1:
+        Y0 = np.broadcast_to(Y0, (len(X), Y0.size))
+    if len(Y0) != len(X):
+        raise ValueError("X and Y0 must have the same number of rows.")
+    simulations = np.full(
+        (len(X), len(problem.obs_names), len(problem.conditions), len(problem.t)), np.nan
+    )
+    success = np.zeros(len(X), dtype=bool)
+    for start in range(0, len(X), batch_size):
+        _simulate_members(
+            problem,
+            X,
+            Y0,
+            np.arange(start, min(start + batch_size, len(X))),
+            simulations,
+            success,
+        )
+    return simulations, success
+
+
+def _simulate_members(
+    problem,
+    X: np.ndarray,
+    Y0: np.ndarray,
+    members: np.ndarray,
+    simulations: np.ndarray,
+    success: np.ndarray,
+) -> None:
+    if len(members) > 1:
+        is_successful = _simulate_ensemble(problem, X[members], Y0[members], simulations, members)
+        if is_successful:
+            success[members] = True
+            return
+        elif is_successful is not None:
+            half = len(members) // 2
+            _simulate_members(problem, X, Y0, members[:half], simulations, success)
+            _simulate_members(problem, X, Y0, members[half:], simulations, success)
+            return
+    for i in members:
+        if problem.simulate(X[i].tolist(), Y0[i].tolist()) is None:
+            simulations[i] = problem.simulations
+            success[i] = True
+
+
+def _simulate_ensemble(
+    problem,
+    X: np.ndarray,
+    Y0: np.ndarray,
+    simulations: np.ndarray,
+    members: np.ndarray,
+) -> Optional[bool]:
+    """
+    Run ``problem.simulate`` once for all members.
+    Return :obj:`None` if the model cannot be simulated as an ensemble.
+    Other errors are raised, as they are not specific to ensembles.
+    """
+    stored = problem.simulations
+    problem.simulations = np.empty(
+        (len(problem.obs_names), len(problem.conditions), len(problem.t), len(members))
+    )
+    try:
+        with ensemble(len(members)):
+            is_successful = (
+                problem.simulate([x.copy() for x in X.T], [y.copy() for y in Y0.T]) is None
+            )
+    except (EnsembleNotSupported, ValueError) as e:
+        if isinstance(e, ValueError) and not _is_array_truthiness_error(e):
+            raise
+        model = type(problem).__module__
+        if model not in _serial_models:
+            _serial_models.add(model)
+            warnings.warn(
+                f"{model} is simulated one parameter set at a time: {e}",
+                stacklevel=2,
+            )
+        return None
+    finally:
+        ensemble_simulations = problem.simulations
+        problem.simulations = stored
+    if is_successful:
+        simulations[members] = np.moveaxis(ensemble_simulations, -1, 0)
+    return is_successful
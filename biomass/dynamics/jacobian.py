@@ -0,0 +1,701 @@
+"""Symbolic forward-mode differentiation of model right-hand sides"""
+
+import ast
+import copy
+import inspect
+import textwrap
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from scipy.sparse import csc_matrix
+
+__all__ = [
+    "NotDifferentiableError",
+    "generate_jacobian",
+    "generate_jacobian_from_source",
+    "sparsity_from_stoichiometry",
+]
+
+#: Attribute attached to the ``if self.perturbation:`` block of the right-hand side.
+PERTURBATION_MARK = "_biomass_perturbation"
+
+# Column of a derivative, e.g., ("y", 3) for d/dy[3].
+Column = Tuple[str, int]
+# Differentiated variable: local name or (array name, index).
+Key = Union[str, Tuple[str, int]]
+
+_ZERO = 0.0
+_ONE = 1.0
+
+
+class NotDifferentiableError(Exception):
+    """
+    Error in differentiating the right-hand side symbolically.
+    """
+
+    pass
+
+
+def _const(value: float) -> ast.Constant:
+    return ast.Constant(value)
+
+
+def _is_const(node: ast.expr, value: float) -> bool:
+    return isinstance(node, ast.Constant) and node.value == value
+
+
+def _add(a: Optional[ast.expr], b: Optional[ast.expr]) -> Optional[ast.expr]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return ast.BinOp(a, ast.Add(), b)
+
+
+def _sub(a: Optional[ast.expr], b: Optional[ast.expr]) -> Optional[ast.expr]:
+    if b is None:
+        return a
+    if a is None:
+        return ast.UnaryOp(ast.USub(), b)
+    return ast.BinOp(a, ast.Sub(), b)
+
+
+def _mul(a: ast.expr, b: ast.expr) -> ast.expr:
+    if _is_const(a, _ONE):
+        return b
+    if _is_const(b, _ONE):
+        return a
+    return ast.BinOp(copy.deepcopy(a), ast.Mult(), copy.deepcopy(b))
+
+
+def _div(a: ast.expr, b: ast.expr) -> ast.expr:
+    if _is_const(b, _ONE):
+        return a
+    return ast.BinOp(copy.deepcopy(a), ast.Div(), copy.deepcopy(b))
+
+
+def _call(func: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(
+        func=ast.parse(func, mode="eval").body,
+        args=[copy.deepcopy(arg) for arg in args],
+        keywords=[],
+    )
+
+
+def _func_name(node: ast.expr) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        if node.value.id in ("np", "numpy", "math"):
+            return node.attr
+    return None
+
+
+def _is_container(node: ast.expr) -> bool:
+    """``{}``, ``[0] * V.NUM``, ``np.zeros_like(y)``, etc."""
+    if isinstance(node, (ast.Dict, ast.List)):
+        return True
+    if (
+        isinstance(node, ast.BinOp)
+        and isinstance(node.op, ast.Mult)
+        and isinstance(node.left, ast.List)
+    ):
+        return True
+    return isinstance(node, ast.Call) and _func_name(node.func) in (
+        "zeros",
+        "zeros_like",
+        "empty",
+        "empty_like",
+    )
+
+
+def _is_flux_call(node: ast.expr) -> bool:
+    """``self.flux(t, y, x)``, whose derivatives are given by the inlined statements."""
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "self"
+        and node.func.attr == "flux"
+    )
+
+
+# d f(a) / da
+_DERIVATIVES: Dict[str, Callable[[ast.expr], ast.expr]] = {
+    "exp": lambda a: _call("np.exp", a),
+    "log": lambda a: _div(_const(_ONE), a),
+    "log10": lambda a: _div(_const(_ONE), _mul(a, _const(float(np.log(10.0))))),
+    "sqrt": lambda a: _div(_const(0.5), _call("np.sqrt", a)),
+    "abs": lambda a: _call("np.sign", a),
+    "fabs": lambda a: _call("np.sign", a),
+    "sin": lambda a: _call("np.cos", a),
+    "cos": lambda a: ast.UnaryOp(ast.USub(), _call("np.sin", a)),
+    "tanh": lambda a: ast.BinOp(
+        _const(_ONE), ast.Sub(), ast.BinOp(_call("np.tanh", a), ast.Pow(), _const(2))
+    ),
+}
+
+
+class ForwardDiff(object):
+    """
+    Source-to-source forward-mode differentiation of straight-line code
+    (assignments and ``if`` statements) with respect to the entries of given arrays.
+
+    Attributes
+    ----------
+    wrt : Dict[str, int]
+        Names of arrays to differentiate with respect to, e.g., ``{"y": V.NUM}``.
+    indices : Dict[str, Dict[str, int]]
+        Index of each name in ``C`` and ``V``, used to resolve ``y[V.name]``.
+    name_of : Callable[[str, int], str]
+        Readable name of an array entry, used to name derivative variables.
+    structural : bool
+        If :obj:`True`, only the dependency structure is computed (no code is emitted).
+    drop_primal : Set[str]
+        Arrays whose original assignments are not emitted.
+    scale : Callable[[int], ast.expr], optional
+        Factor applied to a reaction rate inside the perturbation block.
+    """
+
+    def __init__(
+        self,
+        wrt: Dict[str, int],
+        indices: Dict[str, Dict[str, int]],
+        name_of: Callable[[str, int], str],
+        *,
+        structural: bool = False,
+        drop_primal: Optional[Set[str]] = None,
+        scale: Optional[Callable[[int], ast.expr]] = None,
+    ):
+        self.wrt = wrt
+        self.indices = indices
+        self.name_of = name_of
+        self.structural = structural
+        self.drop_primal = set() if drop_primal is None else drop_primal
+        self.scale = scale
+        self.deriv: Dict[Key, Dict[Column, str]] = {}
+
+    # ---------------------------------------------------------------- indices
+
+    def _index(self, node: ast.expr) -> Optional[int]:
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.value, ast.Name)
+            and node.value.id in self.indices
+        ):
+            return self.indices[node.value.id].get(node.attr)
+        return None
+
+    def _key(self, node: ast.expr) -> Key:
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
+            idx = self._index(node.slice)
+            if idx is None:
+                raise NotDifferentiableError(
+                    f"Cannot resolve the index of '{ast.unparse(node)}'. Use an integer or C./V."
+                )
+            return (node.value.id, idx)
+        raise NotDifferentiableError(f"Unsupported assignment target: '{ast.unparse(node)}'.")
+
+    def temp(self, key: Key, column: Column) -> str:
+        """Name of the variable holding d(key)/d(column)."""
+        if isinstance(key, tuple):
+            key = f"{key[0]}_{self.name_of(*key)}"
+        return f"_d_{key}__{column[0]}_{self.name_of(*column)}"
+
+    # ------------------------------------------------------------ expressions
+
+    def _lookup(self, key: Key) -> Dict[Column, ast.expr]:
+        return {col: ast.Name(name, ast.Load()) for col, name in self.deriv.get(key, {}).items()}
+
+    def dependencies(self, node: ast.expr) -> Set[Column]:
+        """Columns on which an expression depends."""
+        deps: Set[Column] = set()
+        for child in ast.walk(node):
+            if isinstance(child, ast.Subscript) and isinstance(child.value, ast.Name):
+                if child.value.id in self.wrt:
+                    idx = self._index(child.slice)
+                    if idx is None:
+                        deps.update((child.value.id, i) for i in range(self.wrt[child.value.id]))
+                    else:
+                        deps.add((child.value.id, idx))
+                else:
+                    idx = self._index(child.slice)
+                    if idx is not None:
+                        deps.update(self.deriv.get((child.value.id, idx), {}))
+                    else:
+                        for key, cols in self.deriv.items():
+                            if isinstance(key, tuple) and key[0] == child.value.id:
+                                deps.update(cols)
+            elif isinstance(child, ast.Name):
+                deps.update(self.deriv.get(child.id, {}))
+        return deps
+
+    def diff(self, node: ast.expr) -> Dict[Column, ast.expr]:
+        """Derivatives of an expression, {column: expression}."""
+        if self.structural:
+            return {col: _const(_ONE) for col in self.dependencies(node)}
+        if isinstance(node, ast.Constant):
+            return {}
+        if isinstance(node, ast.Name):
+            if node.id in self.wrt:
+                raise NotDifferentiableError(f"'{node.id}' must be indexed with C./V.")
+            return self._lookup(node.id)
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
+            if node.value.id in self.wrt:
+                idx = self._index(node.slice)
+                if idx is None:
+                    raise NotDifferentiableError(f"Cannot resolve '{ast.unparse(node)}'.")
+                return {(node.value.id, idx): _const(_ONE)}
+            if not self.dependencies(node):
+                return {}
+            return self._lookup(self._key(node))
+        if isinstance(node, ast.BinOp):
+            return self._diff_binop(node)
+        if isinstance(node, ast.UnaryOp):
+            operand = self.diff(node.operand)
+            if isinstance(node.op, ast.USub):
+                return {col: ast.UnaryOp(ast.USub(), d) for col, d in operand.items()}
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            return {}
+        if isinstance(node, (ast.Compare, ast.BoolOp)):
+            # Piecewise constant
+            return {}
+        if isinstance(node, ast.IfExp):
+            body = self.diff(node.body)
+            orelse = self.diff(node.orelse)
+            return {
+                col: ast.IfExp(
+                    copy.deepcopy(node.test),
+                    body.get(col, _const(_ZERO)),
+                    orelse.get(col, _const(_ZERO)),
+                )
+                for col in {**body, **orelse}
+            }
+        if isinstance(node, ast.Call):
+            return self._diff_call(node)
+        if self.dependencies(node):
+            raise NotDifferentiableError(f"Cannot differentiate '{ast.unparse(node)}'.")
+        return {}
+
+    def _diff_binop(self, node: ast.BinOp) -> Dict[Column, ast.expr]:
+        a, b = node.left, node.right
+        da, db = self.diff(a), self.diff(b)
+        cols = list({**da, **db})
+        if isinstance(node.op, ast.Add):
+            return {col: _add(da.get(col), db.get(col)) for col in cols}
+        if isinstance(node.op, ast.Sub):
+            return {col: _sub(da.get(col), db.get(col)) for col in cols}
+        if isinstance(node.op, ast.Mult):
+            return {
+                col: _add(
+                    _mul(da[col], b) if col in da else None,
+                    _mul(a, db[col]) if col in db else None,
+                )
+                for col in cols
+            }
+        if isinstance(node.op, ast.Div):
+            return {
+                col: _sub(
+                    _div(da[col], b) if col in da else None,
+                    (
+                        _div(_mul(a, db[col]), ast.BinOp(copy.deepcopy(b), ast.Pow(), _const(2)))
+                        if col in db
+                        else None
+                    ),
+                )
+                for col in cols
+            }
+        if isinstance(node.op, ast.Pow):
+            result: Dict[Column, ast.expr] = {}
+            for col in cols:
+                term = None
+                if col in da:
+                    if _is_const(b, 2) or _is_const(b, 2.0):
+                        factor: ast.expr = _mul(_const(2.0), a)
+                    elif _is_const(b, 1) or _is_const(b, 1.0):
+                        factor = _const(_ONE)
+                    else:
+                        factor = _mul(
+                            b,
+                            ast.BinOp(
+                                copy.deepcopy(a),
+                                ast.Pow(),
+                                ast.BinOp(copy.deepcopy(b), ast.Sub(), _const(1)),
+                            ),
+                        )
+                    term = _mul(factor, da[col])
+                if col in db:
+                    term = _add(
+                        term,
+                        _mul(_mul(copy.deepcopy(node), _call("np.log", a)), db[col]),
+                    )
+                result[col] = term
+            return result
+        if da or db:
+            raise NotDifferentiableError(f"Cannot differentiate '{ast.unparse(node)}'.")
+        return {}
+
+    def _diff_call(self, node: ast.Call) -> Dict[Column, ast.expr]:
+        args = [self.diff(arg) for arg in node.args]
+        if not any(args) and not any(self.dependencies(kw.value) for kw in node.keywords):
+            return {}
+        name = _func_name(node.func)
+        if name == "power" and len(node.args) == 2:
+            return self._diff_binop(ast.BinOp(node.args[0], ast.Pow(), node.args[1]))
+        if name in _DERIVATIVES and len(node.args) == 1 and not node.keywords:
+            outer = _DERIVATIVES[name](node.args[0])
+            return {col: _mul(outer, d) for col, d in args[0].items()}
+        raise NotDifferentiableError(f"Cannot differentiate '{ast.unparse(node)}'.")
+
+    # ------------------------------------------------------------- statements
+
+    def _assign(self, target: ast.expr, value: ast.expr, stmt: ast.stmt) -> List[ast.stmt]:
+        if isinstance(target, ast.Subscript) and isinstance(target.value, ast.Name):
+            if target.value.id in self.wrt:
+                raise NotDifferentiableError(f"Cannot assign to '{ast.unparse(target)}'.")
+        key = self._key(target)
+        derivatives = self.diff(value)
+        emitted: List[ast.stmt] = []
+        names: Dict[Column, str] = {}
+        for col, d in derivatives.items():
+            names[col] = self.temp(key, col)
+            if not self.structural:
+                emitted.append(ast.Assign([ast.Name(names[col], ast.Store())], d))
+        self.deriv[key] = names
+        if self.structural:
+            return []
+        if not (isinstance(key, tuple) and key[0] in self.drop_primal):
+            emitted.append(stmt)
+        return emitted
+
+    def _merge(self, branches: List[Tuple[List[ast.stmt], dict]]) -> None:
+        keys = set().union(*(state.keys() for _, state in branches))
+        merged: Dict[Key, Dict[Column, str]] = {}
+        for key in keys:
+            cols = set().union(*(state.get(key, {}).keys() for _, state in branches))
+            merged[key] = {col: self.temp(key, col) for col in cols}
+            if self.structural:
+                continue
+            for stmts, state in branches:
+                for col in sorted(cols - set(state.get(key, {}))):
+                    stmts.append(
+                        ast.Assign([ast.Name(self.temp(key, col), ast.Store())], _const(_ZERO))
+                    )
+        self.deriv = merged
+
+    def _perturbation(self, stmt: ast.If) -> List[ast.stmt]:
+        if self.structural:
+            return []
+        scaling: List[ast.stmt] = []
+        buffer = getattr(stmt, PERTURBATION_MARK)
+        for key, cols in self.deriv.items():
+            if isinstance(key, tuple) and key[0] == buffer and self.scale is not None:
+                for name in cols.values():
+                    scaling.append(
+                        ast.Assign(
+                            [ast.Name(name, ast.Store())],
+                            _mul(ast.Name(name, ast.Load()), self.scale(key[1])),
+                        )
+                    )
+        primal = [] if buffer in self.drop_primal else [stmt]
+        if not scaling:
+            return primal
+        return primal + [ast.If(copy.deepcopy(stmt.test), scaling, [])]
+
+    def visit(self, body: List[ast.stmt]) -> List[ast.stmt]:
+        """Return statements computing both original values and derivatives."""
+        emitted: List[ast.stmt] = []
+        for stmt in body:
+            if isinstance(stmt, ast.Assign):
+                if len(stmt.targets) != 1:
+                    raise NotDifferentiableError("Chained assignment is not supported.")
+                target = stmt.targets[0]
+                if isinstance(target, ast.Name) and (
+                    _is_container(stmt.value) or _is_flux_call(stmt.value)
+                ):
+                    if target.id not in self.drop_primal:
+                        emitted.append(stmt)
+                    continue
+                emitted.extend(self._assign(target, stmt.value, stmt))
+            elif isinstance(stmt, ast.AugAssign):
+                load = copy.deepcopy(stmt.target)
+                for node in ast.walk(load):
+                    if hasattr(node, "ctx"):
+                        node.ctx = ast.Load()
+                value = ast.BinOp(load, stmt.op, stmt.value)
+                emitted.extend(self._assign(stmt.target, value, ast.Assign([stmt.target], value)))
+            elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+                emitted.extend(
+                    self._assign(stmt.target, stmt.value, ast.Assign([stmt.target], stmt.value))
+                )
+            elif isinstance(stmt, ast.If) and hasattr(stmt, PERTURBATION_MARK):
+                emitted.extend(self._perturbation(stmt))
+            elif isinstance(stmt, ast.If):
+                before = dict(self.deriv)
+                branches = []
+                for block in (stmt.body, stmt.orelse):
+                    self.deriv = dict(before)
+                    stmts = self.visit(block)
+                    branches.append((stmts, self.deriv))
+                self._merge(branches)
+                if not self.structural:
+                    emitted.append(
+                        ast.If(stmt.test, branches[0][0] or [ast.Pass()], branches[1][0])
+                    )
+            elif isinstance(stmt, (ast.Pass, ast.Return)):
+                continue
+            elif isinstance(stmt, ast.Expr) and not self.dependencies(stmt.value):
+                continue
+            else:
+                raise NotDifferentiableError(
+                    f"Unsupported statement: '{ast.unparse(stmt).splitlines()[0]}'."
+                )
+        return emitted
+
+    def outputs(self, array: str) -> Dict[Tuple[int, Column], str]:
+        """Derivatives of array entries, {(row, column): variable name}."""
+        return {
+            (key[1], col): name
+            for key, cols in self.deriv.items()
+            if isinstance(key, tuple) and key[0] == array
+            for col, name in cols.items()
+        }
+
+
+def sparsity_pattern(entries: List[Tuple[int, int]], n: int) -> csc_matrix:
+    """
+    Return a boolean sparse matrix with nonzero ``entries``, (row, column).
+    """
+    rows = [row for row, _ in entries]
+    cols = [col for _, col in entries]
+    return csc_matrix((np.ones(len(entries), dtype=bool), (rows, cols)), shape=(n, n))
+
+
+def sparsity_from_stoichiometry(
+    stoichiometry_matrix: csc_matrix,
+    rate_dependencies: List[Set[int]],
+) -> csc_matrix:
+    """
+    Sparsity structure of the Jacobian matrix, d(dydt)/dy = S dv/dy.
+
+    Parameters
+    ----------
+    stoichiometry_matrix : scipy.sparse matrix
+        Species x reactions stoichiometry matrix.
+    rate_dependencies : List[Set[int]]
+        Indices of species on which each rate equation depends.
+
+    Returns
+    -------
+    jac_sparsity : scipy.sparse.csc_matrix
+        Boolean matrix, True where the Jacobian can be nonzero.
+    """
+    n_species, n_reactions = stoichiometry_matrix.shape
+    if len(rate_dependencies) != n_reactions:
+        raise ValueError("rate_dependencies must be given for each reaction.")
+    dvdy = np.zeros((n_reactions, n_species), dtype=bool)
+    for i, deps in enumerate(rate_dependencies):
+        dvdy[i, list(deps)] = True
+    pattern = (abs(stoichiometry_matrix) @ csc_matrix(dvdy.astype(int))) != 0
+    return csc_matrix(pattern)
+
+
+def _method_source(
+    diffeq: ast.FunctionDef,
+    flux: Optional[ast.FunctionDef],
+    indices: Dict[str, Dict[str, int]],
+    species: List[str],
+    jac_sparsity: Optional[csc_matrix] = None,
+    indentation: str = " " * 4,
+) -> str:
+    """
+    Python source of ``jacobian(self, t, y, *x)`` and ``jac_sparsity()`` methods.
+    """
+    from .compiler import CompilationError, inline_flux
+
+    y_name = [arg.arg for arg in diffeq.args.args if arg.arg != "self"][1]
+    for keep_call in (False, True):
+        try:
+            body, buffer = inline_flux(diffeq, flux, keep_call=keep_call)
+        except CompilationError as e:
+            raise NotDifferentiableError(str(e)) from e
+        dydt = _output_array(body)
+        drop_primal = set() if reads(body, dydt) else {dydt}
+        if buffer is not None and not keep_call:
+            drop_primal.add(buffer)
+        ad = ForwardDiff(
+            {y_name: len(species)},
+            indices,
+            lambda base, idx: species[idx] if base in (y_name, dydt) else str(idx),
+            drop_primal=drop_primal,
+            scale=lambda i: ast.parse(f"self.perturbation.get({i:d}, 1)", mode="eval").body,
+        )
+        statements = ad.visit(body)
+        # Reaction rates are computed only if derivatives depend on them.
+        if buffer is None or not reads(statements, buffer):
+            break
+    entries = ad.outputs(dydt)
+    lines = [
+        "def jacobian(self, t, y, *x):",
+        f'{indentation}"""Analytic Jacobian matrix of diffeq, d(dydt)/dy."""',
+    ]
+    module = ast.fix_missing_locations(ast.Module(body=statements, type_ignores=[]))
+    lines.extend(indentation + line for line in ast.unparse(module).splitlines())
+    lines.append(f"{indentation}jac = np.zeros((V.NUM, V.NUM))")
+    for (row, (_, col)), name in sorted(entries.items()):
+        lines.append(f"{indentation}jac[V.{species[row]}, V.{species[col]}] = {name}")
+    lines.append(f"{indentation}return jac")
+    lines.append("")
+    nonzero = {(row, col) for row, (_, col) in entries}
+    if jac_sparsity is not None:
+        nonzero.update(zip(*jac_sparsity.nonzero()))
+    lines.extend(_sparsity_source(sorted(nonzero), species))
+    return "\n".join(lines)
+
+
+def _sparsity_source(
+    entries: List[Tuple[int, int]],
+    species: List[str],
+    indentation: str = " " * 4,
+) -> List[str]:
+    lines = [
+        "@staticmethod",
+        "def jac_sparsity():",
+        f'{indentation}"""Sparsity structure of the Jacobian matrix (1: nonzero)."""',
+        f"{indentation}sparsity = np.zeros((V.NUM, V.NUM), dtype=int)",
+    ]
+    rows: Dict[int, List[int]] = {}
+    for row, col in entries:
+        rows.setdefault(row, []).append(col)
+    for row, cols in sorted(rows.items()):
+        targets = ", ".join(f"V.{species[col]}" for col in cols)
+        lines.append(f"{indentation}sparsity[V.{species[row]}, [{targets}]] = 1")
+    lines.append(f"{indentation}return sparsity")
+    return lines
+
+
+def _output_array(body: List[ast.stmt]) -> str:
+    """Name of the list allocated as ``[0] * V.NUM`` (dydt)."""
+    from .compiler import is_list_allocation
+
+    for stmt in body:
+        if (
+            isinstance(stmt, ast.Assign)
+            and isinstance(stmt.targets[0], ast.Name)
+            and is_list_allocation(stmt.value)
+        ):
+            return stmt.targets[0].id
+    raise NotDifferentiableError("dydt must be initialized as [0] * V.NUM.")
+
+
+def reads(body: List[ast.stmt], array: str) -> bool:
+    """Whether entries of ``array`` are loaded in ``body`` (except for perturbation)."""
+    for stmt in body:
+        if hasattr(stmt, PERTURBATION_MARK):
+            continue
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Subscript)
+                and isinstance(node.ctx, ast.Load)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == array
+            ):
+                return True
+    return False
+
+
+def generate_jacobian(problem: object) -> str:
+    """
+    Generate the source code of an analytic Jacobian for a hand-written model.
+
+    The returned ``jacobian(self, t, y, *x)`` and ``jac_sparsity()`` methods can be pasted
+    into ``DifferentialEquation`` in ``ode.py``; :func:`biomass.dynamics.solver.solve_ode` and
+    :func:`biomass.dynamics.solver.get_steady_state` use them automatically.
+    ``numpy`` must be imported as ``np`` in ``ode.py``.
+
+    Parameters
+    ----------
+    problem : object
+        Instance of a model class inheriting ``DifferentialEquation``,
+        e.g., ``model.problem``.
+
+    Returns
+    -------
+    source : str
+        Source code of the methods (not indented).
+
+    Raises
+    ------
+    NotDifferentiableError
+        If ``diffeq`` contains expressions which cannot be differentiated symbolically.
+
+    Examples
+    --------
+    >>> from biomass import create_model
+    >>> from biomass.dynamics.jacobian import generate_jacobian
+    >>> from biomass.models import mapk_cascade
+    >>> model = create_model(mapk_cascade.__package__)
+    >>> print(generate_jacobian(model.problem))
+    """
+    from .compiler import get_indices, parse_function
+
+    cls = type(problem)
+    diffeq = parse_function(cls.diffeq)
+    flux = parse_function(cls.flux) if hasattr(cls, "flux") else None
+    indices = get_indices(vars(inspect.getmodule(cls.diffeq)))
+    species = [
+        name for name, _ in sorted(indices["V"].items(), key=lambda kv: kv[1]) if name != "NUM"
+    ]
+    return _method_source(diffeq, flux, indices, species)
+
+
+def generate_jacobian_from_source(
+    ode_source: str,
+    reaction_network_source: str,
+    parameters: List[str],
+    species: List[str],
+    jac_sparsity: Optional[csc_matrix] = None,
+) -> str:
+    """
+    Generate ``jacobian`` and ``jac_sparsity`` methods from the source code of
+    ``ode.py`` and ``reaction_network.py``. Used in :class:`biomass.construction.Text2Model`.
+
+    Parameters
+    ----------
+    ode_source, reaction_network_source : str
+        Source code of ``ode.py`` and ``reaction_network.py``.
+    parameters, species : List[str]
+        Names of parameters and species, ordered as in ``name2idx``.
+    jac_sparsity : scipy.sparse matrix, optional
+        Sparsity structure added to the one found by differentiation,
+        e.g., the result of :func:`sparsity_from_stoichiometry`.
+
+    Returns
+    -------
+    source : str
+        Source code of the methods (not indented).
+    """
+
+    def find(source: str, name: str) -> Optional[ast.FunctionDef]:
+        for node in ast.walk(ast.parse(textwrap.dedent(source))):
+            if isinstance(node, ast.FunctionDef) and node.name == name:
+                node.decorator_list = []
+                node.returns = None
+                return node
+        return None
+
+    diffeq = find(ode_source, "diffeq")
+    if diffeq is None:
+        raise NotDifferentiableError("diffeq is not defined in ode.py.")
+    indices = {
+        "C": {**{name: i for i, name in enumerate(parameters)}, "NUM": len(parameters)},
+        "V": {**{name: i for i, name in enumerate(species)}, "NUM": len(species)},
+    }
+    return _method_source(
+        diffeq, find(reaction_network_source, "flux"), indices, species, jac_sparsity
+    )
@@ -0,0 +1,83 @@
+from typing import Iterator, Mapping, MutableMapping, Optional, Tuple
+
+import numpy as np
+
+__all__ = ["FluxScaling"]
+
+
+class FluxScaling(MutableMapping):
+    """
+    Factors by which reaction rates are multiplied, ``v[i] * factors[i]``,
+    stored in a preallocated array.
+
+    Only factors other than 1 are items of the mapping, so that an instance is falsy
+    when no reaction is perturbed and :meth:`apply` touches perturbed rates only.
+    Setting a factor to 1 or deleting it resets the reaction.
+
+    Parameters
+    ----------
+    perturbation : Mapping[int, float], optional
+        Initial factors, keyed by reaction index.
+    num_fluxes : int (default: 0)
+        Size of the preallocated array, which is extended when a larger index is set.
+
+    Examples
+    --------
+    >>> from biomass.dynamics.perturbation import FluxScaling
+    >>> scaling = FluxScaling(num_fluxes=4)
+    >>> scaling[2] = 1.01
+    >>> scaling
+    FluxScaling({2: 1.01})
+    >>> v = scaling.apply({1: 1.0, 2: 1.0, 3: 1.0})
+    >>> scaling.reset()
+    >>> bool(scaling)
+    False
+    """
+
+    def __init__(
+        self, perturbation: Optional[Mapping[int, float]] = None, num_fluxes: int = 0
+    ) -> None:
+        self.factors = np.ones(num_fluxes)
+        self._perturbed: Tuple[int, ...] = ()
+        if perturbation:
+            self.update(perturbation)
+
+    def __getitem__(self, i: int) -> float:
+        if i not in self._perturbed:
+            raise KeyError(i)
+        return float(self.factors[i])
+
+    def __setitem__(self, i: int, dv: float) -> None:
+        if i >= len(self.factors):
+            self.factors = np.concatenate([self.factors, np.ones(i + 1 - len(self.factors))])
+        self.factors[i] = dv
+        self._perturbed = tuple(np.flatnonzero(self.factors != 1).tolist())
+
+    def __delitem__(self, i: int) -> None:
+        if i not in self._perturbed:
+            raise KeyError(i)
+        self[i] = 1.0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._perturbed)
+
+    def __len__(self) -> int:
+        return len(self._perturbed)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def reset(self) -> None:
+        """
+        Set every factor to 1.
+        """
+        self.factors[:] = 1.0
+        self._perturbed = ()
+
+    def apply(self, v):
+        """
+        Multiply the perturbed reaction rates in ``v`` in place and return ``v``.
+        """
+        for i in self._perturbed:
+            v[i] = v[i] * self.factors[i]
+        return v
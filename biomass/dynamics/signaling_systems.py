@@ -1,13 +1,17 @@
+import multiprocessing
 import os
 import sys
 import warnings
 from dataclasses import dataclass
-from typing import List
+from multiprocessing.pool import Pool
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 
+from ..estimation.results_store import StoredResults
 from ..model_object import ModelObject
-from .temporal_dynamics import TemporalDynamics
+from .ensemble import simulate_batch
+from .temporal_dynamics import TemporalDynamics, _call_in_worker, _init_worker
 
 
 @dataclass
@@ -20,10 +24,46 @@ class SignalingSystems(TemporalDynamics):
         viz_type: str,
         show_all: bool,
         stdev: bool,
+        n_proc: int = 1,
+        figures: bool = True,
     ) -> None:
         """
         Run simulation and save figures.
+
+        If ``n_proc`` > 1, batches of parameter sets are simulated and figures are rendered
+        in a pool of ``n_proc`` worker processes, each creating the model from ``model.path``.
+        If ``figures`` is :obj:`False`, only ``simulation_data/`` is written.
         """
+        if n_proc < 1:
+            raise ValueError("n_proc must be a positive integer.")
+        pool = (
+            None
+            if n_proc == 1
+            else multiprocessing.Pool(
+                processes=n_proc,
+                initializer=_init_worker,
+                initargs=(
+                    self.model.path.replace(os.sep, "."),
+                    self.model.is_compiled,
+                    type(self),
+                ),
+            )
+        )
+        try:
+            self._simulate_all(viz_type, show_all, stdev, figures, pool)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    def _simulate_all(
+        self,
+        viz_type: str,
+        show_all: bool,
+        stdev: bool,
+        figures: bool,
+        pool: Optional[Pool],
+    ) -> None:
         n_file: List[int] = (
             [] if viz_type in ["original", "experiment"] else self.model.get_executable()
         )
@@ -47,14 +87,20 @@ class SignalingSystems(TemporalDynamics):
             if len(n_file) > 0:
                 if len(n_file) == 1 and viz_type == "average":
                     raise ValueError(f"viz_type should be 'best', not '{viz_type}'.")
+                results = self.model.results_store.get_many(n_file)
+                optimized = [self.model.problem.update(values) for values in results.values]
+                simulations, success = self._simulate_paramsets(
+                    [x for x, _ in optimized], [y0 for _, y0 in optimized], pool
+                )
                 for j, nth_paramset in enumerate(n_file):
-                    if self._validate(nth_paramset):
-                        for i, _ in enumerate(self.model.observables):
-                            simulations_all[i, j] = self.model.problem.simulations[i]
+                    if success[j]:
+                        simulations_all[:, j] = simulations[j]
+                    else:
+                        warnings.warn(f"Simulation failed. #{nth_paramset:d}", RuntimeWarning)
                 # simulations_all : numpy array
                 # All simulated values with estimated parameter sets.
                 self._save_simulations(viz_type, simulations_all)
-                best_fitness_all = self._get_best_objval(n_file)
+                best_fitness_all = self._get_best_objval(results)
                 best_paramset = n_file[np.argmin(best_fitness_all)]
                 self._write_best_fit_param(best_paramset)
                 if viz_type == "average":
@@ -78,7 +124,45 @@ class SignalingSystems(TemporalDynamics):
                 # Simulated values with original parameter values.
                 self._save_simulations(viz_type, self.model.problem.simulations)
 
-        self.plot_timecourse(n_file, viz_type, show_all, stdev, simulations_all)
+        if figures:
+            self.plot_timecourse(n_file, viz_type, show_all, stdev, simulations_all, pool)
+
+    def _simulate_paramsets(
+        self,
+        X: List[np.ndarray],
+        Y0: List[np.ndarray],
+        pool: Optional[Pool],
+        batch_size: int = 32,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Simulate parameter sets with :func:`~biomass.dynamics.ensemble.simulate_batch`,
+        one batch per task in the worker processes of ``pool`` if given.
+        Batches are the same as in a single process, so are the results.
+        """
+        if pool is None or len(X) <= batch_size:
+            return self._simulate_batch(X, Y0, batch_size)
+        results = pool.map(
+            _call_in_worker,
+            [
+                (
+                    "_simulate_batch",
+                    (X[start : start + batch_size], Y0[start : start + batch_size], batch_size),
+                )
+                for start in range(0, len(X), batch_size)
+            ],
+        )
+        return (
+            np.concatenate([simulations for simulations, _ in results]),
+            np.concatenate([success for _, success in results]),
+        )
+
+    def _simulate_batch(
+        self,
+        X: Union[list, np.ndarray],
+        Y0: Union[list, np.ndarray],
+        batch_size: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return simulate_batch(self.model.problem, X, Y0, batch_size=batch_size)
 
     def _preprocessing(self, simulated_values: np.ndarray) -> np.ndarray:
         """
@@ -115,29 +199,12 @@ class SignalingSystems(TemporalDynamics):
             self._preprocessing(simulated_values),
         )
 
-    def _get_best_objval(self, n_file: List[int]) -> np.ndarray:
+    @staticmethod
+    def _get_best_objval(results: StoredResults) -> np.ndarray:
         """
         Get best objective function values from parameter estimation results (out/).
         """
-        best_fitness_all = np.full(len(n_file), np.inf)
-        for i, nth_paramset in enumerate(n_file):
-            if os.path.isfile(
-                os.path.join(
-                    self.model.path,
-                    "out",
-                    f"{nth_paramset:d}",
-                    "best_fitness.npy",
-                )
-            ):
-                best_fitness_all[i] = np.load(
-                    os.path.join(
-                        self.model.path,
-                        "out",
-                        f"{nth_paramset:d}",
-                        "best_fitness.npy",
-                    )
-                )
-        return best_fitness_all
+        return np.where(np.isnan(results.best_fitness), np.inf, results.best_fitness)
 
     def _validate(self, nth_paramset: int) -> bool:
         """
@@ -1,14 +1,251 @@
+import hashlib
 import inspect
 import math
 import sys
 import time
-from typing import Callable, List, Literal, Optional, Tuple, Union
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from scipy.integrate import OdeSolver, ode, solve_ivp
 from scipy.integrate._ivp.ivp import OdeResult
+from scipy.sparse import csc_matrix, identity, kron
 
-__all__ = ["solve_ode", "get_steady_state"]
+from .compiler import CompiledDiffeq
+
+__all__ = [
+    "solve_ode",
+    "solve_forward_sensitivity",
+    "get_steady_state",
+    "SteadyStateCache",
+    "EnsembleNotSupported",
+]
+
+# Number of parameter sets integrated together, see :func:`ensemble`.
+_ensemble_size: ContextVar[Optional[int]] = ContextVar("_ensemble_size", default=None)
+
+
+class EnsembleNotSupported(Exception):
+    """
+    Raised inside :func:`ensemble` by computations that cannot handle
+    many parameter sets at once, e.g., steady-state calculation.
+    Models may raise it from ``simulate`` to be simulated one parameter set at a time.
+    """
+
+    pass
+
+
+def _is_array_truthiness_error(exc: Exception) -> bool:
+    """
+    Whether ``exc`` comes from ``if`` statements on arrays, e.g., on parameter values
+    in ``diffeq``, which then cannot be evaluated for many parameter sets or states at once.
+    """
+    return isinstance(exc, ValueError) and "truth value of an array" in str(exc)
+
+
+@contextmanager
+def ensemble(n_members: int) -> Iterator[None]:
+    """
+    Make :func:`solve_ode` integrate ``n_members`` parameter sets as one system.
+
+    Inside this context, every element of ``y0`` and ``f_params`` is either a scalar shared by
+    all members or an array of length ``n_members``. ``diffeq`` receives ``y`` with shape
+    ``(n_species, n_members)`` and ``sol.y`` has shape ``(n_species, len(t), n_members)``.
+    """
+    token = _ensemble_size.set(n_members)
+    try:
+        yield
+    finally:
+        _ensemble_size.reset(token)
+
+
+# Default tolerances of solve_ode, see :func:`tolerance`.
+_tolerance: ContextVar[Tuple[float, float]] = ContextVar("_tolerance", default=(1e-8, 1e-8))
+
+
+@contextmanager
+def tolerance(rtol: float, atol: float) -> Iterator[None]:
+    """
+    Change the default ``rtol`` and ``atol`` of :func:`solve_ode`,
+    e.g., to screen parameter sets at low accuracy.
+
+    Tolerances given in ``options`` of :func:`solve_ode` take precedence.
+    """
+    token = _tolerance.set((rtol, atol))
+    try:
+        yield
+    finally:
+        _tolerance.reset(token)
+
+
+class SteadyStateCache(object):
+    """
+    Bounded LRU cache of steady states computed by :func:`get_steady_state`.
+
+    Entries are keyed by a hash of the model, initial values, parameter values,
+    reaction perturbation and solver settings. Only successful results are stored.
+
+    Parameters
+    ----------
+    maxsize : int (default: 128)
+        Maximum number of steady states to keep.
+    warm_start : bool (default: :obj:`False`)
+        If :obj:`True`, Newton's method (``method='newton'`` of :func:`get_steady_state`)
+        on a cache miss starts from the cached steady state of the nearest parameter vector
+        which shares everything else in the key.
+    ignored_params : Sequence[int]
+        Indices of parameters the steady state does not depend on, e.g., those only used
+        after stimulation. They are left out of keys, so that changing them,
+        as in sensitivity analysis, does not require recomputation.
+
+    Attributes
+    ----------
+    hits : int
+        Number of calls answered from the cache.
+    misses : int
+        Number of calls that had to compute the steady state.
+
+    Examples
+    --------
+    >>> from biomass.dynamics.solver import SteadyStateCache, get_steady_state
+    >>> cache = SteadyStateCache(maxsize=256)
+    >>> y0 = get_steady_state(self.diffeq, y0, tuple(x), cache=cache)
+    """
+
+    def __init__(
+        self, maxsize: int = 128, warm_start: bool = False, ignored_params: Sequence[int] = ()
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer.")
+        self.maxsize = maxsize
+        self.warm_start = warm_start
+        self.ignored_params = sorted(set(ignored_params))
+        self.hits = 0
+        self.misses = 0
+        # key -> (group, parameters, steady state)
+        self._entries: "OrderedDict[str, Tuple[str, np.ndarray, List[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _relevant(self, f_params: tuple) -> np.ndarray:
+        return np.delete(np.asarray(f_params, dtype=float), self.ignored_params)
+
+    @staticmethod
+    def _digest(*items: object) -> str:
+        h = hashlib.sha1()
+        for item in items:
+            if isinstance(item, np.ndarray):
+                h.update(np.ascontiguousarray(item).tobytes())
+            else:
+                h.update(repr(item).encode("utf-8"))
+            h.update(b"|")
+        return h.hexdigest()
+
+    def keys(self, diffeq: Callable, y0: list, f_params: tuple, **settings) -> Tuple[str, str]:
+        """
+        Return the key of an entry and the key of the group of entries
+        differing only in parameter values.
+        """
+        owner = (
+            diffeq.owner
+            if isinstance(diffeq, CompiledDiffeq)
+            else getattr(diffeq, "__self__", None)
+        )
+        func = getattr(diffeq, "__func__", diffeq)
+        identity = (
+            f"{type(owner).__module__}.{type(owner).__qualname__}"
+            if owner is not None
+            else f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+        )
+        perturbation = getattr(owner, "perturbation", None) or {}
+        perturbation = sorted((i, dv) for i, dv in perturbation.items() if dv != 1)
+        group = self._digest(
+            identity,
+            np.asarray(y0, dtype=float),
+            perturbation,
+            sorted(settings.items()),
+        )
+        return self._digest(group, self._relevant(f_params)), group
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Return a copy of the cached steady state, or :obj:`None` on a miss.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(self._entries[key][2])
+        self.misses += 1
+        return None
+
+    def put(self, key: str, group: str, f_params: tuple, steady_state: List[float]) -> None:
+        """
+        Store a steady state, evicting the least recently used entry if full.
+        """
+        self._entries[key] = (group, self._relevant(f_params), list(steady_state))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def nearest(self, group: str, f_params: tuple) -> Optional[np.ndarray]:
+        """
+        Return the cached steady state whose parameter values are closest to ``f_params``.
+        """
+        x = self._relevant(f_params)
+        best, best_distance = None, np.inf
+        for entry_group, params, steady_state in self._entries.values():
+            if entry_group != group or not steady_state or params.shape != x.shape:
+                continue
+            distance = np.sum(((params - x) / (np.abs(params) + np.abs(x) + 1e-300)) ** 2)
+            if distance < best_distance:
+                best, best_distance = steady_state, distance
+        return None if best is None else np.array(best)
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """
+        Return cache statistics.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._entries),
+        }
+
+
+def _get_jacobian(
+    diffeq: Callable,
+    f_params: Tuple[float, ...],
+    sparse: bool,
+) -> Tuple[Optional[Callable], Optional[csc_matrix]]:
+    """
+    Return the analytic Jacobian and its sparsity structure if available.
+
+    For :class:`biomass.dynamics.compiler.CompiledDiffeq`, ``jac(t, y)`` is bound to
+    ``f_params``. Otherwise, ``jacobian(t, y, *x)`` and ``jac_sparsity()`` methods
+    defined in ``DifferentialEquation`` are looked up.
+    """
+    if isinstance(diffeq, CompiledDiffeq):
+        jac = diffeq.bind_jacobian(f_params, sparse) if diffeq.has_jacobian else None
+        return jac, diffeq.jac_sparsity
+    owner = getattr(diffeq, "__self__", None)
+    jac, jac_sparsity = None, None
+    if callable(getattr(owner, "jacobian", None)):
+        jac = owner.jacobian
+    if callable(getattr(owner, "jac_sparsity", None)):
+        jac_sparsity = csc_matrix(owner.jac_sparsity())
+    return jac, jac_sparsity
 
 
 def solve_ode(
@@ -28,6 +265,8 @@ def solve_ode(
     ----------
     diffeq : callable f(t, y, *x)
         Right-hand side of the differential equation.
+        If it is a :class:`biomass.dynamics.compiler.CompiledDiffeq`,
+        the jitted function is called directly.
     y0 : array
         Initial condition on y (can be a vector).
     t : array
@@ -40,6 +279,8 @@ def solve_ode(
         Whether `diffeq` is implemented in a vectorized fashion.
     options : dict, optional
         Options passed to a chosen solver.
+        Unless ``jac`` is given, the analytic Jacobian of ``diffeq`` (and its sparsity
+        structure for 'BDF' and 'Radau') is passed to the implicit solvers if available.
 
     Returns
     -------
@@ -54,17 +295,31 @@ def solve_ode(
         )
     if options is None:
         options = {}
-    options.setdefault("rtol", 1e-8)
-    options.setdefault("atol", 1e-8)
+    rtol, atol = _tolerance.get()
+    options.setdefault("rtol", rtol)
+    options.setdefault("atol", atol)
+    if (n_members := _ensemble_size.get()) is not None:
+        return _solve_ode_ensemble(diffeq, y0, t, f_params, n_members, method, options)
+    if method in ["Radau", "BDF", "LSODA"] and "jac" not in options:
+        jac, jac_sparsity = _get_jacobian(diffeq, f_params, sparse=method != "LSODA")
+        if jac is not None:
+            options["jac"] = jac
+        elif jac_sparsity is not None and method != "LSODA":
+            options.setdefault("jac_sparsity", jac_sparsity)
+    if isinstance(diffeq, CompiledDiffeq):
+        # Pass parameters to the jitted function as an array, not as *args.
+        fun, args = diffeq.bind(f_params), None
+    else:
+        fun, args = diffeq, f_params
     try:
         sol = solve_ivp(
-            diffeq,
+            fun,
             (t[0], t[-1]),
             y0,
             method=method,
             t_eval=t,
             vectorized=vectorized,
-            args=f_params,
+            args=args,
             **options,
         )
         return sol if sol.success else None
@@ -72,28 +327,526 @@ def solve_ode(
         return None
 
 
+def _solve_ode_ensemble(
+    diffeq: Callable,
+    y0: Union[list, np.ndarray],
+    t: Union[range, List[int]],
+    f_params: Tuple[float, ...],
+    n_members: int,
+    method: Union[str, OdeSolver],
+    options: dict,
+) -> Optional[OdeResult]:
+    """
+    Integrate ``n_members`` copies of ``diffeq`` as one block-diagonal system.
+
+    States are stored member by member, so that the Jacobian is banded for LSODA and
+    block-diagonal for BDF and Radau.
+    """
+    if isinstance(diffeq, CompiledDiffeq):
+        raise EnsembleNotSupported("Compiled models are not integrated as an ensemble.")
+    y0 = np.array([np.broadcast_to(np.real(val), (n_members,)) for val in y0], dtype=float)
+    num_species = y0.shape[0]
+
+    def fun(t, y, *x):
+        dydt = diffeq(t, y.reshape(n_members, num_species).T, *x)
+        return np.array(np.broadcast_arrays(*dydt, np.empty(n_members))[:-1]).T.ravel()
+
+    if "jac" not in options:
+        if method == "LSODA":
+            options["lband"] = options["uband"] = num_species - 1
+            options["jac"] = lambda t, y, *x: _ensemble_banded_jacobian(
+                fun, t, y, x, n_members, num_species
+            )
+        elif method in ["Radau", "BDF"]:
+            _, jac_sparsity = _get_jacobian(diffeq, f_params, sparse=True)
+            if jac_sparsity is None:
+                jac_sparsity = np.ones((num_species, num_species))
+            options.setdefault(
+                "jac_sparsity", kron(identity(n_members), jac_sparsity, format="csc")
+            )
+    try:
+        sol = solve_ivp(
+            fun,
+            (t[0], t[-1]),
+            y0.T.ravel(),
+            method=method,
+            t_eval=t,
+            args=f_params,
+            **options,
+        )
+    except ValueError:
+        return None
+    if not sol.success:
+        return None
+    sol.y = sol.y.reshape(n_members, num_species, -1).transpose(1, 2, 0)
+    return sol
+
+
+def _ensemble_banded_jacobian(
+    fun: Callable,
+    t: float,
+    y: np.ndarray,
+    x: tuple,
+    n_members: int,
+    num_species: int,
+) -> np.ndarray:
+    """
+    Forward-difference Jacobian of an ensemble in LSODA's packed banded format.
+    Each species is perturbed in all members at once, as the members are independent.
+    """
+    f0 = fun(t, y, *x).reshape(n_members, num_species)
+    y = y.reshape(n_members, num_species)
+    h = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(y), 1.0)
+    blocks = np.empty((n_members, num_species, num_species))
+    for j in range(num_species):
+        y_j = y.copy()
+        y_j[:, j] += h[:, j]
+        blocks[:, :, j] = (fun(t, y_j.ravel(), *x).reshape(n_members, num_species) - f0) / h[
+            :, [j]
+        ]
+    return _pack_block_diagonal(blocks)
+
+
+def _pack_block_diagonal(blocks: np.ndarray) -> np.ndarray:
+    """
+    Convert diagonal blocks of shape (n_blocks, n, n) into LSODA's packed banded format
+    with ``lband = uband = n - 1``.
+    """
+    n_blocks, n, _ = blocks.shape
+    packed = np.zeros((2 * n - 1, n_blocks * n))
+    for j in range(n):
+        packed[n - 1 - j : 2 * n - 1 - j, j::n] = blocks[:, :, j].T
+    return packed
+
+
+def _columnwise_rhs(
+    diffeq: Callable,
+    f_params: Tuple[float, ...],
+    overrides: Dict[int, np.ndarray],
+) -> Callable[[float, np.ndarray], np.ndarray]:
+    """
+    Return ``g(t, Y)`` evaluating ``diffeq`` for each column of ``Y``, where ``overrides``
+    maps parameter indices to their values in each column.
+    ``diffeq`` is called once with arrays if it supports them, otherwise once per column.
+    """
+    x = list(f_params)
+    for i, val in overrides.items():
+        x[i] = val
+    vectorized = not isinstance(diffeq, CompiledDiffeq)
+    columns: Dict[int, List[Callable]] = {}
+
+    def per_column(n_columns: int) -> List[Callable]:
+        if n_columns not in columns:
+            columns[n_columns] = []
+            for j in range(n_columns):
+                x_j = tuple(val[j] if i in overrides else val for i, val in enumerate(x))
+                if isinstance(diffeq, CompiledDiffeq):
+                    columns[n_columns].append(diffeq.bind(x_j))
+                else:
+                    columns[n_columns].append(lambda t, y, x_j=x_j: diffeq(t, y, *x_j))
+        return columns[n_columns]
+
+    def g(t: float, Y: np.ndarray) -> np.ndarray:
+        nonlocal vectorized
+        if vectorized:
+            try:
+                dydt = diffeq(t, Y, *x)
+                return np.array(np.broadcast_arrays(*dydt, np.empty(Y.shape[1]))[:-1], dtype=float)
+            except ValueError as e:
+                if not _is_array_truthiness_error(e):
+                    raise
+                vectorized = False
+        F = np.empty_like(Y)
+        for j, f in enumerate(per_column(Y.shape[1])):
+            F[:, j] = f(t, Y[:, j])
+        return F
+
+    return g
+
+
+def solve_forward_sensitivity(
+    diffeq: Callable,
+    y0: Union[list, np.ndarray],
+    t: Union[range, List[int]],
+    f_params: Tuple[float, ...],
+    *,
+    param_indices: Sequence[int] = (),
+    species_indices: Sequence[int] = (),
+    method: Union[str, OdeSolver] = "LSODA",
+    options: Optional[dict] = None,
+) -> Optional[OdeResult]:
+    """
+    Solve the forward sensitivity equations together with the system of ODEs.
+
+    The sensitivity ``s = dy/dθ`` of each selected parameter or initial value obeys
+    ``ds/dt = (∂f/∂y) s + ∂f/∂θ``. If ``diffeq`` has an analytic Jacobian
+    (see :mod:`biomass.dynamics.jacobian`), ``(∂f/∂y) s`` is computed with it and
+    ``∂f/∂θ`` as a central difference in each parameter, so that sensitivities to initial
+    values are only subject to integration errors. Otherwise the whole right-hand side is
+    a central directional difference of ``diffeq``. In both cases, sensitivities to
+    parameters are approximations of second order in the difference step.
+
+    The signaling metrics of :func:`biomass.run_analysis` are computed from observables
+    built inside each model's ``simulate``, so sensitivity analyses still perturb
+    parameters and initial values, simulating them in batches.
+
+    Parameters
+    ----------
+    diffeq : callable f(t, y, *x)
+        Right-hand side of the differential equation.
+    y0 : array
+        Initial condition on y (can be a vector).
+    t : array
+        A sequence of time points for which to solve for y.
+    f_params : tuple
+        Model parameters.
+    param_indices : sequence of int
+        Indices of parameters to compute sensitivities with respect to.
+    species_indices : sequence of int
+        Indices of species whose initial values to compute sensitivities with respect to.
+    method : str or `OdeSolver` (default: "LSODA")
+        Integration method to use.
+    options : dict, optional
+        Options passed to a chosen solver.
+        ``rtol`` and ``atol`` default to those of :func:`solve_ode`, see :func:`tolerance`.
+
+    Returns
+    -------
+    sol : OdeResult
+        Represents the solution of ODE. In addition to ``sol.y``,
+        ``sol.sensitivities`` has shape
+        (len(param_indices) + len(species_indices), len(y0), len(t)),
+        with parameters first. Return :obj:`None` if integration failed.
+
+    Examples
+    --------
+    >>> from biomass.dynamics.solver import solve_forward_sensitivity
+    >>> sol = solve_forward_sensitivity(
+    ...     model.problem.diffeq, model.ival(), range(101), tuple(model.pval()), param_indices=[0]
+    ... )
+    >>> sol.sensitivities.shape
+    (1, 8, 101)
+    """
+    if method not in (
+        available_methods := ["RK23", "RK45", "DOP853", "Radau", "BDF", "LSODA"]
+    ) and not (inspect.isclass(method) and issubclass(method, OdeSolver)):
+        raise ValueError(
+            "`method` must be one of {} or OdeSolver class.".format(available_methods)
+        )
+    if options is None:
+        options = {}
+    rtol, atol = _tolerance.get()
+    options.setdefault("rtol", rtol)
+    options.setdefault("atol", atol)
+    y0 = np.real(np.asarray(y0, dtype=complex)).astype(float)
+    num_species = len(y0)
+    num_sensitivities = len(param_indices) + len(species_indices)
+    # Sensitivities are integrated relative to the magnitude of each parameter or initial value.
+    magnitude = np.array(
+        [f_params[i] for i in param_indices] + [y0[i] for i in species_indices], dtype=float
+    )
+    magnitude[magnitude == 0] = 1.0
+    h = np.cbrt(np.finfo(float).eps)
+    analytic, _ = _get_jacobian(diffeq, f_params, sparse=False)
+    g_state = _columnwise_rhs(diffeq, f_params, {})
+
+    def state_jacobian(t: float, y: np.ndarray) -> np.ndarray:
+        if analytic is not None:
+            if isinstance(diffeq, CompiledDiffeq):
+                return np.asarray(analytic(t, y), dtype=float)
+            return np.asarray(analytic(t, y, *f_params), dtype=float)
+        step = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(y), 1.0)
+        F = g_state(t, y[:, None] + np.hstack([np.zeros((num_species, 1)), np.diag(step)]))
+        return (F[:, 1:] - F[:, [0]]) / step
+
+    # Column 0 is unperturbed, columns 2k + 1 and 2k + 2 are shifted along +/- s_k,
+    # only in parameter k if the analytic Jacobian is used.
+    n_columns = 2 * (len(param_indices) if analytic is not None else num_sensitivities) + 1
+    overrides: Dict[int, np.ndarray] = {}
+    for k, i in enumerate(param_indices):
+        val = np.full(n_columns, float(f_params[i]))
+        val[2 * k + 1] += h * magnitude[k]
+        val[2 * k + 2] -= h * magnitude[k]
+        overrides[i] = val
+    g = _columnwise_rhs(diffeq, f_params, overrides)
+
+    def fun(t: float, z: np.ndarray) -> np.ndarray:
+        y = z[:num_species]
+        S = z[num_species:].reshape(num_sensitivities, num_species).T
+        Y = np.empty((num_species, n_columns))
+        Y[:, 0] = y
+        if analytic is not None:
+            Y[:, 1:] = y[:, None]
+            F = g(t, Y)
+            dsdt = state_jacobian(t, y) @ S
+            dsdt[:, : len(param_indices)] += (F[:, 1::2] - F[:, 2::2]) / (2 * h)
+        else:
+            Y[:, 1::2] = y[:, None] + h * S
+            Y[:, 2::2] = y[:, None] - h * S
+            F = g(t, Y)
+            dsdt = (F[:, 1::2] - F[:, 2::2]) / (2 * h)
+        return np.concatenate([F[:, 0], dsdt.T.ravel()])
+
+    if method in ["Radau", "BDF", "LSODA"] and "jac" not in options:
+        # The Jacobian of ds/dt with respect to y is neglected, which only affects
+        # the convergence of Newton iterations, not the solution.
+        if method == "LSODA":
+            options["lband"] = options["uband"] = num_species - 1
+            options["jac"] = lambda t, z: _pack_block_diagonal(
+                np.broadcast_to(
+                    state_jacobian(t, z[:num_species]),
+                    (num_sensitivities + 1, num_species, num_species),
+                )
+            )
+        else:
+            options["jac"] = lambda t, z: kron(
+                identity(num_sensitivities + 1),
+                csc_matrix(state_jacobian(t, z[:num_species])),
+                format="csc",
+            )
+    s0 = np.zeros((num_sensitivities, num_species))
+    for k, i in enumerate(species_indices):
+        s0[len(param_indices) + k, i] = magnitude[len(param_indices) + k]
+    try:
+        sol = solve_ivp(
+            fun,
+            (t[0], t[-1]),
+            np.concatenate([y0, s0.ravel()]),
+            method=method,
+            t_eval=t,
+            **options,
+        )
+    except ValueError:
+        return None
+    if not sol.success:
+        return None
+    sol.sensitivities = (
+        sol.y[num_species:].reshape(num_sensitivities, num_species, -1) / magnitude[:, None, None]
+    )
+    sol.y = sol.y[:num_species]
+    return sol
+
+
+def _as_autonomous(
+    diffeq: Callable,
+    f_params: tuple,
+) -> Tuple[Callable[[np.ndarray], np.ndarray], Callable[[np.ndarray], np.ndarray]]:
+    """
+    Return ``f(y)`` and its Jacobian ``jac(y)`` at t = 0.
+    The Jacobian is approximated by forward differences if not available.
+    """
+    if isinstance(diffeq, CompiledDiffeq):
+        bound = diffeq.bind(f_params)
+        fun = lambda y: bound(0.0, y)  # noqa: E731
+    else:
+        fun = lambda y: np.asarray(diffeq(0.0, y, *f_params), dtype=float)  # noqa: E731
+    analytic, _ = _get_jacobian(diffeq, f_params, sparse=False)
+    if analytic is not None:
+        if isinstance(diffeq, CompiledDiffeq):
+            return fun, lambda y: analytic(0.0, y)
+        return fun, lambda y: np.asarray(analytic(0.0, y, *f_params), dtype=float)
+
+    def jac(y: np.ndarray) -> np.ndarray:
+        f0 = fun(y)
+        h = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(y), 1.0)
+        approx = np.empty((len(y), len(y)))
+        for j in range(len(y)):
+            y_j = y.copy()
+            y_j[j] += h[j]
+            approx[:, j] = (fun(y_j) - f0) / h[j]
+        return approx
+
+    return fun, jac
+
+
+def _newton_steady_state(
+    fun: Callable[[np.ndarray], np.ndarray],
+    jac: Callable[[np.ndarray], np.ndarray],
+    y0: np.ndarray,
+    dt: float,
+    is_converged: Callable[[np.ndarray, np.ndarray], bool],
+    deadline: float,
+    max_iter: int = 500,
+    jac_update: int = 10,
+) -> Optional[np.ndarray]:
+    """
+    Damped Newton iteration on f(y) = 0 (pseudo-transient continuation).
+
+    Each step solves (I / tau - J) dy = f(y). With small tau, steps follow the trajectory
+    from ``y0``, so the iteration stays in the conservation class of ``y0`` and approaches
+    the steady state the dynamics converge to; tau grows as ||f|| decreases and
+    the iteration becomes Newton's method. The Jacobian matrix is reused for
+    ``jac_update`` steps unless a step is rejected.
+    Return :obj:`None` unless a non-negative, stable steady state is found.
+    """
+    y = y0.copy()
+    f = fun(y)
+    if not np.all(np.isfinite(f)):
+        return None
+    if is_converged(y, f):
+        return y
+    identity = np.eye(len(y))
+    tau = dt
+    norm = np.linalg.norm(f)
+    jacobian, age = jac(y), 0
+    for _ in range(max_iter):
+        if is_converged(y, f):
+            break
+        if time.time() > deadline:
+            return None
+        if age >= jac_update:
+            jacobian, age = jac(y), 0
+        age += 1
+        while tau > 1e-8 * dt:
+            try:
+                y_new = y + np.linalg.solve(identity / tau - jacobian, f)
+            except np.linalg.LinAlgError:
+                y_new = None
+            if y_new is not None and np.all(y_new >= -1e-12 * max(1.0, np.max(np.abs(y_new)))):
+                y_new = np.maximum(y_new, 0.0)
+                f_new = fun(y_new)
+                if np.all(np.isfinite(f_new)):
+                    break
+            tau /= 4
+            jacobian, age = jac(y), 1
+        else:
+            return None
+        norm_new = np.linalg.norm(f_new)
+        # Switched evolution relaxation
+        tau = min(tau * max(norm / norm_new, 0.1) if norm_new > 0 else 10 * tau, 1e12 * dt)
+        y, f, norm = y_new, f_new, norm_new
+    else:
+        return None
+    # Reject unstable fixed points; zero eigenvalues come from conservation laws.
+    eigenvalues = np.linalg.eigvals(jac(y)).real
+    if np.any(eigenvalues > 1e-8 * max(1.0, np.max(np.abs(eigenvalues), initial=0.0))):
+        return None
+    return y
+
+
+def _ode(
+    diffeq: Callable,
+    y0: list,
+    f_params: tuple,
+    integrator: str,
+    integrator_options: dict,
+) -> ode:
+    # The layout of user-supplied Jacobians expected by vode/zvode differs
+    # among SciPy versions, so they compute the Jacobian internally.
+    jac = None
+    if integrator == "lsoda":
+        jac, _ = _get_jacobian(diffeq, f_params, sparse=False)
+    if isinstance(diffeq, CompiledDiffeq):
+        sol = ode(diffeq.bind(f_params), jac)
+    else:
+        sol = ode(
+            lambda t, y, f_args: diffeq(t, y, *f_args),
+            None if jac is None else lambda t, y, f_args: jac(t, y, *f_args),
+        )
+        sol.set_f_params(f_params)
+        sol.set_jac_params(f_params)
+    sol.set_integrator(integrator, **integrator_options)
+    sol.set_initial_value(y0, 0)
+    return sol
+
+
+def _poll_steady_state(
+    diffeq: Callable,
+    y0: list,
+    f_params: tuple,
+    integrator: str,
+    integrator_options: dict,
+    dt: float,
+    allclose_kws: dict,
+    deadline: float,
+) -> List[float]:
+    """
+    Integrate with the fixed step size ``dt`` until successive states are close.
+    """
+    sol = _ode(diffeq, y0, f_params, integrator, integrator_options)
+    y_prev = y0
+    while sol.successful():
+        sol.integrate(sol.t + dt)
+        if np.iscomplex(np.real_if_close(sol.y)).any() or time.time() > deadline:
+            return []
+        elif np.allclose(sol.y, y_prev, **allclose_kws):
+            break
+        else:
+            y_prev = sol.y
+    return np.real(sol.y).tolist() if sol.successful() else []
+
+
+def _integrate_to_steady_state(
+    diffeq: Callable,
+    y0: list,
+    f_params: tuple,
+    fun: Callable[[np.ndarray], np.ndarray],
+    integrator: str,
+    integrator_options: dict,
+    dt: float,
+    is_converged: Callable[[np.ndarray, np.ndarray], bool],
+    deadline: float,
+) -> List[float]:
+    """
+    Integrate with growing step sizes until dy/dt converges.
+    """
+    sol = _ode(diffeq, y0, f_params, integrator, integrator_options)
+    step = dt
+    while sol.successful():
+        sol.integrate(sol.t + step)
+        if np.iscomplex(np.real_if_close(sol.y)).any() or time.time() > deadline:
+            return []
+        y = np.real(sol.y)
+        if is_converged(y, fun(y)):
+            break
+        step = min(2 * step, 1024 * dt)
+    return np.real(sol.y).tolist() if sol.successful() else []
+
+
 def get_steady_state(
     diffeq: Callable,
     y0: list,
     f_params: tuple,
     *,
+    method: Literal["integrate", "newton"] = "integrate",
     integrator: Literal["vode", "zvode", "lsoda"] = "lsoda",
     integrator_options: Optional[dict] = None,
     dt: float = 1,
     allclose_kws: Optional[dict] = None,
     maximum_wait_time: Union[int, float] = 60.0,
+    cache: Optional[SteadyStateCache] = None,
 ) -> List[float]:
     """
-    Simulate a model from given initial conditions until it reaches steady state.
+    Find the steady state of a model reached from given initial conditions.
+
+    With ``method='integrate'`` (default), the model is simulated with the step size ``dt``
+    until ``numpy.allclose()`` holds for successive states.
+
+    With ``method='newton'``, a damped Newton iteration on ``diffeq(0, y, *f_params) = 0``
+    (pseudo-transient continuation starting with the step size ``dt``) is tried first,
+    using the analytic Jacobian if available, otherwise finite differences.
+    Solutions which are negative or unstable are rejected.
+    If Newton's method fails, the model is integrated with growing step sizes
+    (``dt``, ``2 * dt``, ``4 * dt``, ..., up to ``1024 * dt``).
+    Convergence is then judged on dy/dt: the steady state is reached when
+    ``numpy.isclose(y + dt * dydt, y, **allclose_kws)`` holds for all species,
+    i.e., when no species changes beyond the tolerance within ``dt``.
+    ``diffeq`` is assumed not to depend on t explicitly.
+    This may find a steady state where the default method fails, e.g., when the
+    simulation from ``y0`` does not settle within ``maximum_wait_time``, so results of
+    parameter estimation can differ from those obtained with the default method.
 
     Parameters
     ----------
     diffeq : callable f(t, y, *x)
         Right-hand side of the differential equation.
+        The analytic Jacobian is used if available.
     y0 : array
         Initial condition on y (can be a vector).
     f_params : tuple
         Model parameters.
+    method : str (default: 'integrate')
+        'integrate' or 'newton'.
     integrator : str (default: 'lsoda')
         Name of ODE integrator to use ('vode', 'zvode', or 'lsoda').
     integrator_options : dict, optional
@@ -104,6 +857,9 @@ def get_steady_state(
         Keyword arguments to pass to ``numpy.allclose()``.
     maximum_wait_time : int or float (default: 60.0 = 1 min.)
         The longest time a user can wait for the system to reach the steady state.
+    cache : :class:`SteadyStateCache`, optional
+        Cache of steady states. If the same steady state has been computed,
+        it is returned without simulation.
 
     Returns
     -------
@@ -111,6 +867,10 @@ def get_steady_state(
         Steady state concentrations of all species.
         Return an empty list if simulation failed.
     """
+    if _ensemble_size.get() is not None:
+        raise EnsembleNotSupported("Steady states are not computed for an ensemble.")
+    if method not in (available_methods := ["integrate", "newton"]):
+        raise ValueError(f"method must be one of {available_methods}.")
     if integrator not in (available_integrators := ["vode", "zvode", "lsoda"]):
         raise ValueError(f"integrator must be one of {available_integrators}.")
     if integrator_options is None:
@@ -125,25 +885,72 @@ def get_steady_state(
         allclose_kws = {}
     allclose_kws.setdefault("rtol", 1e-3)
 
-    sol = ode(lambda t, y, f_args: diffeq(t, y, *f_args))
-    sol.set_integrator(integrator, **integrator_options)
-    sol.set_initial_value(y0, 0)
-    sol.set_f_params(f_params)
-    ys = [y0]
+    initial_guess = np.real(np.asarray(y0)).astype(float)
+    if cache is not None:
+        key, group = cache.keys(
+            diffeq,
+            y0,
+            f_params,
+            method=method,
+            integrator=integrator,
+            integrator_options=integrator_options,
+            dt=dt,
+            allclose_kws=allclose_kws,
+        )
+        if (cached := cache.get(key)) is not None:
+            return cached
+        if cache.warm_start and (neighbor := cache.nearest(group, f_params)) is not None:
+            initial_guess = neighbor
+
     start = time.time()
-    while sol.successful():
-        sol.integrate(sol.t + dt)
-        if (
-            np.iscomplex(np.real_if_close(sol.y)).any()
-            or (time.time() - start) > maximum_wait_time
-        ):
-            return []
-        elif np.allclose(sol.y, ys[-1], **allclose_kws):
-            break
+    steady_state: List[float] = []
+    if method == "integrate":
+        steady_state = _poll_steady_state(
+            diffeq,
+            y0,
+            f_params,
+            integrator,
+            integrator_options,
+            dt,
+            allclose_kws,
+            start + maximum_wait_time,
+        )
+    else:
+
+        def is_converged(y: np.ndarray, dydt: np.ndarray) -> bool:
+            return bool(np.all(np.isclose(y + dt * dydt, y, **allclose_kws)))
+
+        fun, jac = _as_autonomous(diffeq, f_params)
+        with np.errstate(all="ignore"):
+            try:
+                y_newton = _newton_steady_state(
+                    fun,
+                    jac,
+                    initial_guess,
+                    dt,
+                    is_converged,
+                    start + maximum_wait_time,
+                )
+            except np.linalg.LinAlgError:
+                y_newton = None
+        if y_newton is not None:
+            steady_state = y_newton.tolist()
         else:
-            ys.append(sol.y)
-    steady_state = np.real(sol.y).tolist() if sol.successful() else []
+            steady_state = _integrate_to_steady_state(
+                diffeq,
+                y0,
+                f_params,
+                fun,
+                integrator,
+                integrator_options,
+                dt,
+                is_converged,
+                start + maximum_wait_time,
+            )
     for i, val in enumerate(steady_state):
         if math.fabs(val) < sys.float_info.epsilon:
             steady_state[i] = 0.0
+    if cache is not None and steady_state:
+        # Failures, e.g., due to maximum_wait_time, are not cached.
+        cache.put(key, group, f_params, steady_state)
     return steady_state
@@ -1,11 +1,14 @@
 import os
 from dataclasses import dataclass
 from math import isnan
+from multiprocessing.pool import Pool
 from typing import Dict, List, Optional
 
 import numpy as np
-from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
 from matplotlib.axes._axes import _log as matplotlib_axes_logger
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 from ..model_object import ModelObject
 from ..plotting import MultipleObservables, SingleObservable
@@ -24,6 +27,7 @@ class TemporalDynamics(object):
         show_all: bool,
         stdev: bool,
         simulations_all: np.ndarray,
+        pool: Optional[Pool] = None,
     ) -> None:
         """
         Plot time course of each observable.
@@ -46,6 +50,10 @@ class TemporalDynamics(object):
         simulations_all : numpy array
             Array containing all simulated values.
 
+        pool : multiprocessing.pool.Pool, optional
+            Worker processes initialized by :func:`_init_worker`. If given, figures are
+            rendered in the workers, each receiving only the observables it draws.
+
         """
         os.makedirs(
             os.path.join(self.model.path, "figure", "simulation", f"{viz_type}"),
@@ -53,62 +61,150 @@ class TemporalDynamics(object):
         )
         self.model.problem.set_data()
         self.model.viz.set_timecourse_rcParams()
+        multiplotting = self.model.viz.get_multiple_observables_options()
+        # mode 0 : timecourse_for_each_observable
+        # mode 1 : multiple_observables
+        figures = [(0, [obs_name]) for obs_name in self.model.observables]
+        if multiplotting.observables:
+            figures.append(
+                (1, [name for name in self.model.observables if name in multiplotting.observables])
+            )
+        simulations = (
+            None if viz_type in ["average", "experiment"] else self.model.problem.simulations
+        )
+        if pool is None:
+            for mode, obs_names in figures:
+                self._plot_figure(
+                    mode,
+                    obs_names,
+                    n_file,
+                    viz_type,
+                    show_all,
+                    stdev,
+                    simulations_all,
+                    simulations,
+                )
+        else:
+            tasks = []
+            for mode, obs_names in figures:
+                indices = [self.model.observables.index(obs_name) for obs_name in obs_names]
+                tasks.append(
+                    (
+                        "_plot_sliced_figure",
+                        (
+                            mode,
+                            obs_names,
+                            n_file,
+                            viz_type,
+                            show_all,
+                            stdev,
+                            indices,
+                            simulations_all[indices],
+                            None if simulations is None else simulations[indices],
+                        ),
+                    )
+                )
+            for _ in pool.imap_unordered(_call_in_worker, tasks):
+                pass
+
+    def _plot_figure(
+        self,
+        mode: int,
+        obs_names: List[str],
+        n_file: List[int],
+        viz_type: str,
+        show_all: bool,
+        stdev: bool,
+        simulations_all: np.ndarray,
+        simulations: Optional[np.ndarray],
+    ) -> None:
+        """
+        Draw and save the figure of an observable (mode 0) or of multiple observables
+        (mode 1). The figure is not managed by pyplot, so that figures can be rendered
+        in parallel processes.
+        """
         singleplotting = self.model.viz.get_single_observable_options()
         multiplotting = self.model.viz.get_multiple_observables_options()
-        for mode in range(2):
-            # mode 0 : timecourse_for_each_observable
-            # mode 1 : multiple_observables
-            set_fig = False
-            for i, obs_name in enumerate(self.model.observables):
-                if mode == 1 and obs_name not in multiplotting.observables:
-                    continue
-                if mode == 0:
-                    plt.figure(figsize=singleplotting[i].figsize)
-                elif mode == 1 and not set_fig:
-                    plt.figure(figsize=multiplotting.figsize)
-                    set_fig = True
-                plt.gca().spines["right"].set_visible(False)
-                plt.gca().spines["top"].set_visible(False)
-                if viz_type != "experiment":
-                    if show_all:
-                        self._plot_show_all(
-                            n_file, simulations_all, obs_name, mode, singleplotting, multiplotting
-                        )
-                    if viz_type == "average":
-                        normalized = self._normalize_array(n_file, simulations_all, obs_name)
-                        if (
-                            self.model.problem.normalization
-                            and self.model.problem.normalization[obs_name]["timepoint"] is None
-                        ):
-                            normalized = self._divide_by_maximum(normalized, obs_name)
-                        self._plot_average(
-                            normalized, obs_name, mode, singleplotting, multiplotting
-                        )
-                        if stdev:
-                            self._show_sd(
-                                normalized, obs_name, mode, singleplotting, multiplotting
-                            )
-                    else:
-                        self._plot_simulations(obs_name, mode, singleplotting, multiplotting)
-                if (
-                    viz_type == "experiment" or singleplotting[i].exp_data
-                ) and self.model.problem.experiments[i] is not None:
-                    exp_t_dict = self.model.problem.get_timepoint(obs_name)
-                    if self.model.problem.error_bars[i] is not None:
-                        self._plot_experimental_data_with_error_bars(
-                            viz_type, exp_t_dict, obs_name, mode, singleplotting, multiplotting
-                        )
-                    else:
-                        self._plot_experimental_data_without_error_bars(
-                            viz_type, exp_t_dict, obs_name, mode, singleplotting, multiplotting
+        fig = Figure(
+            figsize=(
+                singleplotting[self.model.observables.index(obs_names[0])].figsize
+                if mode == 0
+                else multiplotting.figsize
+            )
+        )
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.spines["right"].set_visible(False)
+        ax.spines["top"].set_visible(False)
+        for obs_name in obs_names:
+            i = self.model.observables.index(obs_name)
+            if viz_type != "experiment":
+                if show_all:
+                    self._plot_show_all(
+                        ax, n_file, simulations_all, obs_name, mode, singleplotting, multiplotting
+                    )
+                if viz_type == "average":
+                    normalized = self._normalize_array(n_file, simulations_all, obs_name)
+                    if (
+                        self.model.problem.normalization
+                        and self.model.problem.normalization[obs_name]["timepoint"] is None
+                    ):
+                        normalized = self._divide_by_maximum(normalized, obs_name)
+                    self._plot_average(
+                        ax, normalized, obs_name, mode, singleplotting, multiplotting
+                    )
+                    if stdev:
+                        self._show_sd(
+                            ax, normalized, obs_name, mode, singleplotting, multiplotting
                         )
-                if mode == 0:
-                    self._save_mode_0(obs_name, singleplotting, viz_type)
-            if mode == 1 and multiplotting.observables:
-                self._save_mode_1(multiplotting, viz_type)
+                else:
+                    self._plot_simulations(
+                        ax, simulations, obs_name, mode, singleplotting, multiplotting
+                    )
+            if (
+                viz_type == "experiment" or singleplotting[i].exp_data
+            ) and self.model.problem.experiments[i] is not None:
+                exp_t_dict = self.model.problem.get_timepoint(obs_name)
+                if self.model.problem.error_bars[i] is not None:
+                    self._plot_experimental_data_with_error_bars(
+                        ax, viz_type, exp_t_dict, obs_name, mode, singleplotting, multiplotting
+                    )
+                else:
+                    self._plot_experimental_data_without_error_bars(
+                        ax, viz_type, exp_t_dict, obs_name, mode, singleplotting, multiplotting
+                    )
+            if mode == 0:
+                self._save_mode_0(fig, ax, obs_name, singleplotting, viz_type)
+        if mode == 1:
+            self._save_mode_1(fig, ax, multiplotting, viz_type)
+
+    def _plot_sliced_figure(
+        self,
+        mode: int,
+        obs_names: List[str],
+        n_file: List[int],
+        viz_type: str,
+        show_all: bool,
+        stdev: bool,
+        indices: List[int],
+        simulations_all: np.ndarray,
+        simulations: Optional[np.ndarray],
+    ) -> None:
+        """
+        :meth:`_plot_figure` with the simulated values of the observables at ``indices`` only.
+        """
+        expanded = []
+        for values in [simulations_all, simulations]:
+            if values is not None:
+                full = np.full((len(self.model.observables), *values.shape[1:]), np.nan)
+                full[indices] = values
+                values = full
+            expanded.append(values)
+        self._plot_figure(mode, obs_names, n_file, viz_type, show_all, stdev, *expanded)
 
     def _plot_show_all(
         self,
+        ax: Axes,
         n_file: List[int],
         simulations_all: np.ndarray,
         obs_name: str,
@@ -125,7 +221,7 @@ class TemporalDynamics(object):
                 if (mode == 0 and condition not in singleplotting[i].dont_show) or (
                     mode == 1 and condition == multiplotting.condition
                 ):
-                    plt.plot(
+                    ax.plot(
                         np.array(self.model.problem.t) / singleplotting[i].divided_by,
                         simulations_all[i, j, k]
                         / (
@@ -242,6 +338,7 @@ class TemporalDynamics(object):
 
     def _plot_average(
         self,
+        ax: Axes,
         normalized: np.ndarray,
         obs_name: str,
         mode: int,
@@ -256,7 +353,7 @@ class TemporalDynamics(object):
             if (mode == 0 and condition not in singleplotting[i].dont_show) or (
                 mode == 1 and condition == multiplotting.condition
             ):
-                plt.plot(
+                ax.plot(
                     np.array(self.model.problem.t) / singleplotting[i].divided_by,
                     np.nanmean(normalized[i, :, k, :], axis=0),
                     color=(
@@ -269,6 +366,7 @@ class TemporalDynamics(object):
 
     def _show_sd(
         self,
+        ax: Axes,
         normalized: np.ndarray,
         obs_name: str,
         mode: int,
@@ -287,7 +385,7 @@ class TemporalDynamics(object):
                 y_std = [
                     np.nanstd(normalized[i, :, k, l]) for l, _ in enumerate(self.model.problem.t)
                 ]
-                plt.fill_between(
+                ax.fill_between(
                     np.array(self.model.problem.t) / singleplotting[i].divided_by,
                     y_mean - y_std,
                     y_mean + y_std,
@@ -302,6 +400,8 @@ class TemporalDynamics(object):
 
     def _plot_simulations(
         self,
+        ax: Axes,
+        simulations: np.ndarray,
         obs_name: str,
         mode: int,
         singleplotting: List[SingleObservable],
@@ -315,16 +415,16 @@ class TemporalDynamics(object):
             if (mode == 0 and condition not in singleplotting[i].dont_show) or (
                 mode == 1 and condition == multiplotting.condition
             ):
-                plt.plot(
+                ax.plot(
                     np.array(self.model.problem.t) / singleplotting[i].divided_by,
-                    self.model.problem.simulations[i, k, :]
+                    simulations[i, k, :]
                     / (
                         1
                         if not self.model.problem.normalization
-                        or np.max(self.model.problem.simulations[i, k, :]) == 0.0
+                        or np.max(simulations[i, k, :]) == 0.0
                         else (
                             np.max(
-                                self.model.problem.simulations[
+                                simulations[
                                     i,
                                     [
                                         self.model.problem.conditions.index(c)
@@ -337,7 +437,7 @@ class TemporalDynamics(object):
                             )
                             if self.model.problem.normalization[obs_name]["timepoint"] is not None
                             else np.max(
-                                self.model.problem.simulations[
+                                simulations[
                                     i,
                                     [
                                         self.model.problem.conditions.index(c)
@@ -359,6 +459,7 @@ class TemporalDynamics(object):
 
     def _plot_experimental_data_with_error_bars(
         self,
+        ax: Axes,
         viz_type: str,
         exp_t_dict: Optional[Dict[str, List[int]]],
         obs_name: str,
@@ -378,7 +479,7 @@ class TemporalDynamics(object):
             ):
                 try:
                     exp_t = exp_t_dict[condition]
-                    exp_data = plt.errorbar(
+                    exp_data = ax.errorbar(
                         np.array(exp_t) / singleplotting[i].divided_by,
                         self.model.problem.experiments[i][condition],
                         yerr=self.model.problem.error_bars[i][condition],
@@ -421,6 +522,7 @@ class TemporalDynamics(object):
 
     def _plot_experimental_data_without_error_bars(
         self,
+        ax: Axes,
         viz_type: str,
         exp_t_dict: Optional[Dict[str, List[int]]],
         obs_name: str,
@@ -440,7 +542,7 @@ class TemporalDynamics(object):
             ):
                 try:
                     exp_t = exp_t_dict[condition]
-                    plt.plot(
+                    ax.plot(
                         np.array(exp_t) / singleplotting[i].divided_by,
                         self.model.problem.experiments[i][condition],
                         (
@@ -471,6 +573,8 @@ class TemporalDynamics(object):
 
     def _save_mode_0(
         self,
+        fig: Figure,
+        ax: Axes,
         obs_name: str,
         singleplotting: List[SingleObservable],
         viz_type: str,
@@ -480,18 +584,18 @@ class TemporalDynamics(object):
         """
         i = self.model.observables.index(obs_name)
         if singleplotting[i].xlim:
-            plt.xlim(singleplotting[i].xlim)
+            ax.set_xlim(singleplotting[i].xlim)
         if singleplotting[i].xticks is not None:
-            plt.xticks(singleplotting[i].xticks)
-        plt.xlabel(singleplotting[i].xlabel)
+            ax.set_xticks(singleplotting[i].xticks)
+        ax.set_xlabel(singleplotting[i].xlabel)
         if singleplotting[i].ylim:
-            plt.ylim(singleplotting[i].ylim)
+            ax.set_ylim(singleplotting[i].ylim)
         if singleplotting[i].yticks is not None:
-            plt.yticks(singleplotting[i].yticks)
-        plt.ylabel(singleplotting[i].ylabel)
+            ax.set_yticks(singleplotting[i].yticks)
+        ax.set_ylabel(singleplotting[i].ylabel)
         if singleplotting[i].legend_kws is not None:
-            plt.legend(**singleplotting[i].legend_kws)
-        plt.savefig(
+            ax.legend(**singleplotting[i].legend_kws)
+        fig.savefig(
             os.path.join(
                 self.model.path,
                 "figure",
@@ -500,10 +604,11 @@ class TemporalDynamics(object):
                 f"{obs_name}",
             ),
         )
-        plt.close()
 
     def _save_mode_1(
         self,
+        fig: Figure,
+        ax: Axes,
         multiplotting: MultipleObservables,
         viz_type: str,
     ) -> None:
@@ -511,17 +616,17 @@ class TemporalDynamics(object):
         Plot time course of multiple observables in one figure.
         """
         if multiplotting.xlim:
-            plt.xlim(multiplotting.xlim)
+            ax.set_xlim(multiplotting.xlim)
         if multiplotting.xticks is not None:
-            plt.xticks(multiplotting.xticks)
-        plt.xlabel(multiplotting.xlabel)
+            ax.set_xticks(multiplotting.xticks)
+        ax.set_xlabel(multiplotting.xlabel)
         if multiplotting.ylim:
-            plt.ylim(multiplotting.ylim)
+            ax.set_ylim(multiplotting.ylim)
         if multiplotting.yticks is not None:
-            plt.yticks(multiplotting.yticks)
-        plt.ylabel(multiplotting.ylabel)
-        plt.legend(**multiplotting.legend_kws)
-        plt.savefig(
+            ax.set_yticks(multiplotting.yticks)
+        ax.set_ylabel(multiplotting.ylabel)
+        ax.legend(**multiplotting.legend_kws)
+        fig.savefig(
             os.path.join(
                 self.model.path,
                 "figure",
@@ -530,4 +635,21 @@ class TemporalDynamics(object):
                 f"{multiplotting.fname}",
             ),
         )
-        plt.close()
+
+
+# Model of run_simulation created once in each worker process
+_worker_dynamics: Optional[TemporalDynamics] = None
+
+
+def _init_worker(pkg_name: str, use_compile: bool, dynamics: type) -> None:
+    from ..core import _load_worker_model
+
+    global _worker_dynamics
+    _worker_dynamics = dynamics(_load_worker_model(pkg_name, use_compile))
+    _worker_dynamics.model.problem.set_data()
+    _worker_dynamics.model.viz.set_timecourse_rcParams()
+
+
+def _call_in_worker(task: tuple):
+    name, args = task
+    return getattr(_worker_dynamics, name)(*args)
@@ -1,2 +1,7 @@
+from .measurement import MeasurementTable, ResidualsMixin
+from .multi_fidelity import MultiFidelityObjective
 from .optimizer import InitialPopulation, Optimizer
-from .search_util import convert_scale, initialize_search_param
+from .progress import ProgressRecorder, load_progress
+from .results_store import ResultsStore, StoredResult, StoredResults, migrate_results
+from .search_util import SearchSpace, convert_scale, initialize_search_param
+from .vectorized import VectorizedObjective
@@ -0,0 +1,286 @@
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True, eq=False)
+class MeasurementTable(object):
+    """
+    Experimental data compiled into flat arrays, one entry per measurement.
+
+    Entries are ordered as the residuals computed with ``_diff_sim_and_exp``,
+    i.e., by observable, condition and timepoint.
+
+    Attributes
+    ----------
+    obs_index : numpy ndarray
+        Index of observable in ``obs_names``.
+    condition_index : numpy ndarray
+        Index of condition in ``conditions``.
+    time_index : numpy ndarray
+        Timepoint, i.e., index of the last axis of ``simulations``.
+    value : numpy ndarray
+        Measured value.
+    sigma : numpy ndarray
+        Error bar of the measured value, NaN if not given.
+    group : numpy ndarray
+        Index of normalization group, ``len(norm_obs)`` if not normalized.
+    norm_obs : numpy ndarray
+        Index of observable of each normalization group.
+    norm_conditions : numpy ndarray
+        Boolean mask with shape (len(norm_obs), len(conditions)),
+        conditions used for normalization.
+    norm_time : numpy ndarray
+        Timepoint used for normalization, -1 if the maximum over all timepoints is used.
+    """
+
+    obs_index: np.ndarray
+    condition_index: np.ndarray
+    time_index: np.ndarray
+    value: np.ndarray
+    sigma: np.ndarray
+    group: np.ndarray
+    norm_obs: np.ndarray
+    norm_conditions: np.ndarray
+    norm_time: np.ndarray
+
+    @classmethod
+    def from_problem(cls, problem) -> "MeasurementTable":
+        """
+        Compile ``experiments``, ``error_bars``, ``get_timepoint`` and ``normalization``
+        of an optimization problem, calling ``set_data`` once.
+        """
+        problem.set_data()
+        norm_obs = []
+        norm_conditions = []
+        norm_time = []
+        rows = []
+        for i, obs_name in enumerate(problem.obs_names):
+            if problem.experiments[i] is None:
+                continue
+            group = None
+            if problem.normalization and obs_name in problem.normalization:
+                group = len(norm_obs)
+                norm_obs.append(i)
+                conditions = (
+                    problem.normalization[obs_name]["condition"]
+                    if problem.normalization[obs_name]["condition"]
+                    else problem.conditions
+                )
+                norm_conditions.append([c in conditions for c in problem.conditions])
+                timepoint = problem.normalization[obs_name]["timepoint"]
+                norm_time.append(-1 if timepoint is None else int(timepoint))
+            exp_timepoint = problem.get_timepoint(obs_name)
+            error_bars = problem.error_bars[i] if problem.error_bars[i] is not None else {}
+            for j, condition in enumerate(problem.conditions):
+                if condition in problem.experiments[i].keys():
+                    values = problem.experiments[i][condition]
+                    sigma = error_bars.get(condition, [np.nan] * len(values))
+                    for t, value, s in zip(map(int, exp_timepoint[condition]), values, sigma):
+                        rows.append((i, j, t, value, s, group))
+        n_groups = len(norm_obs)
+        return cls(
+            obs_index=np.array([row[0] for row in rows], dtype=int),
+            condition_index=np.array([row[1] for row in rows], dtype=int),
+            time_index=np.array([row[2] for row in rows], dtype=int),
+            value=np.array([row[3] for row in rows], dtype=float),
+            sigma=np.array([row[4] for row in rows], dtype=float),
+            group=np.array([n_groups if row[5] is None else row[5] for row in rows], dtype=int),
+            norm_obs=np.array(norm_obs, dtype=int),
+            norm_conditions=np.array(norm_conditions, dtype=bool).reshape(
+                n_groups, len(problem.conditions)
+            ),
+            norm_time=np.array(norm_time, dtype=int),
+        )
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def normalization_factors(
+        self, simulations: np.ndarray, timepoints: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
+        """
+        Return the value used to normalize each group, followed by 1 for unnormalized data.
+
+        Parameters
+        ----------
+        simulations : numpy ndarray
+            Simulated values with shape (len(obs_names), len(conditions), len(timepoints)).
+        timepoints : Sequence[int], optional
+            Sorted timepoints of the last axis of ``simulations``,
+            if ``simulations`` is not evaluated at every timepoint.
+        """
+        factors = np.ones(len(self.norm_obs) + 1)
+        fixed = self.norm_time >= 0
+        if np.any(fixed):
+            values = simulations[
+                self.norm_obs[fixed], :, self._column(self.norm_time[fixed], timepoints)
+            ]
+            factors[:-1][fixed] = np.max(
+                np.where(self.norm_conditions[fixed], values, -np.inf), axis=1
+            )
+        if not np.all(fixed):
+            values = simulations[self.norm_obs[~fixed]]
+            factors[:-1][~fixed] = np.max(
+                np.where(self.norm_conditions[~fixed][:, :, np.newaxis], values, -np.inf),
+                axis=(1, 2),
+            )
+        return factors
+
+    def residuals(
+        self, simulations: np.ndarray, timepoints: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
+        """
+        Return normalized simulated values minus measured values.
+
+        Parameters
+        ----------
+        simulations : numpy ndarray
+            Simulated values with shape (len(obs_names), len(conditions), len(timepoints)).
+        timepoints : Sequence[int], optional
+            Sorted timepoints of the last axis of ``simulations``,
+            if ``simulations`` is not evaluated at every timepoint.
+        """
+        sim_val = simulations[
+            self.obs_index, self.condition_index, self._column(self.time_index, timepoints)
+        ]
+        return (
+            sim_val / self.normalization_factors(simulations, timepoints)[self.group] - self.value
+        )
+
+    def rss(
+        self,
+        simulations: np.ndarray,
+        timepoints: Optional[Sequence[int]] = None,
+        weighted: bool = False,
+    ) -> float:
+        """
+        Return the residual sum of squares.
+        If ``weighted`` is :obj:`True`, residuals are divided by error bars,
+        measurements without error bars being weighted by 1.
+        """
+        residuals = self.residuals(simulations, timepoints)
+        if weighted:
+            residuals = residuals / np.where(
+                np.isfinite(self.sigma) & (self.sigma > 0), self.sigma, 1
+            )
+        return float(np.dot(residuals, residuals))
+
+    def lower_bound(
+        self,
+        simulations: np.ndarray,
+        n_conditions: int,
+        timepoints: Optional[Sequence[int]] = None,
+    ) -> float:
+        """
+        Return a lower bound of the residual sum of squares
+        when only the first ``n_conditions`` conditions have been simulated.
+
+        Residuals of the simulated conditions are exact if their normalization groups
+        are complete. Otherwise the normalization factor of a group is only known to be
+        at least the maximum over the simulated conditions, and the sum of squares of the
+        group is minimized over such factors, which is a quadratic in their reciprocal.
+
+        Parameters
+        ----------
+        simulations : numpy ndarray
+            Simulated values with shape (len(obs_names), len(conditions), len(timepoints)),
+            filled for the first ``n_conditions`` conditions.
+        n_conditions : int
+            Number of simulated conditions.
+        timepoints : Sequence[int], optional
+            Sorted timepoints of the last axis of ``simulations``,
+            if ``simulations`` is not evaluated at every timepoint.
+        """
+        n_groups = len(self.norm_obs)
+        simulated = np.arange(self.norm_conditions.shape[1]) < n_conditions
+        # Groups whose normalization factor depends on conditions not simulated yet
+        pending = np.append(np.any(self.norm_conditions & ~simulated, axis=1), False)
+        factors = replace(
+            self, norm_conditions=self.norm_conditions & simulated
+        ).normalization_factors(simulations, timepoints)
+        rows = self.condition_index < n_conditions
+        group = self.group[rows]
+        sim_val = simulations[
+            self.obs_index[rows],
+            self.condition_index[rows],
+            self._column(self.time_index[rows], timepoints),
+        ]
+        value = self.value[rows]
+        exact = ~pending[group]
+        residuals = sim_val[exact] / factors[group[exact]] - value[exact]
+        error = float(np.dot(residuals, residuals))
+        if np.any(~exact):
+            # sum((sim_val * u - value) ** 2) = a * u ** 2 - 2 * b * u + c,
+            # where u = 1 / factor lies in (0, 1 / (partial maximum)] if the maximum is positive
+            a = np.bincount(group[~exact], sim_val[~exact] ** 2, n_groups + 1)
+            b = np.bincount(group[~exact], sim_val[~exact] * value[~exact], n_groups + 1)
+            c = np.bincount(group[~exact], value[~exact] ** 2, n_groups + 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                positive = factors > 0
+                u = np.clip(
+                    np.where(a > 0, b / a, 0),
+                    np.where(positive, 0, -np.inf),
+                    np.where(positive, 1 / factors, np.inf),
+                )
+            error += float(np.sum((a * u - 2 * b) * u + c))
+        return error
+
+    @staticmethod
+    def _column(time_index: np.ndarray, timepoints: Optional[Sequence[int]]) -> np.ndarray:
+        if timepoints is None:
+            return time_index
+        return np.searchsorted(timepoints, time_index)
+
+
+class ResidualsMixin(object):
+    """
+    Residual vector of ``OptimizationProblem``, shared by models.
+
+    Models provide ``set_data``, ``get_timepoint``, ``normalization``, ``update`` and
+    ``simulate``. If ``sparse_output`` is :obj:`True`, only the timepoints returned by
+    ``get_evaluation_timepoints`` are simulated.
+    """
+
+    _measurement_table: Optional[MeasurementTable] = None
+
+    @property
+    def measurement_table(self) -> MeasurementTable:
+        """
+        Experimental data compiled into :class:`MeasurementTable` from ``set_data``,
+        on first access.
+        """
+        if self._measurement_table is None:
+            self._measurement_table = MeasurementTable.from_problem(self)
+        return self._measurement_table
+
+    def _compute_residuals(
+        self, simulations: np.ndarray, timepoints: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
+        """
+        Return normalized residuals concatenated over observables.
+        """
+        return self.measurement_table.residuals(simulations, timepoints)
+
+    def residuals(self, indiv, *args) -> Optional[np.ndarray]:
+        """
+        Return normalized residuals, or :obj:`None` if simulation failed.
+        The sum of their squares equals the residual sum of squares of ``objective``.
+        """
+        if len(args) == 0:
+            (x, y0) = self.update(indiv)
+        elif len(args) == 1:
+            raise ValueError("not enough values to unpack (expected 2, got 1)")
+        elif len(args) == 2:
+            (x, y0) = args
+        else:
+            raise ValueError("too many values to unpack (expected 2)")
+
+        if getattr(self, "sparse_output", False):
+            timepoints = self.get_evaluation_timepoints()
+            is_successful = self.simulate(x, y0, timepoints=timepoints) is None
+        else:
+            timepoints = None
+            is_successful = self.simulate(x, y0) is None
+        return self._compute_residuals(self.simulations, timepoints) if is_successful else None
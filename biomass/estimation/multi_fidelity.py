@@ -0,0 +1,135 @@
+import warnings
+from typing import Optional
+
+import numpy as np
+
+from ..dynamics.solver import _tolerance, tolerance
+from ..model_object import ModelObject
+
+
+class MultiFidelityObjective(object):
+    """
+    Objective function screening candidates at low accuracy,
+    for :func:`scipy.optimize.differential_evolution`.
+
+    Each candidate is first simulated with loose tolerances of
+    :func:`~biomass.dynamics.solver.solve_ode` and, if the model supports ``sparse_output``,
+    only at measured timepoints. Candidates whose low-accuracy objective value is at most
+    ``factor`` times the best objective value in the population are evaluated again at full
+    accuracy, and the others are returned with their low-accuracy value.
+    Such values are larger than the best one, which is therefore always computed
+    at full accuracy, and so is the result.
+
+    After every generation, :meth:`update` sets the bound from the population and checks that
+    the low-accuracy value of the best individual does not exceed ``factor`` times its full
+    accuracy value. Otherwise candidates better than the best one might be screened out,
+    so the tolerances are made 10 times tighter, and screening stops once they reach
+    those of full accuracy, i.e., the tolerances of ``solve_ode`` in effect.
+
+    Attributes
+    ----------
+    model : ModelObject
+        The BioMASS model object.
+    rtol : float (default: 1e-4)
+        Relative tolerance for screening.
+    atol : float (default: 1e-6)
+        Absolute tolerance for screening.
+    factor : float (default: 2.0)
+        Margin of screening, must be >= 1.
+    bound : float, optional
+        Best objective value in the population, :obj:`None` until the first generation ends.
+
+    Examples
+    --------
+    >>> from scipy.optimize import differential_evolution
+    >>> from biomass import create_model
+    >>> from biomass.estimation import MultiFidelityObjective, Optimizer
+    >>> from biomass.models import copy_to_current
+    >>> copy_to_current("Nakakuki_Cell_2010")
+    >>> model = create_model("Nakakuki_Cell_2010")
+    >>> optimizer = Optimizer(model, differential_evolution, 1)
+    >>> res = optimizer.minimize(
+    ...     MultiFidelityObjective(model, rtol=1e-4, atol=1e-6),
+    ...     [(0, 1) for _ in range(len(model.problem.bounds))],
+    ...     disp=True,
+    ...     polish=False,
+    ... )
+    """
+
+    def __init__(
+        self,
+        model: ModelObject,
+        rtol: float = 1e-4,
+        atol: float = 1e-6,
+        factor: float = 2.0,
+    ):
+        if rtol <= 0 or atol <= 0:
+            raise ValueError("rtol and atol must be positive.")
+        if factor < 1:
+            raise ValueError("factor must be equal to or greater than 1.")
+        self.model = model
+        self.rtol = rtol
+        self.atol = atol
+        self.factor = factor
+        self.bound: Optional[float] = None
+
+    @property
+    def screening(self) -> bool:
+        """
+        Whether candidates are screened at low accuracy.
+        """
+        full_rtol, full_atol = _tolerance.get()
+        return self.rtol > full_rtol or self.atol > full_atol
+
+    def __call__(self, indiv_gene: np.ndarray) -> float:
+        """
+        Parameters
+        ----------
+        indiv_gene : ``numpy.ndarray``
+            Genes, not parameter values.
+
+        Returns
+        -------
+        obj_val : float
+            Objective function value, at full accuracy unless screened out.
+        """
+        if self.screening and self.bound is not None:
+            obj_val = self.evaluate_coarse(indiv_gene)
+            if obj_val > self.factor * self.bound:
+                return obj_val
+        return self.model.get_obj_val(indiv_gene)
+
+    def evaluate_coarse(self, indiv_gene: np.ndarray) -> float:
+        """
+        Return the objective function value at low accuracy.
+        """
+        problem = self.model.problem
+        sparse_output = getattr(problem, "sparse_output", None)
+        if sparse_output is not None:
+            problem.sparse_output = True
+        try:
+            with tolerance(self.rtol, self.atol):
+                return self.model.get_obj_val(indiv_gene)
+        finally:
+            if sparse_output is not None:
+                problem.sparse_output = sparse_output
+
+    def update(self, intermediate_result) -> None:
+        """
+        Set ``bound`` and check the consistency of screening, at the end of each generation.
+
+        Parameters
+        ----------
+        intermediate_result : ``scipy.optimize.OptimizeResult``
+            Passed to ``callback`` of :func:`scipy.optimize.differential_evolution`.
+        """
+        self.bound = float(intermediate_result.fun)
+        if not self.screening:
+            return
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            obj_val = self.evaluate_coarse(intermediate_result.x)
+        if obj_val > self.factor * intermediate_result.fun:
+            full_rtol, full_atol = _tolerance.get()
+            self.rtol = max(self.rtol / 10, full_rtol)
+            self.atol = max(self.atol / 10, full_atol)
@@ -1,3 +1,5 @@
+import inspect
+import json
 import multiprocessing
 import os
 import shutil
@@ -5,26 +7,72 @@ import sys
 import warnings
 from dataclasses import dataclass
 from math import isfinite
-from typing import Callable, List, Union
+from typing import Callable, List, Optional, Tuple, Union
 
 import numpy as np
+from scipy.optimize import differential_evolution, least_squares
 from tqdm import tqdm
 
+from ..dynamics.ensemble import simulate_batch
 from ..model_object import ModelObject
+from .multi_fidelity import MultiFidelityObjective
+from .progress import FILENAME as PROGRESS_FILENAME
+from .progress import ProgressRecorder, load_progress
 
 DIRNAME = "_tmp"
+MESSAGE_HEAD = "differential_evolution step "
+
+
+def _call_callback(callback: Callable, intermediate_result) -> Optional[bool]:
+    """
+    Call ``callback`` of differential_evolution with ``intermediate_result``
+    or, in the legacy signature, with ``xk`` and ``convergence``.
+    """
+    if list(inspect.signature(callback).parameters) == ["intermediate_result"]:
+        return callback(intermediate_result)
+    return callback(intermediate_result.x, convergence=intermediate_result.convergence)
+
+
+def _get_rng_state(rng: Union[None, np.random.Generator, np.random.RandomState]) -> dict:
+    """
+    State of the random number generator used by differential_evolution as ``seed``,
+    :obj:`None` meaning the global ``numpy.random`` state.
+    """
+    if isinstance(rng, np.random.Generator):
+        kind, state = "Generator", rng.bit_generator.state
+    else:
+        kind = "global" if rng is None else "RandomState"
+        state = (np.random if rng is None else rng).get_state(legacy=False)
+    return {"kind": kind, "state": state}
+
+
+def _set_rng_state(rng_state: dict) -> Union[None, np.random.Generator, np.random.RandomState]:
+    """
+    Restore the random number generator saved by :func:`_get_rng_state`.
+    """
+    kind, state = rng_state.get("kind", "Generator"), rng_state.get("state", rng_state)
+    if "key" in state["state"]:
+        # MT19937
+        state["state"]["key"] = np.asarray(state["state"]["key"], dtype=np.uint32)
+    if kind == "Generator":
+        rng = np.random.default_rng()
+        rng.bit_generator.state = state
+        return rng
+    rng = None if kind == "global" else np.random.RandomState()
+    (np.random if rng is None else rng).set_state(state)
+    return rng
 
 
 class Tee(object):
     """
-    Duplicate stdout to _tmp/optimization.log.
+    Duplicate stdout to _tmp/optimization.log, appended if ``append`` is :obj:`True`.
     """
 
-    def __init__(self, model_path: str, x_id: int, disp_here: bool):
+    def __init__(self, model_path: str, x_id: int, disp_here: bool, append: bool = False):
         self.disp_here = disp_here
         self.file = open(
             os.path.join(model_path, "out", DIRNAME + str(x_id), "optimization.log"),
-            mode="w",
+            mode="a" if append else "w",
             encoding="utf-8",
         )
         self.stdout = sys.stdout
@@ -59,6 +107,36 @@ class Optimizer(object):
         Whether to show the evaluated *objective* at every iteration.
     overwrite : bool (default: :obj:`False`)
         If :obj:`True`, the directory (``x_id/``) will be overwritten.
+    checkpoint_every : int, optional
+        Save the population, its objective values, the state of the random number generator
+        and the number of generations to ``out/x_id/checkpoint.npz``
+        every ``checkpoint_every`` generations.
+        Only available for :func:`scipy.optimize.differential_evolution` (SciPy >= 1.12).
+    resume : bool (default: :obj:`False`)
+        If :obj:`True` and ``out/x_id/checkpoint.npz`` exists, continue the optimization
+        from the checkpoint instead of starting a new one.
+        The population is re-evaluated once at the beginning. The continued optimization
+        is reproducible but not identical to an uninterrupted one, because the order in which
+        differential evolution samples the population is not saved.
+    early_abort : float, optional
+        If given, ``model.problem.error_bound`` is set to ``early_abort`` (>= 1) times
+        the worst objective value in the population after every generation, so that
+        simulations of trial vectors stop as soon as their error is known to exceed it.
+        The objective function then returns a lower bound of the error larger than
+        ``error_bound``; such trial vectors would be rejected anyway and the result
+        of differential evolution is unchanged. As a trial vector only competes with
+        its own target vector, which is usually much better than the worst one,
+        few simulations are stopped and the time saved is small.
+        ``error_bound`` must be supported by ``observable.py`` and ``problem.py``
+        (see ``Nakakuki_Cell_2010``).
+        Only available for :func:`scipy.optimize.differential_evolution` (SciPy >= 1.12).
+
+    Notes
+    -----
+    With :func:`scipy.optimize.differential_evolution`, the progress of every generation
+    is recorded by :class:`~biomass.estimation.ProgressRecorder` in
+    ``out/x_id/progress.jsonl``, and the messages of ``disp`` are written by the
+    callback, with generation numbers continued when resuming.
 
     Examples
     --------
@@ -105,14 +183,35 @@ class Optimizer(object):
         x_id: int,
         disp_here: bool = False,
         overwrite: bool = False,
+        checkpoint_every: Optional[int] = None,
+        resume: bool = False,
+        early_abort: Optional[float] = None,
     ):
         self.model = model
         self.optimize = optimize
         self.x_id = x_id
         self.disp_here = disp_here
+        if checkpoint_every is not None and checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be a positive integer.")
+        self.checkpoint_every = checkpoint_every
+        self.resume = resume
+        if early_abort is not None:
+            if early_abort < 1:
+                raise ValueError(
+                    "early_abort must be at least 1, otherwise aborted trial vectors "
+                    "could replace better target vectors."
+                )
+            if not hasattr(model.problem, "error_bound"):
+                raise AttributeError(
+                    "early_abort requires `error_bound` in observable.py of the model. "
+                    "See biomass/models/Nakakuki_Cell_2010/observable.py."
+                )
+        self.early_abort = early_abort
 
         self.savedir = os.path.join(self.model.path, "out", f"{self.x_id}")
-        if os.path.isdir(self.savedir) and not overwrite:
+        if os.path.isdir(self.savedir) and resume and self.x_id not in model.get_executable():
+            pass
+        elif os.path.isdir(self.savedir) and not overwrite:
             raise ValueError(
                 f"out{os.sep}{self.x_id} already exists in {self.model.path}. "
                 "Use another parameter id or set `overwrite` to True."
@@ -120,8 +219,9 @@ class Optimizer(object):
         elif os.path.isdir(self.savedir) and overwrite:
             files = os.listdir(self.savedir)
             for file in files:
-                if any(map(file.__contains__, (".npy", ".log"))):
+                if any(map(file.__contains__, (".npy", ".npz", ".log", ".jsonl"))):
                     os.remove(os.path.join(self.savedir, file))
+            self.model.results_store.remove(self.x_id)
         else:
             os.makedirs(self.savedir, exist_ok=True)
         os.makedirs(os.path.join(self.model.path, "out", DIRNAME + str(self.x_id)), exist_ok=True)
@@ -130,15 +230,254 @@ class Optimizer(object):
     def minimize(self, *args, **kwargs):
         """
         Execute the external optimizer.
+        If the objective function is a :class:`MultiFidelityObjective`,
+        it is updated at the end of each generation.
         """
         os.makedirs(os.path.join(self.model.path, "out", DIRNAME + str(self.x_id)), exist_ok=True)
-        with Tee(self.model.path, self.x_id, self.disp_here):
+        obj_fun = args[0] if args else kwargs.get("func")
+        screening = obj_fun if isinstance(obj_fun, MultiFidelityObjective) else None
+        checkpoint = None
+        if self.optimize is differential_evolution:
+            kwargs, checkpoint = self._setup_callback(kwargs, screening)
+        elif (
+            self.checkpoint_every is not None
+            or self.resume
+            or self.early_abort is not None
+            or screening is not None
+        ):
+            raise ValueError(
+                "checkpoint_every, resume, early_abort and MultiFidelityObjective are only "
+                "available for scipy.optimize.differential_evolution."
+            )
+        n_iter_offset = 0 if checkpoint is None else int(checkpoint["nit"])
+        if n_iter_offset > 0:
+            self._truncate_log(n_iter_offset)
+        try:
+            with Tee(self.model.path, self.x_id, self.disp_here, append=n_iter_offset > 0):
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    res = self.optimize(*args, **kwargs)
+        finally:
+            if self.early_abort is not None:
+                self.model.problem.error_bound = None
+        if checkpoint is not None:
+            res.nit += int(checkpoint["nit"])
+            res.nfev += int(checkpoint["nfev"])
+        return res
+
+    @property
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.savedir, "checkpoint.npz")
+
+    def _load_checkpoint(self) -> Optional[dict]:
+        if not os.path.isfile(self._checkpoint_path):
+            return None
+        with np.load(self._checkpoint_path) as data:
+            checkpoint = {key: data[key] for key in data.files}
+        checkpoint["rng_state"] = json.loads(str(checkpoint["rng_state"]))
+        return checkpoint
+
+    def _save_checkpoint(
+        self,
+        intermediate_result,
+        rng: Union[None, np.random.Generator, np.random.RandomState],
+        n_iter_offset: int,
+        nfev_offset: int,
+    ) -> None:
+        # Write to a temporary file first so that a checkpoint is never left half-written
+        tmp_path = os.path.join(self.savedir, "checkpoint_tmp.npz")
+        np.savez(
+            tmp_path,
+            population=intermediate_result.population,
+            population_energies=intermediate_result.population_energies,
+            nit=n_iter_offset + intermediate_result.nit,
+            nfev=nfev_offset + intermediate_result.nfev,
+            rng_state=json.dumps(
+                _get_rng_state(rng),
+                default=lambda obj: obj.tolist() if isinstance(obj, np.ndarray) else obj,
+            ),
+        )
+        os.replace(tmp_path, self._checkpoint_path)
+
+    def _setup_callback(
+        self, kwargs: dict, screening: Optional[MultiFidelityObjective] = None
+    ) -> Tuple[dict, Optional[dict]]:
+        """
+        Set ``seed``, ``callback``, ``init``, ``maxiter`` and ``disp`` of
+        :func:`scipy.optimize.differential_evolution` for recording the progress,
+        checkpointing, resuming, updating the error bound of early abort
+        and multi-fidelity screening.
+        """
+        kwargs = dict(kwargs)
+        checkpoint = self._load_checkpoint() if self.resume else None
+        # The generator is created as differential_evolution would, so that a given seed
+        # yields the same optimization with or without checkpoints.
+        if "rng" in kwargs:
+            rng = np.random.default_rng(kwargs.pop("rng"))
+        else:
+            rng = kwargs.pop("seed", None)
+            if isinstance(rng, (int, np.integer)):
+                rng = np.random.RandomState(rng)
+        n_iter_offset = 0
+        nfev_offset = 0
+        if checkpoint is not None:
+            rng = _set_rng_state(checkpoint["rng_state"])
+            n_iter_offset = int(checkpoint["nit"])
+            nfev_offset = int(checkpoint["nfev"])
+            kwargs["init"] = checkpoint["population"]
+            kwargs["maxiter"] = max(kwargs.get("maxiter", 1000) - n_iter_offset, 0)
+        kwargs["seed"] = rng
+        user_callback = kwargs.pop("callback", None)
+        disp = kwargs.pop("disp", False)
+        recorder = ProgressRecorder(
+            os.path.join(self.model.path, "out", DIRNAME + str(self.x_id), PROGRESS_FILENAME),
+            n_iter_offset,
+            nfev_offset,
+        )
+
+        def callback(intermediate_result):
+            record = recorder(intermediate_result)
+            if disp:
+                print(f"{MESSAGE_HEAD}{record['nit']:d}: f(x)= {record['fun']}")
+            if (
+                self.checkpoint_every is not None
+                and (n_iter_offset + intermediate_result.nit) % self.checkpoint_every == 0
+            ):
+                self._save_checkpoint(intermediate_result, rng, n_iter_offset, nfev_offset)
+            if self.early_abort is not None:
+                # Trial vectors worse than every target vector cannot be accepted
+                self.model.problem.error_bound = self.early_abort * float(
+                    np.max(intermediate_result.population_energies)
+                )
+            if screening is not None:
+                screening.update(intermediate_result)
+            if user_callback is None:
+                return False
+            return _call_callback(user_callback, intermediate_result)
+
+        kwargs["callback"] = callback
+        return kwargs, checkpoint
+
+    def _truncate_log(self, n_iter: int) -> None:
+        """
+        Drop messages logged after the generation ``n_iter`` from which the optimization resumes.
+        """
+        path_to_log = os.path.join(
+            self.model.path, "out", DIRNAME + str(self.x_id), "optimization.log"
+        )
+        if not os.path.isfile(path_to_log):
+            return
+        with open(path_to_log, mode="r", encoding="utf-8") as f:
+            log_file = f.readlines()
+        n_steps = 0
+        for i, message in enumerate(log_file):
+            if message.startswith(MESSAGE_HEAD):
+                n_steps += 1
+                if n_steps > n_iter:
+                    log_file = log_file[:i]
+                    break
+        with open(path_to_log, mode="w", encoding="utf-8") as f:
+            f.writelines(log_file)
+
+    def refine(
+        self,
+        indiv_gene: np.ndarray,
+        *,
+        step: float = 1e-4,
+        batch_size: int = 32,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Polish a solution with :func:`scipy.optimize.least_squares`.
+
+        The residual vector is given by ``model.problem.residuals`` and its Jacobian
+        with respect to the genes is approximated by forward differences,
+        simulating all perturbed parameter sets with
+        :func:`~biomass.dynamics.ensemble.simulate_batch`.
+
+        Parameters
+        ----------
+        indiv_gene : ``numpy.ndarray``
+            Genes, not parameter values, e.g., ``res.x`` returned by :meth:`minimize`.
+        step : float (default: 1e-4)
+            Step size of forward differences in gene space.
+        batch_size : int (default: 32)
+            Maximum number of parameter sets integrated together.
+        **kwargs
+            Keyword arguments to pass to ``scipy.optimize.least_squares``.
+
+        Returns
+        -------
+        indiv_gene : ``numpy.ndarray``
+            Refined genes, or a copy of the input if the objective was not improved.
+
+        Examples
+        --------
+        >>> res = optimizer.minimize(obj_fun, bounds, **optimizer_options)
+        >>> param_values = model.gene2val(optimizer.refine(res.x))
+        >>> optimizer.import_solution(param_values)
+        """
+        problem = self.model.problem
+        if not hasattr(problem, "residuals"):
+            raise AttributeError(
+                "Define residuals in problem.py to refine the solution. "
+                "See biomass/construction/template/problem.py."
+            )
+        indiv_gene = np.clip(np.asarray(indiv_gene, dtype=float), 0, 1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            residuals = problem.residuals(self.model.gene2val(indiv_gene))
+        if residuals is None or not np.all(np.isfinite(residuals)):
+            return indiv_gene.copy()
+        # Failed simulations are penalized by the same value as objective
+        penalty = np.full(len(residuals), np.sqrt(1e12 / max(len(residuals), 1)))
+
+        def fun(gene: np.ndarray) -> np.ndarray:
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
-                res = self.optimize(*args, **kwargs)
-        return res
+                residuals = problem.residuals(self.model.gene2val(gene))
+            if residuals is None or not np.all(np.isfinite(residuals)):
+                return penalty
+            return residuals
+
+        def jac(gene: np.ndarray) -> np.ndarray:
+            # Step inward at the upper bound
+            h = np.where(gene + step <= 1, step, -step)
+            genes = np.vstack([gene, gene + np.diag(h)])
+            x_y0 = [problem.update(self.model.gene2val(g)) for g in genes]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                simulations, success = simulate_batch(
+                    problem,
+                    [x for x, _ in x_y0],
+                    [y0 for _, y0 in x_y0],
+                    batch_size=batch_size,
+                )
+            if not success[0]:
+                return np.zeros((len(penalty), len(gene)))
+            base = problem._compute_residuals(simulations[0])
+            jacobian = np.zeros((len(base), len(gene)))
+            for k in range(len(gene)):
+                if success[k + 1]:
+                    jacobian[:, k] = (problem._compute_residuals(simulations[k + 1]) - base) / h[k]
+            jacobian[~np.isfinite(jacobian)] = 0
+            return jacobian
+
+        kwargs.setdefault("method", "trf")
+        res = least_squares(fun, indiv_gene, jac=jac, bounds=(0, 1), **kwargs)
+        refined = np.clip(res.x, 0, 1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if self.model.get_obj_val(refined) < self.model.get_obj_val(indiv_gene):
+                return refined
+        return indiv_gene.copy()
 
     def _get_n_iter(self) -> int:
+        path_to_progress = os.path.join(self.savedir, PROGRESS_FILENAME)
+        if os.path.isfile(path_to_progress):
+            nit = load_progress(path_to_progress)["nit"]
+            return int(nit[-1]) if len(nit) else 0
+        # Optimizers other than differential_evolution: one message per iteration
         n_iter: int = 0
         path_to_log = os.path.join(self.savedir, "optimization.log")
         with open(path_to_log, mode="r", encoding="utf-8") as f:
@@ -151,7 +490,8 @@ class Optimizer(object):
     def import_solution(self, x: Union[np.ndarray, List[float]], cleanup: bool = True) -> None:
         """
         Import the solution of the optimization to the model.
-        The solution vector `x` will be saved to `path_to_model`/out/`x_id`/.
+        The solution vector `x` will be appended to :class:`~biomass.estimation.ResultsStore` in
+        `path_to_model`/out/ and the log will be saved to `path_to_model`/out/`x_id`/.
         Use ``biomass.run_simulation`` to visualize the optimization result.
 
         Parameters
@@ -161,17 +501,16 @@ class Optimizer(object):
         cleanup : bool (default: True)
             If True (default), delete the temporary folder after the optimization is finished.
         """
-        shutil.move(
-            os.path.join(self.model.path, "out", DIRNAME + str(self.x_id), "optimization.log"),
-            self.savedir,
-        )
+        for file in ["optimization.log", PROGRESS_FILENAME]:
+            path_to_file = os.path.join(self.model.path, "out", DIRNAME + str(self.x_id), file)
+            if os.path.isfile(path_to_file):
+                shutil.move(path_to_file, os.path.join(self.savedir, file))
 
         best_fitness: float = self.model.problem.objective(x)
         n_iter = self._get_n_iter()
-        np.save(os.path.join(self.savedir, "best_fitness"), best_fitness)
-        np.save(os.path.join(self.savedir, "count_num"), n_iter)
-        np.save(os.path.join(self.savedir, "generation"), n_iter)
-        np.save(os.path.join(self.savedir, f"fit_param{n_iter}"), x)
+        self.model.results_store.append(self.x_id, n_iter, best_fitness, x)
+        if os.path.isfile(self._checkpoint_path):
+            os.remove(self._checkpoint_path)
         if cleanup:
             shutil.rmtree(os.path.join(self.model.path, "out", DIRNAME + str(self.x_id)))
 
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+__all__ = ["ProgressRecorder", "load_progress"]
+
+# Name of the progress record in out/x_id/
+FILENAME = "progress.jsonl"
+# Fields of each record, one per generation
+FIELDS = ("nit", "fun", "spread", "nfev", "elapsed")
+
+
+class ProgressRecorder(object):
+    """
+    Record the progress of :func:`scipy.optimize.differential_evolution` as JSON lines,
+    one line per generation, from its ``callback``.
+
+    Each line holds the generation number (``nit``), the best objective function value
+    (``fun``), the standard deviation of objective function values in the population
+    (``spread``), the number of evaluations of the objective function (``nfev``)
+    and the elapsed time in seconds (``elapsed``).
+    When resuming from generation ``n_iter_offset``, later records are dropped and
+    new ones are appended, continuing the counts and the elapsed time.
+
+    Attributes
+    ----------
+    path : str
+        Path to the record, e.g., ``out/x_id/progress.jsonl``.
+    n_iter_offset : int (default: 0)
+        Number of generations before resuming.
+    nfev_offset : int (default: 0)
+        Number of evaluations before resuming.
+    """
+
+    def __init__(self, path: str, n_iter_offset: int = 0, nfev_offset: int = 0):
+        self.path = path
+        self.n_iter_offset = n_iter_offset
+        self.nfev_offset = nfev_offset
+        self._elapsed_offset = 0.0
+        records = []
+        if n_iter_offset > 0 and os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                records = [line for line in f if json.loads(line)["nit"] <= n_iter_offset]
+            if records:
+                self._elapsed_offset = json.loads(records[-1])["elapsed"]
+        with open(path, mode="w", encoding="utf-8") as f:
+            f.writelines(records)
+        self._start = time.perf_counter()
+        self.last: Optional[dict] = None
+
+    def __call__(self, intermediate_result) -> dict:
+        """
+        Append the record of a generation.
+
+        Parameters
+        ----------
+        intermediate_result : ``scipy.optimize.OptimizeResult``
+            Passed to ``callback`` of :func:`scipy.optimize.differential_evolution`.
+
+        Returns
+        -------
+        record : dict
+            The appended record.
+        """
+        energies = np.asarray(intermediate_result.population_energies, dtype=float)
+        record = {
+            "nit": self.n_iter_offset + int(intermediate_result.nit),
+            "fun": float(intermediate_result.fun),
+            "spread": float(np.std(energies[np.isfinite(energies)])) if energies.size else 0.0,
+            "nfev": self.nfev_offset + int(intermediate_result.nfev),
+            "elapsed": self._elapsed_offset + time.perf_counter() - self._start,
+        }
+        with open(self.path, mode="a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.last = record
+        return record
+
+
+def load_progress(path: str) -> Dict[str, np.ndarray]:
+    """
+    Read a record written by :class:`ProgressRecorder`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the record, or to the directory ``out/x_id/`` containing ``progress.jsonl``.
+
+    Returns
+    -------
+    progress : Dict[str, numpy.ndarray]
+        Arrays of ``nit``, ``fun``, ``spread``, ``nfev`` and ``elapsed``, one element
+        per generation.
+
+    Examples
+    --------
+    >>> from biomass.estimation import load_progress
+    >>> progress = load_progress("Nakakuki_Cell_2010/out/1")
+    >>> progress["fun"][-1]
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, FILENAME)
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {
+        field: np.array(
+            [record[field] for record in records], dtype=int if field in ("nit", "nfev") else float
+        )
+        for field in FIELDS
+    }
@@ -0,0 +1,324 @@
+import json
+import os
+import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+__all__ = ["ResultsStore", "StoredResult", "StoredResults", "migrate_results"]
+
+# Columns preceding parameter values in each record
+COLUMNS: Tuple[str, ...] = ("x_id", "generation", "best_fitness")
+
+
+class StoredResult(NamedTuple):
+    """
+    Result of a parameter estimation.
+
+    Attributes
+    ----------
+    x_id : int
+        Index of parameter set.
+    generation : int
+        Number of generations.
+    best_fitness : float
+        Objective function value of the solution.
+    values : numpy.ndarray
+        Estimated parameter values, i.e., ``model.gene2val`` of the solution.
+    """
+
+    x_id: int
+    generation: int
+    best_fitness: float
+    values: np.ndarray
+
+
+class StoredResults(NamedTuple):
+    """
+    Results of multiple parameter estimations, one row per run.
+
+    Attributes
+    ----------
+    x_ids : numpy.ndarray
+        Indices of parameter sets with shape (runs, ).
+    generation : numpy.ndarray
+        Numbers of generations with shape (runs, ).
+    best_fitness : numpy.ndarray
+        Objective function values of the solutions with shape (runs, ).
+    values : numpy.ndarray
+        Estimated parameter values with shape (runs, number of parameter values).
+    """
+
+    x_ids: np.ndarray
+    generation: np.ndarray
+    best_fitness: np.ndarray
+    values: np.ndarray
+
+
+class ResultsStore(object):
+    """
+    Append-only store of parameter estimation results in ``out/``.
+
+    Results of all runs are records of a single binary file, ``out/results.dat``,
+    described by a small JSON index, ``out/results.json``. Each record holds ``x_id``,
+    the number of generations, the objective function value and parameter values,
+    all in float64. The file can be memory-mapped as an array with shape
+    (number of records, 3 + number of parameter values).
+    Records are only appended: a new record of ``x_id`` replaces the previous one and
+    a record with a negative number of generations removes it.
+    Appending is serialized with a file lock where ``fcntl`` is available,
+    so that multiple processes can write to the same store.
+
+    Parameter sets estimated before the store was introduced
+    (``out/x_id/generation.npy`` and ``out/x_id/fit_param*.npy``) are still read if they are
+    not in the store. Use :func:`migrate_results` to add them.
+
+    Attributes
+    ----------
+    path : str
+        Path to ``out/``.
+    """
+
+    DATA = "results.dat"
+    INDEX = "results.json"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._n_values: Optional[int] = None
+        self._cache_key: Optional[Tuple[int, int]] = None
+        self._records: Optional[np.ndarray] = None
+        self._rows: dict = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cache_key"] = None
+        state["_records"] = None
+        state["_rows"] = {}
+        return state
+
+    @property
+    def n_values(self) -> Optional[int]:
+        """
+        Number of parameter values in each record, :obj:`None` if the store is not created.
+        """
+        if self._n_values is None:
+            try:
+                with open(os.path.join(self.path, self.INDEX), encoding="utf-8") as f:
+                    self._n_values = int(json.load(f)["n_values"])
+            except FileNotFoundError:
+                pass
+        return self._n_values
+
+    def _create(self, n_values: int) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = os.path.join(self.path, f"{self.INDEX}.{os.getpid()}")
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump({"format": 1, "columns": list(COLUMNS), "n_values": n_values}, f)
+        os.replace(tmp_path, os.path.join(self.path, self.INDEX))
+
+    def _write(self, record: np.ndarray) -> None:
+        n_values = self.n_values
+        if n_values is None:
+            self._create(len(record) - len(COLUMNS))
+        elif len(record) != len(COLUMNS) + n_values:
+            raise ValueError(
+                f"Expected {n_values:d} parameter values, got {len(record) - len(COLUMNS):d}. "
+                f"Move {os.path.join(self.path, self.DATA)} if the search space has changed."
+            )
+        fd = os.open(
+            os.path.join(self.path, self.DATA), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+        )
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, record.astype("<f8").tobytes())
+        finally:
+            os.close(fd)
+
+    def append(self, x_id: int, generation: int, best_fitness: float, values) -> None:
+        """
+        Append the result of a parameter estimation, replacing the previous one of ``x_id``.
+        """
+        self._write(np.concatenate(([x_id, generation, best_fitness], np.ravel(values))))
+
+    def remove(self, x_id: int) -> None:
+        """
+        Remove the result of ``x_id``, if any.
+        """
+        if x_id in self._load():
+            self._write(np.concatenate(([x_id, -1, np.nan], np.full(self.n_values, np.nan))))
+
+    def records(self) -> np.ndarray:
+        """
+        Return all records, including replaced and removed ones, as a read-only array
+        memory-mapped from ``out/results.dat``.
+        """
+        self._load()
+        return self._records
+
+    def _load(self) -> dict:
+        """
+        Memory-map records and return the row of the latest record of each ``x_id``.
+        """
+        path_to_data = os.path.join(self.path, self.DATA)
+        n_values = self.n_values
+        size = os.path.getsize(path_to_data) if os.path.isfile(path_to_data) else 0
+        if n_values is None or size == 0:
+            self._cache_key = None
+            self._records = np.empty((0, len(COLUMNS) + (n_values or 0)))
+            self._rows = {}
+            return self._rows
+        if self._cache_key == (size, n_values):
+            return self._rows
+        width = len(COLUMNS) + n_values
+        # Ignore an incomplete record being written by another process
+        n_records = size // (8 * width)
+        records = np.memmap(path_to_data, dtype="<f8", mode="r", shape=(n_records, width))
+        x_ids = records[:, 0].astype(int)
+        # Latest record of each x_id
+        latest = n_records - 1 - np.unique(x_ids[::-1], return_index=True)[1]
+        latest = latest[records[latest, 1] >= 0]
+        self._rows = dict(zip(x_ids[latest].tolist(), latest.tolist()))
+        self._records = records
+        self._cache_key = (size, n_values)
+        return self._rows
+
+    def __contains__(self, x_id: int) -> bool:
+        return x_id in self._load()
+
+    def get(self, x_id: int) -> StoredResult:
+        """
+        Return the result of ``x_id``, from the legacy layout if it is not in the store.
+        """
+        rows = self._load()
+        if x_id in rows:
+            record = self._records[rows[x_id]]
+            return StoredResult(
+                x_id, int(record[1]), float(record[2]), np.array(record[len(COLUMNS) :])
+            )
+        result = _load_legacy(self.path, x_id)
+        if result is None:
+            raise KeyError(f"No optimization result of x_id={x_id:d} in {self.path}.")
+        return result
+
+    def get_many(self, x_ids: Optional[Sequence[int]] = None) -> StoredResults:
+        """
+        Return the results of ``x_ids`` at once, reading each of them only once.
+
+        Parameters
+        ----------
+        x_ids : Sequence[int], optional
+            Indices of parameter sets, all of those with results by default.
+        """
+        x_ids = self.x_ids() if x_ids is None else [int(x_id) for x_id in x_ids]
+        rows = self._load()
+        in_store = np.array([x_id in rows for x_id in x_ids], dtype=bool)
+        # Records in the store are gathered in one read of the memory-mapped file
+        records = self._records[[rows[x_id] for x_id in x_ids if x_id in rows]]
+        legacy = [self.get(x_id) for x_id in x_ids if x_id not in rows]
+        n_values = records.shape[1] - len(COLUMNS) if len(records) else None
+        if n_values is None:
+            n_values = len(legacy[0].values) if legacy else 0
+        generation = np.empty(len(x_ids), dtype=int)
+        best_fitness = np.empty(len(x_ids))
+        values = np.empty((len(x_ids), n_values))
+        if len(records):
+            generation[in_store] = records[:, 1]
+            best_fitness[in_store] = records[:, 2]
+            values[in_store] = records[:, len(COLUMNS) :]
+        for i, result in zip(np.flatnonzero(~in_store), legacy):
+            generation[i] = result.generation
+            best_fitness[i] = result.best_fitness
+            values[i] = result.values
+        return StoredResults(np.array(x_ids, dtype=int), generation, best_fitness, values)
+
+    def x_ids(self, include_legacy: bool = True) -> List[int]:
+        """
+        Return sorted indices of parameter sets with results.
+
+        Parameters
+        ----------
+        include_legacy : bool (default: :obj:`True`)
+            Whether to include parameter sets saved in the legacy layout.
+        """
+        x_ids = set(self._load())
+        if include_legacy:
+            x_ids.update(_find_legacy(self.path, exclude=x_ids))
+        return sorted(x_ids)
+
+
+def _find_legacy(path: str, exclude=()) -> List[int]:
+    """
+    Indices of parameter sets saved in the legacy layout, out/x_id/generation.npy.
+    """
+    try:
+        dirs = os.listdir(path)
+    except FileNotFoundError:
+        return []
+    return [
+        int(name)
+        for name in dirs
+        if re.fullmatch(r"\d+", name)
+        and int(name) not in exclude
+        and os.path.isfile(os.path.join(path, name, "generation.npy"))
+    ]
+
+
+def _load_legacy(path: str, x_id: int) -> Optional[StoredResult]:
+    savedir = os.path.join(path, f"{x_id:d}")
+    if not os.path.isfile(os.path.join(savedir, "generation.npy")):
+        return None
+    generation = int(np.load(os.path.join(savedir, "generation.npy")))
+    values = np.load(os.path.join(savedir, f"fit_param{generation:d}.npy"))
+    path_to_fitness = os.path.join(savedir, "best_fitness.npy")
+    best_fitness = (
+        float(np.load(path_to_fitness)) if os.path.isfile(path_to_fitness) else float("nan")
+    )
+    return StoredResult(x_id, generation, best_fitness, np.asarray(values, dtype=float))
+
+
+def migrate_results(path: str, remove_legacy: bool = False) -> List[int]:
+    """
+    Add parameter sets saved in the legacy layout to :class:`ResultsStore`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the model, or to its ``out/``.
+    remove_legacy : bool (default: :obj:`False`)
+        If :obj:`True`, ``generation.npy``, ``fit_param*.npy``, ``best_fitness.npy``
+        and ``count_num.npy`` are deleted after migration. ``optimization.log`` is kept.
+
+    Returns
+    -------
+    x_ids : List[int]
+        Migrated parameter sets.
+
+    Examples
+    --------
+    >>> from biomass import create_model
+    >>> from biomass.estimation import migrate_results
+    >>> model = create_model("Nakakuki_Cell_2010")
+    >>> migrate_results(model.path)
+    """
+    if os.path.basename(os.path.normpath(path)) != "out":
+        path = os.path.join(path, "out")
+    store = ResultsStore(path)
+    x_ids = sorted(_find_legacy(path, exclude=store.x_ids(include_legacy=False)))
+    for x_id in x_ids:
+        result = _load_legacy(path, x_id)
+        store.append(x_id, result.generation, result.best_fitness, result.values)
+    if remove_legacy:
+        for x_id in _find_legacy(path):
+            if x_id not in store:
+                continue
+            savedir = os.path.join(path, f"{x_id:d}")
+            for file in os.listdir(savedir):
+                if re.fullmatch(r"(generation|best_fitness|count_num|fit_param\d+)\.npy", file):
+                    os.remove(os.path.join(savedir, file))
+    return x_ids
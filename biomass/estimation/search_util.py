@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import List, NoReturn
 
 import numpy as np
@@ -181,3 +182,37 @@ def convert_scale(
     search_rgn = region[:, np.any(region != 0.0, axis=0)]
 
     return np.log10(search_rgn)
+
+
+@dataclass(frozen=True, eq=False)
+class SearchSpace(object):
+    """
+    Search bounds of a model, used to convert genes to actual values.
+
+    Attributes
+    ----------
+    lower : numpy ndarray
+        Lower bounds of parameters and/or initial conditions to be estimated, in log10 scale.
+    upper : numpy ndarray
+        Upper bounds of parameters and/or initial conditions to be estimated, in log10 scale.
+    """
+
+    lower: np.ndarray
+    upper: np.ndarray
+
+    @classmethod
+    def from_problem(cls, problem) -> "SearchSpace":
+        """
+        Build the search space from ``get_region`` of an optimization problem.
+        """
+        region = problem.get_region()
+        return cls(lower=region[0], upper=region[1])
+
+    def __len__(self) -> int:
+        return len(self.lower)
+
+    def gene2val(self, genes: np.ndarray) -> np.ndarray:
+        """
+        Convert genes with shape (..., len(self)), e.g., a whole population, to actual values.
+        """
+        return 10 ** (np.asarray(genes) * (self.upper - self.lower) + self.lower)
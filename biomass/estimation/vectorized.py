@@ -0,0 +1,176 @@
+import multiprocessing
+import os
+import warnings
+from typing import Optional
+
+import numpy as np
+
+from ..dynamics.ensemble import simulate_batch
+from ..model_object import ModelObject
+
+# Model created once in each worker process of VectorizedObjective
+_worker_model: Optional[ModelObject] = None
+_worker_batch_size: int = 32
+
+
+def _init_worker(pkg_name: str, use_compile: bool, batch_size: int) -> None:
+    from ..core import _load_worker_model
+
+    global _worker_model, _worker_batch_size
+    _worker_model = _load_worker_model(pkg_name, use_compile)
+    _worker_batch_size = batch_size
+
+
+def _evaluate_in_worker(genes: np.ndarray) -> np.ndarray:
+    return _evaluate(_worker_model, genes, _worker_batch_size)
+
+
+def _evaluate(model: ModelObject, genes: np.ndarray, batch_size: int) -> np.ndarray:
+    """
+    Return objective function values of genes with shape (S, len(model.problem.bounds)).
+    """
+    problem = model.problem
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        indiv_values = model.gene2val(genes)
+        x_y0 = [problem.update(indiv) for indiv in indiv_values]
+        simulations, success = simulate_batch(
+            problem, [x for x, _ in x_y0], [y0 for _, y0 in x_y0], batch_size=batch_size
+        )
+        return np.array(
+            [
+                _replay_objective(problem, indiv, x, y0, simulations[j] if success[j] else None)
+                for j, (indiv, (x, y0)) in enumerate(zip(indiv_values, x_y0))
+            ]
+        )
+
+
+def _replay_objective(
+    problem, indiv: np.ndarray, x: list, y0: list, simulations: Optional[np.ndarray]
+) -> float:
+    """
+    Call ``problem.objective`` with ``problem.simulate`` replaced by a function that returns
+    the already computed ``simulations``, or fails if :obj:`None`.
+    """
+
+    def replay(x, y0, *args, timepoints=None, **kwargs):
+        if simulations is None:
+            return False
+        problem.simulations = (
+            simulations
+            if timepoints is None
+            else simulations[..., np.searchsorted(problem.t, timepoints)]
+        )
+        return None
+
+    problem.simulate = replay
+    try:
+        return problem.objective(indiv, x, y0)
+    finally:
+        del problem.simulate
+
+
+class VectorizedObjective(object):
+    """
+    Objective function evaluating a whole population at once,
+    for ``scipy.optimize.differential_evolution`` with ``vectorized=True``.
+
+    The population is simulated with :func:`~biomass.dynamics.ensemble.simulate_batch`
+    and ``problem.objective`` is then called for each individual, with ``problem.simulate``
+    returning the simulation already computed, so that objective functions edited in
+    ``problem.py`` give the same values as ``model.get_obj_val``.
+
+    Attributes
+    ----------
+    model : ModelObject
+        The BioMASS model object.
+    n_workers : int (default: 1)
+        Number of worker processes. If larger than 1, each worker creates the model once
+        and the population is split among the workers at every call.
+        Set to -1 to use all available CPU cores.
+    batch_size : int (default: 32)
+        Maximum number of parameter sets integrated together.
+
+    Examples
+    --------
+    >>> from scipy.optimize import differential_evolution
+    >>> from biomass import create_model
+    >>> from biomass.estimation import Optimizer, VectorizedObjective
+    >>> from biomass.models import copy_to_current
+    >>> copy_to_current("Nakakuki_Cell_2010")
+    >>> model = create_model("Nakakuki_Cell_2010")
+    >>> optimizer = Optimizer(model, differential_evolution, 1)
+    >>> with VectorizedObjective(model, n_workers=4) as obj_fun:
+    ...     res = optimizer.minimize(
+    ...         obj_fun,
+    ...         [(0, 1) for _ in range(len(model.problem.bounds))],
+    ...         vectorized=True,
+    ...         updating="deferred",
+    ...         disp=True,
+    ...         polish=False,
+    ...     )
+    """
+
+    def __init__(self, model: ModelObject, n_workers: int = 1, batch_size: int = 32):
+        if n_workers == -1:
+            n_workers = os.cpu_count() or 1
+        if n_workers < 1:
+            raise ValueError("n_workers must be a positive integer or -1.")
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
+        self.model = model
+        self.n_workers = n_workers
+        self.batch_size = batch_size
+        self._pool = None
+
+    def __call__(self, population: np.ndarray) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        population : ``numpy.ndarray``
+            Genes with shape (len(model.problem.bounds), S), or (len(model.problem.bounds), ).
+
+        Returns
+        -------
+        obj_val : ``numpy.ndarray``
+            Objective function values with shape (S, ), or a float for a single individual.
+        """
+        population = np.asarray(population, dtype=float)
+        genes = np.atleast_2d(population.T)
+        if self.n_workers == 1 or len(genes) < 2 * self.n_workers:
+            obj_val = _evaluate(self.model, genes, self.batch_size)
+        else:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(
+                    processes=self.n_workers,
+                    initializer=_init_worker,
+                    initargs=(
+                        self.model.path.replace(os.sep, "."),
+                        self.model.is_compiled,
+                        self.batch_size,
+                    ),
+                )
+            obj_val = np.concatenate(
+                self._pool.map(_evaluate_in_worker, np.array_split(genes, self.n_workers))
+            )
+        return obj_val if population.ndim > 1 else float(obj_val[0])
+
+    def close(self) -> None:
+        """
+        Terminate the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
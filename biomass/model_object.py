@@ -1,5 +1,5 @@
 import os
-import re
+import warnings
 from types import ModuleType
 from typing import List, NamedTuple
 
@@ -39,6 +39,9 @@ class ModelObject(object):
         self.problem = biomass_model.OptimizationProblem()
         self.viz = biomass_model.Visualization()
         self.rxn = biomass_model.ReactionNetwork()
+        self._search_space = None
+        self._search_space_key = None
+        self._results_store = None
 
     @property
     def path(self) -> str:
@@ -52,6 +55,15 @@ class ModelObject(object):
     def species(self) -> list:
         return self._species
 
+    @property
+    def is_compiled(self) -> bool:
+        """
+        Whether the right-hand side of the model has been compiled by :meth:`compile`.
+        """
+        from .dynamics.compiler import CompiledDiffeq
+
+        return isinstance(self.problem.diffeq, CompiledDiffeq)
+
     @property
     def observables(self) -> List[str]:
         duplicate = [
@@ -62,6 +74,69 @@ class ModelObject(object):
         else:
             raise NameError(f"Duplicate observables: {', '.join(duplicate)}")
 
+    @property
+    def search_space(self):
+        """
+        :class:`biomass.estimation.SearchSpace` of the model, built on first access.
+        It is rebuilt when ``idx_params`` or ``idx_initials`` of ``problem`` change.
+        """
+        from .estimation.search_util import SearchSpace
+
+        key = self._get_search_space_key()
+        if self._search_space is None or key != self._search_space_key:
+            self._search_space = SearchSpace.from_problem(self.problem)
+            self._search_space_key = key
+        return self._search_space
+
+    @property
+    def results_store(self):
+        """
+        :class:`biomass.estimation.ResultsStore` of parameter estimation results in ``out/``.
+        """
+        from .estimation.results_store import ResultsStore
+
+        if self._results_store is None:
+            self._results_store = ResultsStore(os.path.join(self.path, "out"))
+        return self._results_store
+
+    def _get_search_space_key(self) -> tuple:
+        return (tuple(self.problem.idx_params), tuple(self.problem.idx_initials))
+
+    def compile(self) -> bool:
+        """
+        Compile ``flux`` and ``diffeq`` into a Numba-jitted function over flat NumPy arrays.
+        The compiled function replaces ``problem.diffeq`` and is called directly
+        by :func:`biomass.dynamics.solver.solve_ode`, together with the analytic Jacobian
+        matrix when all rate equations can be differentiated symbolically.
+        If the model cannot be compiled, the original Python implementation is kept.
+
+        Returns
+        -------
+        is_compiled : bool
+            :obj:`True` if compilation succeeded.
+
+        Examples
+        --------
+        >>> from biomass import create_model
+        >>> from biomass.models import pan_rtk
+        >>> model = create_model(pan_rtk.__package__)
+        >>> model.compile()
+        True
+        """
+        from .dynamics.compiler import CompilationError, compile_diffeq
+
+        if self.is_compiled:
+            return True
+        try:
+            self.problem.diffeq = compile_diffeq(self.problem, self.ival(), self.pval())
+        except CompilationError as e:
+            warnings.warn(
+                f"{os.path.basename(self.path)} could not be compiled: {e}",
+                UserWarning,
+            )
+            return False
+        return True
+
     def get_individual(self, paramset_id: int) -> np.ndarray:
         """
         Get estimated parameter values from optimization results.
@@ -76,22 +151,7 @@ class ModelObject(object):
         best_individual : ``numpy.ndarray``
             Estimated parameter values.
         """
-        best_generation = np.load(
-            os.path.join(
-                self.path,
-                "out",
-                f"{paramset_id}",
-                "generation.npy",
-            )
-        )
-        best_individual = np.load(
-            os.path.join(
-                self.path,
-                "out",
-                f"{paramset_id}",
-                f"fit_param{int(best_generation)}.npy",
-            )
-        )
+        best_individual = self.results_store.get(paramset_id).values
         return best_individual
 
     def load_param(self, paramset: int) -> OptimizedValues:
@@ -117,32 +177,7 @@ class ModelObject(object):
         """
         Get executable parameter sets from optimization results.
         """
-        n_file = []
-        try:
-            fitparam_files = os.listdir(
-                os.path.join(
-                    self.path,
-                    "out",
-                )
-            )
-            for file in fitparam_files:
-                if re.match(r"\d", file):
-                    n_file.append(int(file))
-            empty_folder = []
-            for i, nth_paramset in enumerate(n_file):
-                if not os.path.isfile(
-                    os.path.join(
-                        self.path,
-                        "out",
-                        f"{nth_paramset:d}",
-                        "generation.npy",
-                    )
-                ):
-                    empty_folder.append(i)
-            for i in sorted(empty_folder, reverse=True):
-                n_file.pop(i)
-        except FileNotFoundError as e:
-            print(e)
+        n_file = self.results_store.x_ids()
         return n_file
 
     def gene2val(self, indiv_gene: np.ndarray) -> np.ndarray:
@@ -152,15 +187,14 @@ class ModelObject(object):
         Parameters
         ----------
         indiv_gene : ``numpy.ndarray``
-            Individual gene.
+            Individual gene, or genes with shape (S, len(indiv_gene)).
 
         Returns
         -------
         indiv_values : ``numpy.ndarray``
             Corresponding values.
         """
-        bounds = self.problem.get_region()
-        indiv_values = 10 ** (indiv_gene * (bounds[1, :] - bounds[0, :]) + bounds[0, :])
+        indiv_values = self.search_space.gene2val(indiv_gene)
         return indiv_values
 
     def get_obj_val(self, indiv_gene: np.ndarray) -> float:
@@ -1,8 +1,9 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 
-from biomass.dynamics.solver import get_steady_state, solve_ode
+from biomass.dynamics.perturbation import FluxScaling
+from biomass.dynamics.solver import SteadyStateCache, get_steady_state, solve_ode
 
 from .name2idx import C, V
 from .ode import DifferentialEquation
@@ -41,6 +42,20 @@ class Observable(DifferentialEquation):
     error_bars : list of dict
         Error bars to show in figures.
 
+    steady_state_cache : biomass.dynamics.solver.SteadyStateCache
+        Steady states without ligand, reused across simulations.
+
+    sparse_output : bool
+        If :obj:`True`, ``objective`` simulates only measured and normalization timepoints
+        and ``simulations`` holds one column per timepoint. Observables normalized by
+        their maximum are then normalized by the maximum over these timepoints,
+        so this is disabled by default.
+
+    error_bound : float, optional
+        If given, ``simulate`` stops after the condition at which the error of the simulated
+        conditions is known to exceed this value, see ``problem.objective``.
+        Set by the optimizer during parameter estimation.
+
     """
 
     def __init__(self):
@@ -65,13 +80,23 @@ class Observable(DifferentialEquation):
             self.normalization[observable] = {"timepoint": None, "condition": []}
         self.experiments: list = [None] * len(self.obs_names)
         self.error_bars: list = [None] * len(self.obs_names)
+        # Ligand is set to no_ligand before stimulation and neither EGF nor HRG equals it.
+        self.steady_state_cache = SteadyStateCache(ignored_params=[C.EGF, C.HRG, C.no_ligand])
+        self.sparse_output: bool = False
+        self.error_bound: Optional[float] = None
 
-    def simulate(self, x, y0, _perturbation=None):
+    def simulate(self, x, y0, _perturbation=None, *, timepoints: Optional[List[int]] = None):
         if _perturbation is not None:
-            self.perturbation = _perturbation
+            self.perturbation = FluxScaling(_perturbation)
+        # simulate only the given timepoints, e.g., during parameter estimation
+        t = self.t if timepoints is None else timepoints
+        if self.simulations.shape[-1] != len(t):
+            self.simulations = np.empty((len(self.obs_names), len(self.conditions), len(t)))
         # get steady state
         x[C.Ligand] = x[C.no_ligand]  # No ligand
-        y0 = get_steady_state(self.diffeq, y0, tuple(x), integrator="zvode")
+        y0 = get_steady_state(
+            self.diffeq, y0, tuple(x), integrator="zvode", cache=self.steady_state_cache
+        )
         if not y0:
             return False
         # add ligand
@@ -81,7 +106,7 @@ class Observable(DifferentialEquation):
             elif condition == "HRG":
                 x[C.Ligand] = x[C.HRG]
 
-            sol = solve_ode(self.diffeq, y0, self.t, tuple(x), method="BDF")
+            sol = solve_ode(self.diffeq, y0, t, tuple(x), method="BDF")
 
             if sol is None:
                 return False
@@ -106,6 +131,8 @@ class Observable(DifferentialEquation):
                 self.simulations[self.obs_names.index("Phosphorylated_cFos"), i] = (
                     sol.y[V.pcFOSn] * (x[C.Vn] / x[C.Vc]) + sol.y[V.pcFOSc]
                 )
+            if self.error_bound is not None and self._exceeds_error_bound(i + 1, timepoints):
+                return False
         return None
 
     def set_data(self):
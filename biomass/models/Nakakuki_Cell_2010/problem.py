@@ -1,13 +1,16 @@
 import numpy as np
 from scipy.spatial.distance import cosine
 
+from biomass.estimation import ResidualsMixin
+
 from .observable import Observable
 from .search_param import SearchParam
 
 
-class OptimizationProblem(Observable, SearchParam):
+class OptimizationProblem(Observable, SearchParam, ResidualsMixin):
     def __init__(self):
         super(OptimizationProblem, self).__init__()
+        self._partial_error = None
 
     @property
     def bounds(self):
@@ -19,6 +22,17 @@ class OptimizationProblem(Observable, SearchParam):
         ub = 10 ** search_region[1]
         return tuple(zip(lb, ub))
 
+    def get_evaluation_timepoints(self):
+        """
+        Sorted union of measured and normalization timepoints, used by ``objective``
+        instead of the full simulation time span.
+        """
+        table = self.measurement_table
+        timepoints = {self.t[0]}
+        timepoints.update(map(int, table.time_index))
+        timepoints.update(int(timepoint) for timepoint in table.norm_time if timepoint >= 0)
+        return sorted(timepoints)
+
     @staticmethod
     def _compute_objval_rss(sim_data, exp_data):
         """Return Residual Sum of Squares"""
@@ -41,6 +55,13 @@ class OptimizationProblem(Observable, SearchParam):
 
         return np.array(sim_val) / sim_norm_max, np.array(exp_val)
 
+    def _exceeds_error_bound(self, n_conditions, timepoints=None):
+        """Whether the error of the first n_conditions conditions already exceeds error_bound"""
+        self._partial_error = self.measurement_table.lower_bound(
+            self.simulations, n_conditions, timepoints
+        )
+        return self._partial_error > self.error_bound
+
     def objective(self, indiv, *args):
         """Define an objective function to be minimized"""
         if len(args) == 0:
@@ -52,54 +73,11 @@ class OptimizationProblem(Observable, SearchParam):
         else:
             raise ValueError("too many values to unpack (expected 2)")
 
-        self.set_data()
-
-        if self.simulate(x, y0) is None:
-            error = np.zeros(len(self.obs_names))
-            for i, obs_name in enumerate(self.obs_names):
-                if self.experiments[i] is not None:
-                    error[i] = self._compute_objval_rss(
-                        *self._diff_sim_and_exp(
-                            self.simulations[i],
-                            self.experiments[i],
-                            self.get_timepoint(obs_name),
-                            self.conditions,
-                            sim_norm_max=(
-                                1
-                                if not self.normalization
-                                else (
-                                    np.max(
-                                        self.simulations[
-                                            self.obs_names.index(obs_name),
-                                            [
-                                                self.conditions.index(c)
-                                                for c in (
-                                                    self.normalization[obs_name]["condition"]
-                                                    if self.normalization[obs_name]["condition"]
-                                                    else self.conditions
-                                                )
-                                            ],
-                                            self.normalization[obs_name]["timepoint"],
-                                        ]
-                                    )
-                                    if self.normalization[obs_name]["timepoint"] is not None
-                                    else np.max(
-                                        self.simulations[
-                                            self.obs_names.index(obs_name),
-                                            [
-                                                self.conditions.index(c)
-                                                for c in (
-                                                    self.normalization[obs_name]["condition"]
-                                                    if self.normalization[obs_name]["condition"]
-                                                    else self.conditions
-                                                )
-                                            ],
-                                        ]
-                                    )
-                                )
-                            ),
-                        )
-                    )
+        timepoints = self.get_evaluation_timepoints() if self.sparse_output else None
+
+        self._partial_error = None
+        if self.simulate(x, y0, timepoints=timepoints) is None:
+            error = self.measurement_table.rss(self.simulations, timepoints)
             """
             error = np.zeros(16)
 
@@ -183,6 +161,9 @@ class OptimizationProblem(Observable, SearchParam):
                 self.experiments[self.obs_names.index('Phosphorylated_cFos')]['HRG']
             )
             """
-            return np.sum(error)  # < 1e12
+            return error  # < 1e12
+        elif self._partial_error is not None and self._partial_error > self.error_bound:
+            # Simulation stopped early, the error is at least _partial_error (> error_bound)
+            return self._partial_error
         else:
             return 1e12
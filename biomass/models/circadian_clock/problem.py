@@ -1,11 +1,13 @@
 import numpy as np
 from scipy.spatial.distance import cosine
 
+from biomass.estimation import ResidualsMixin
+
 from .observable import Observable
 from .search_param import SearchParam
 
 
-class OptimizationProblem(Observable, SearchParam):
+class OptimizationProblem(Observable, SearchParam, ResidualsMixin):
     def __init__(self):
         super(OptimizationProblem, self).__init__()
 
@@ -52,54 +54,7 @@ class OptimizationProblem(Observable, SearchParam):
         else:
             raise ValueError("too many values to unpack (expected 2)")
 
-        self.set_data()
-
         if self.simulate(x, y0) is None:
-            error = np.zeros(len(self.obs_names))
-            for i, obs_name in enumerate(self.obs_names):
-                if self.experiments[i] is not None:
-                    error[i] = self._compute_objval_rss(
-                        *self._diff_sim_and_exp(
-                            self.simulations[i],
-                            self.experiments[i],
-                            self.get_timepoint(obs_name),
-                            self.conditions,
-                            sim_norm_max=(
-                                1
-                                if not self.normalization
-                                else (
-                                    np.max(
-                                        self.simulations[
-                                            self.obs_names.index(obs_name),
-                                            [
-                                                self.conditions.index(c)
-                                                for c in (
-                                                    self.normalization[obs_name]["condition"]
-                                                    if self.normalization[obs_name]["condition"]
-                                                    else self.conditions
-                                                )
-                                            ],
-                                            self.normalization[obs_name]["timepoint"],
-                                        ]
-                                    )
-                                    if self.normalization[obs_name]["timepoint"] is not None
-                                    else np.max(
-                                        self.simulations[
-                                            self.obs_names.index(obs_name),
-                                            [
-                                                self.conditions.index(c)
-                                                for c in (
-                                                    self.normalization[obs_name]["condition"]
-                                                    if self.normalization[obs_name]["condition"]
-                                                    else self.conditions
-                                                )
-                                            ],
-                                        ]
-                                    )
-                                )
-                            ),
-                        )
-                    )
-            return np.sum(error)  # < 1e12
+            return self.measurement_table.rss(self.simulations)  # < 1e12
         else:
             return 1e12
@@ -1,5 +1,6 @@
 import numpy as np
 
+from biomass.dynamics.perturbation import FluxScaling
 from biomass.dynamics.solver import solve_ode
 
 from .name2idx import C, V
@@ -55,7 +56,7 @@ class Observable(DifferentialEquation):
 
     def simulate(self, x, y0, _perturbation=None):
         if _perturbation is not None:
-            self.perturbation = _perturbation
+            self.perturbation = FluxScaling(_perturbation)
         # add ligand
         for i, condition in enumerate(self.conditions):
             if condition == "control":
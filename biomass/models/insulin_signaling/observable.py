@@ -1,5 +1,6 @@
 import numpy as np
 
+from biomass.dynamics.perturbation import FluxScaling
 from biomass.dynamics.solver import solve_ode
 
 from .name2idx import C, V
@@ -66,7 +67,7 @@ class Observable(DifferentialEquation):
 
     def simulate(self, x, y0, _perturbation={}):
         if _perturbation:
-            self.perturbation = _perturbation
+            self.perturbation = FluxScaling(_perturbation)
 
         y0[V.Ins] = 0.01  # 0.01 nM of insulin during starvation
         sol = solve_ode(self.diffeq, y0, range(2400 + 1), tuple(x))
@@ -2,6 +2,7 @@ from typing import Dict, List
 
 import numpy as np
 
+from biomass.dynamics.perturbation import FluxScaling
 from biomass.dynamics.solver import solve_ode
 
 from .name2idx import C, V
@@ -72,7 +73,7 @@ class Observable(DifferentialEquation):
 
     def simulate(self, x, y0, _perturbation=None):
         if _perturbation is not None:
-            self.perturbation = _perturbation
+            self.perturbation = FluxScaling(_perturbation)
 
         for i, condition in enumerate(self.conditions):
             if condition == "IL13_0":
@@ -1,3 +1,5 @@
+from biomass.dynamics.perturbation import FluxScaling
+
 from .name2idx import C, V
 from .reaction_network import ReactionNetwork
 
@@ -5,15 +7,14 @@ from .reaction_network import ReactionNetwork
 class DifferentialEquation(ReactionNetwork):
     def __init__(self, perturbation):
         super(DifferentialEquation, self).__init__()
-        self.perturbation = perturbation
+        self.perturbation = FluxScaling(perturbation)
 
     def diffeq(self, t, y, *x):
         """Kinetic equations"""
         v = self.flux(t, y, x)
 
         if self.perturbation:
-            for i, dv in self.perturbation.items():
-                v[i] = v[i] * dv
+            v = self.perturbation.apply(v)
 
         dydt = [0] * V.NUM
 
@@ -1,5 +1,6 @@
 import numpy as np
 
+from biomass.dynamics.perturbation import FluxScaling
 from biomass.dynamics.solver import solve_ode
 
 from .name2idx import C, V
@@ -168,7 +169,7 @@ class Observable(DifferentialEquation):
 
     def simulate(self, x, y0, _perturbation={}):
         if _perturbation:
-            self.perturbation = _perturbation
+            self.perturbation = FluxScaling(_perturbation)
 
         for gene_name in self.obs_names:
             x = self._set_gene_param(gene_name, x)
@@ -1,13 +1,16 @@
 import csv
 import os
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import List, Literal, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
 
+from .estimation.progress import FILENAME as PROGRESS_FILENAME
+from .estimation.progress import load_progress
+from .estimation.results_store import StoredResults
 from .model_object import ModelObject
 
 
@@ -27,6 +30,84 @@ class OptimizationResults(object):
             exist_ok=True,
         )
 
+    def _load(self) -> StoredResults:
+        """
+        Load the results of all parameter estimations, reading each run only once.
+        """
+        return self.model.results_store.get_many(sorted(self.model.get_executable()))
+
+    def _value_names(self) -> List[str]:
+        """
+        Names of estimated parameters and, if the species are named, initial conditions.
+        """
+        names = [self.model.parameters[i] for i in self.model.problem.idx_params]
+        if all([isinstance(_s, str) for _s in self.model.species]):
+            names.extend("init_" + self.model.species[i] for i in self.model.problem.idx_initials)
+        return names
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Return optimized parameters with one row per parameter set.
+
+        Returns
+        -------
+        df : ``pandas.DataFrame``
+            Indexed by ``x_id``, with columns ``generation``, ``best_fitness``
+            and the estimated values, named as in ``optimized_params.csv``.
+
+        Examples
+        --------
+        >>> from biomass import create_model, OptimizationResults
+        >>> from biomass.models import copy_to_current
+        >>> copy_to_current("Nakakuki_Cell_2010")
+        >>> model = create_model("Nakakuki_Cell_2010")
+        >>> res = OptimizationResults(model)
+        >>> df = res.to_dataframe()
+        """
+        results = self._load()
+        names = self._value_names()
+        df = pd.DataFrame(results.values[:, : len(names)], columns=names)
+        df.insert(0, "best_fitness", results.best_fitness)
+        df.insert(0, "generation", results.generation)
+        df.index = pd.Index(results.x_ids, name="x_id")
+        return df
+
+    def export(self, file_format: Literal["parquet", "feather"] = "parquet") -> None:
+        """
+        Save optimized parameters in a columnar file format, see :meth:`to_dataframe`.
+        Requires ``pyarrow``, installed by ``pip install biomass[columnar]``.
+
+        Parameters
+        ----------
+        file_format : Literal["parquet", "feather"] (default: "parquet")
+            File format.
+
+        Examples
+        --------
+        >>> from biomass import create_model, OptimizationResults
+        >>> from biomass.models import copy_to_current
+        >>> copy_to_current("Nakakuki_Cell_2010")
+        >>> model = create_model("Nakakuki_Cell_2010")
+        >>> res = OptimizationResults(model)
+        >>> res.export("feather")
+
+        Notes
+        -----
+        Output:
+
+        * optimization_results/optimized_params.parquet or .feather
+        """
+        if file_format not in ["parquet", "feather"]:
+            raise ValueError("file_format must be either 'parquet' or 'feather'.")
+        path = os.path.join(
+            self.model.path, "optimization_results", f"optimized_params.{file_format}"
+        )
+        df = self.to_dataframe()
+        if file_format == "parquet":
+            df.to_parquet(path)
+        else:
+            df.reset_index().to_feather(path)
+
     def to_csv(self) -> None:
         """
         Save optimized parameters as CSV file format.
@@ -46,56 +127,27 @@ class OptimizationResults(object):
 
         * optimization_results/optimized_params.csv
         """
-        n_file = self.model.get_executable()
-
         if len(self.model.problem.idx_params) + len(self.model.problem.idx_initials) > 0:
+            results = self._load()
+            names = self._value_names()
             optimized_params = np.empty(
                 (
                     len(self.model.problem.idx_params) + len(self.model.problem.idx_initials) + 2,
-                    len(n_file) + 1,
+                    len(results.x_ids) + 1,
                 ),
                 dtype=object,
             )
-            for j, nth_paramset in enumerate(sorted(n_file), start=1):
-                for i, parameter_index in enumerate(self.model.problem.idx_params):
-                    best_generation = np.load(
-                        os.path.join(
-                            self.model.path,
-                            "out",
-                            f"{nth_paramset:d}",
-                            "generation.npy",
-                        )
-                    )
-                    best_individual = np.load(
-                        os.path.join(
-                            self.model.path,
-                            "out",
-                            f"{nth_paramset:d}",
-                            f"fit_param{int(best_generation):d}.npy",
-                        )
-                    )
-                    error = np.load(
-                        os.path.join(
-                            self.model.path,
-                            "out",
-                            f"{nth_paramset:d}",
-                            "best_fitness.npy",
-                        )
-                    )
-                    optimized_params[0, 0] = ""
-                    optimized_params[1, 0] = "*Error*"
-                    optimized_params[0, j] = str(nth_paramset)
-                    optimized_params[1, j] = f"{error:8.3e}"
-                    optimized_params[i + 2, 0] = self.model.parameters[parameter_index]
-                    optimized_params[i + 2, j] = f"{best_individual[i]:8.3e}"
-                if all([isinstance(_s, str) for _s in self.model.species]):
-                    for i, species_index in enumerate(self.model.problem.idx_initials):
-                        optimized_params[i + len(self.model.problem.idx_params) + 2, 0] = (
-                            "init_" + self.model.species[species_index]
-                        )
-                        optimized_params[i + len(self.model.problem.idx_params) + 2, j] = (
-                            f"{best_individual[i+len(self.model.problem.idx_params)]:8.3e}"
-                        )
+            optimized_params[0, 0] = ""
+            optimized_params[1, 0] = "*Error*"
+            optimized_params[2 : len(names) + 2, 0] = names
+            for j, (nth_paramset, error, best_individual) in enumerate(
+                zip(results.x_ids, results.best_fitness, results.values), start=1
+            ):
+                optimized_params[0, j] = str(nth_paramset)
+                optimized_params[1, j] = f"{error:8.3e}"
+                optimized_params[2 : len(names) + 2, j] = [
+                    f"{value:8.3e}" for value in best_individual[: len(names)]
+                ]
             with open(
                 os.path.join(
                     self.model.path,
@@ -141,27 +193,11 @@ class OptimizationResults(object):
 
         * optimization_results/estimated_parameter_sets.pdf
         """
-        if not os.path.isfile(
-            os.path.join(
-                self.model.path,
-                "optimization_results",
-                "optimized_params.csv",
-            )
-        ):
-            self.to_csv()
         if boxplot_kws is None:
             boxplot_kws = {}
         boxplot_kws.setdefault("orient", "v")
 
-        df = pd.read_csv(
-            os.path.join(
-                self.model.path,
-                "optimization_results",
-                "optimized_params.csv",
-            ),
-            index_col=0,
-        )
-        df.drop("*Error*", inplace=True)
+        df = self.to_dataframe().drop(columns=["generation", "best_fitness"])
 
         if config is None:
             config = {}
@@ -170,7 +206,7 @@ class OptimizationResults(object):
         config.setdefault("savefig.bbox", "tight")
         config.setdefault("savefig.format", "pdf")
         plt.rcParams.update(config)
-        ax = sns.boxplot(data=df.T, **boxplot_kws)
+        ax = sns.boxplot(data=df, **boxplot_kws)
         if boxplot_kws["orient"] == "h":
             ax.set_xscale("log")
             ax.set_xlabel("Parameter value")
@@ -231,10 +267,10 @@ class OptimizationResults(object):
                 y0 = self.model.ival()
                 obj_val = self.model.problem.objective(None, x, y0)
                 writer.writerow(["original", f"{obj_val:8.3e}"])
-            n_file = self.model.get_executable()
-            for paramset in sorted(n_file):
-                optimized = self.model.load_param(paramset)
-                obj_val = self.model.problem.objective(None, *optimized)
+            results = self._load()
+            for paramset, best_individual in zip(results.x_ids, results.values):
+                x, y0 = self.model.problem.update(best_individual)
+                obj_val = self.model.problem.objective(None, x, y0)
                 writer.writerow([f"{paramset:d}", f"{obj_val:8.3e}"])
 
     def trace_obj(
@@ -252,6 +288,10 @@ class OptimizationResults(object):
         """
         Visualize objective function traces for different optimization runs.
 
+        Traces are read from ``out/x_id/progress.jsonl`` recorded by
+        :class:`~biomass.estimation.ProgressRecorder`, or parsed from
+        ``out/x_id/optimization.log`` for runs without the record.
+
         Parameters
         ----------
         config : dict, optional
@@ -265,11 +305,11 @@ class OptimizationResults(object):
         yticks: list, optional
             The list of ytick locations.
         message_head : str (default: "differential_evolution step")
-            Beginning of the progress status message.
+            Beginning of the progress status message in ``optimization.log``.
         sep : str (default: ":")
-            Suffix for iteration number.
+            Suffix for iteration number in ``optimization.log``.
         prefix : str (default: "=")
-            Prefix for objective function value.
+            Prefix for objective function value in ``optimization.log``.
 
         Examples
         --------
@@ -303,10 +343,12 @@ class OptimizationResults(object):
         plt.gca().spines["top"].set_visible(False)
         # ---
         for paramset in n_file:
-            with open(
-                os.path.join(self.model.path, "out", f"{paramset:d}", "optimization.log"),
-                mode="r",
-            ) as f:
+            savedir = os.path.join(self.model.path, "out", f"{paramset:d}")
+            if os.path.isfile(os.path.join(savedir, PROGRESS_FILENAME)):
+                progress = load_progress(savedir)
+                plt.plot(progress["nit"] - 1, progress["fun"])
+                continue
+            with open(os.path.join(savedir, "optimization.log"), mode="r") as f:
                 traces = f.readlines()
             iters = []
             obj_val = []
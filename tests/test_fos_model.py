@@ -6,9 +6,10 @@ from typing import Final, Optional
 
 import numpy as np
 import pytest
+from scipy.optimize import differential_evolution
 
 from biomass import OptimizationResults, create_model, optimize, run_analysis, run_simulation
-from biomass.estimation import InitialPopulation
+from biomass.estimation import InitialPopulation, Optimizer, migrate_results
 from biomass.models import copy_to_current
 
 MODEL_NAME: Final[str] = "Nakakuki_Cell_2010"
@@ -26,6 +27,26 @@ def test_initialization():
     )
 
 
+def test_migrate_results():
+    x_ids = list(range(1, 11))
+    assert model.get_executable() == x_ids
+    legacy = [model.get_individual(x_id) for x_id in x_ids]
+    legacy_bulk = model.results_store.get_many()
+    best_fitness = np.load(os.path.join(model.path, "out", "1", "best_fitness.npy"))
+    assert migrate_results(model.path) == x_ids
+    assert migrate_results(model.path, remove_legacy=True) == []
+    assert not os.path.isfile(os.path.join(model.path, "out", "1", "generation.npy"))
+    assert model.results_store.x_ids(include_legacy=False) == model.get_executable() == x_ids
+    for x_id, values in zip(x_ids, legacy):
+        assert np.array_equal(model.get_individual(x_id), values)
+    assert model.results_store.get(1).best_fitness == best_fitness
+    bulk = model.results_store.get_many()
+    assert np.array_equal(bulk.x_ids, x_ids)
+    assert np.array_equal(bulk.values, legacy_bulk.values)
+    assert np.array_equal(bulk.values, np.array(legacy))
+    assert np.array_equal(bulk.best_fitness, legacy_bulk.best_fitness)
+
+
 def test_run_simulation():
     assert run_simulation(model, viz_type="experiment") is None
     with pytest.warns(RuntimeWarning) as record:
@@ -50,6 +71,67 @@ def test_run_simulation():
         )
 
 
+def test_sparse_output():
+    x, y0 = model.load_param(1)
+    full = model.problem.objective(None, x, y0)
+    model.problem.sparse_output = True
+    timepoints = model.problem.get_evaluation_timepoints()
+    sparse = model.problem.objective(None, x, y0)
+    assert model.problem.simulations.shape[-1] == len(timepoints) < len(model.problem.t)
+    assert np.isclose(sparse, full, rtol=0.1)
+    model.problem.sparse_output = False
+    assert model.problem.simulate(x, y0) is None
+    assert model.problem.simulations.shape[-1] == len(model.problem.t)
+
+
+def test_measurement_table():
+    x, y0 = model.load_param(1)
+    assert model.problem.simulate(x, y0) is None
+    simulations = model.problem.simulations
+    table = model.problem.measurement_table
+    expected = []
+    for i, obs_name in enumerate(model.observables):
+        if model.problem.experiments[i] is not None:
+            sim_val, exp_val = model.problem._diff_sim_and_exp(
+                simulations[i],
+                model.problem.experiments[i],
+                model.problem.get_timepoint(obs_name),
+                model.problem.conditions,
+                sim_norm_max=np.max(simulations[i]),
+            )
+            expected.append(sim_val - exp_val)
+    residuals = table.residuals(simulations)
+    assert len(table) == len(residuals)
+    assert np.allclose(residuals, np.concatenate(expected))
+    assert np.isclose(table.rss(simulations), model.problem.objective(None, x, y0))
+    sigma = np.where(np.isfinite(table.sigma) & (table.sigma > 0), table.sigma, 1)
+    assert np.isclose(table.rss(simulations, weighted=True), np.sum((residuals / sigma) ** 2))
+
+
+def test_error_bound():
+    x, y0 = model.load_param(1)
+    full = model.problem.objective(None, x, y0)
+    table = model.problem.measurement_table
+    partial = table.lower_bound(model.problem.simulations, 1)
+    assert table.lower_bound(model.problem.simulations, 0) == 0
+    assert 0 < partial < full
+    assert np.isclose(
+        table.lower_bound(model.problem.simulations, len(model.problem.conditions)), full
+    )
+    model.problem.error_bound = partial / 2
+    try:
+        aborted = model.problem.objective(None, x, y0)
+        assert np.isclose(aborted, partial)
+        # An aborted trial vector never beats its target vector, whose error is <= error_bound
+        assert model.problem.error_bound < aborted <= full
+        model.problem.error_bound = full * 2
+        assert np.isclose(model.problem.objective(None, x, y0), full)
+    finally:
+        model.problem.error_bound = None
+    with pytest.raises(ValueError):
+        Optimizer(model, differential_evolution, 1, early_abort=0.5)
+
+
 def test_save_resuts():
     res = OptimizationResults(model)
     res.savefig(figsize=(16, 5), boxplot_kws={"orient": "v"})
@@ -85,6 +167,23 @@ def test_run_analysis():
                     )
 
 
+def test_steady_state_cache():
+    cache = model.problem.steady_state_cache
+    cache.clear()
+    run_analysis(
+        model,
+        target="parameter",
+        metric="integral",
+        options={
+            "excluded_params": [p for p in model.parameters if p not in ["HRG", "no_ligand"]],
+            "overwrite": True,
+        },
+    )
+    # Perturbing HRG does not change the steady state without ligand
+    assert cache.hits == len(model.get_executable())
+    assert cache.misses == 2 * len(model.get_executable())
+
+
 def test_param_estim(n_proc: Optional[int] = None):
     if n_proc is None:
         n_proc = max(1, multiprocessing.cpu_count())
@@ -1,9 +1,40 @@
+import functools
+import multiprocessing
 import os
 import shutil
+import time
 
 import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import OptimizeResult, differential_evolution
 
-from biomass import OptimizationResults, create_model, optimize, run_analysis, run_simulation
+from biomass import (
+    OptimizationResults,
+    create_model,
+    optimize,
+    optimize_many,
+    run_analysis,
+    run_global_analysis,
+    run_simulation,
+)
+from biomass.analysis import InitialConditionSensitivity, TrajectoryStore, axis_aware
+from biomass.dynamics.ensemble import simulate_batch
+from biomass.dynamics.perturbation import FluxScaling
+from biomass.dynamics.signaling_systems import SignalingSystems
+from biomass.dynamics.solver import (
+    EnsembleNotSupported,
+    solve_forward_sensitivity,
+    solve_ode,
+    tolerance,
+)
+from biomass.dynamics.temporal_dynamics import _init_worker
+from biomass.estimation import (
+    MultiFidelityObjective,
+    Optimizer,
+    VectorizedObjective,
+    load_progress,
+)
 from biomass.models import copy_to_current
 
 MODEL_NAME: str = "mapk_cascade"
@@ -19,6 +50,189 @@ def test_simulate_successful():
     assert model.problem.simulate(x, y0) is None
 
 
+def test_search_space():
+    region = model.problem.get_region()
+    population = np.random.default_rng(0).random((4, region.shape[1]))
+    values = model.gene2val(population)
+    assert values.shape == population.shape
+    assert np.allclose(values, 10 ** (population * (region[1] - region[0]) + region[0]))
+    assert np.allclose(model.gene2val(population[0]), values[0])
+    search_space = model.search_space
+    assert model.search_space is search_space
+    idx = model.problem.idx_params.pop()
+    try:
+        assert len(model.search_space) == len(search_space) - 1
+    finally:
+        model.problem.idx_params.append(idx)
+    assert len(model.search_space) == len(search_space)
+
+
+def test_simulate_batch():
+    rng = np.random.default_rng(0)
+    X = np.array(model.pval()) * rng.lognormal(0, 0.1, (5, len(model.parameters)))
+    simulations, success = simulate_batch(model.problem, X, model.ival(), batch_size=4)
+    assert simulations.shape == (5, len(model.observables), 1, len(model.problem.t))
+    assert success.all()
+    for i in range(5):
+        assert model.problem.simulate(X[i].tolist(), model.ival()) is None
+        assert np.allclose(simulations[i], model.problem.simulations, rtol=1e-4, atol=1e-8)
+
+
+def test_simulate_batch_fallback():
+    X = np.tile(model.pval(), (3, 1))
+    simulate = model.problem.simulate
+
+    def serial_only(x, y0):
+        if np.ndim(x[0]) > 0:
+            raise EnsembleNotSupported
+        return simulate(x, y0)
+
+    try:
+        model.problem.simulate = serial_only
+        with pytest.warns(UserWarning, match="one parameter set at a time"):
+            _, success = simulate_batch(model.problem, X, model.ival())
+        assert success.all()
+        # Errors in a model are not mistaken for a lack of ensemble support
+        model.problem.simulate = lambda x, y0: {}["undefined"]
+        with pytest.raises(KeyError):
+            simulate_batch(model.problem, X, model.ival())
+    finally:
+        del model.problem.simulate
+
+
+def test_flux_scaling():
+    x = model.pval()
+    y0 = model.ival()
+    compiled = create_model(MODEL_NAME)
+    assert compiled.compile()
+    desired = []
+    for m in [model, compiled]:
+        scaling = m.problem.perturbation
+        assert isinstance(scaling, FluxScaling) and not scaling
+        assert m.problem.simulate(x, y0) is None
+        unperturbed = m.problem.simulations.copy()
+        assert m.problem.simulate(x, y0, {2: 1.5}) is None
+        desired.append(m.problem.simulations.copy())
+        assert not np.allclose(desired[-1], unperturbed)
+        # Factors changed in place are applied to the next simulation
+        scaling = m.problem.perturbation
+        del scaling[2]
+        assert m.problem.simulate(x, y0) is None
+        assert np.allclose(m.problem.simulations, unperturbed)
+        scaling[2] = 1.5
+        assert m.problem.simulate(x, y0) is None
+        assert np.allclose(m.problem.simulations, desired[-1])
+        scaling.reset()
+    assert np.allclose(*desired, rtol=1e-4, atol=1e-8)
+
+
+def test_forward_sensitivity():
+    x = np.array(model.pval(), dtype=float)
+    y0 = np.array(model.ival(), dtype=float)
+    t = range(0, 1001, 10)
+    sol = solve_forward_sensitivity(
+        model.problem.diffeq, y0, t, tuple(x), param_indices=[0, 3], species_indices=[0]
+    )
+    assert sol.sensitivities.shape == (3, len(y0), len(t))
+    assert np.allclose(sol.y, solve_ode(model.problem.diffeq, y0, t, tuple(x)).y, atol=1e-6)
+    rate = 1e-4
+    for k, idx in enumerate([0, 3]):
+        x_up, x_down = x.copy(), x.copy()
+        x_up[idx] *= 1 + rate
+        x_down[idx] *= 1 - rate
+        finite_difference = (
+            solve_ode(model.problem.diffeq, y0, t, tuple(x_up)).y
+            - solve_ode(model.problem.diffeq, y0, t, tuple(x_down)).y
+        ) / (2 * rate * x[idx])
+        assert np.allclose(
+            sol.sensitivities[k], finite_difference, atol=1e-2 * np.abs(finite_difference).max()
+        )
+    y0_up, y0_down = y0.copy(), y0.copy()
+    y0_up[0] *= 1 + rate
+    y0_down[0] *= 1 - rate
+    finite_difference = (
+        solve_ode(model.problem.diffeq, y0_up, t, tuple(x)).y
+        - solve_ode(model.problem.diffeq, y0_down, t, tuple(x)).y
+    ) / (2 * rate * y0[0])
+    assert np.allclose(
+        sol.sensitivities[2], finite_difference, atol=1e-2 * np.abs(finite_difference).max()
+    )
+    # (∂f/∂y) s with the analytic Jacobian of the compiled model
+    compiled = create_model(MODEL_NAME)
+    assert compiled.compile() and compiled.problem.diffeq.has_jacobian
+    analytic = solve_forward_sensitivity(
+        compiled.problem.diffeq, y0, t, tuple(x), param_indices=[0, 3], species_indices=[0]
+    )
+    assert np.allclose(
+        analytic.sensitivities, sol.sensitivities, atol=1e-6 * np.abs(sol.sensitivities).max()
+    )
+    with tolerance(1e-4, 1e-6):
+        coarse = solve_forward_sensitivity(
+            model.problem.diffeq, y0, t, tuple(x), param_indices=[0, 3], species_indices=[0]
+        )
+    assert coarse.nfev < sol.nfev
+
+
+def test_residuals_and_refine():
+    rng = np.random.default_rng(0)
+    indiv_gene = rng.uniform(0.4, 0.6, len(model.problem.bounds))
+    residuals = model.problem.residuals(model.gene2val(indiv_gene))
+    assert np.isclose(np.sum(residuals**2), model.get_obj_val(indiv_gene))
+    optimizer = Optimizer(model, differential_evolution, 99)
+    try:
+        refined = optimizer.refine(indiv_gene, max_nfev=3)
+    finally:
+        for dirname in ["99", "_tmp99"]:
+            shutil.rmtree(os.path.join(model.path, "out", dirname), ignore_errors=True)
+    assert refined.shape == indiv_gene.shape
+    assert np.all((0 <= refined) & (refined <= 1))
+    assert model.get_obj_val(refined) < model.get_obj_val(indiv_gene)
+
+
+def test_vectorized_objective():
+    rng = np.random.default_rng(0)
+    population = rng.uniform(0.4, 0.6, (len(model.problem.bounds), 6))
+    obj_val = [model.get_obj_val(indiv_gene) for indiv_gene in population.T]
+    for n_workers in [1, 2]:
+        with VectorizedObjective(model, n_workers=n_workers, batch_size=4) as obj_fun:
+            assert np.allclose(obj_fun(population), obj_val, rtol=1e-4)
+            assert np.isclose(obj_fun(population[:, 0]), obj_val[0], rtol=1e-4)
+    # Objective functions edited in problem.py are respected
+    objective = type(model.problem).objective
+    try:
+        type(model.problem).objective = lambda self, indiv, *args: 2 * objective(
+            self, indiv, *args
+        )
+        with VectorizedObjective(model, batch_size=4) as obj_fun:
+            assert np.allclose(obj_fun(population), 2 * np.array(obj_val), rtol=1e-4)
+    finally:
+        type(model.problem).objective = objective
+
+
+def test_multi_fidelity_objective():
+    rng = np.random.default_rng(0)
+    indiv_gene = rng.uniform(0.4, 0.6, len(model.problem.bounds))
+    obj_fun = MultiFidelityObjective(model, rtol=1e-4, atol=1e-6, factor=2.0)
+    full = model.get_obj_val(indiv_gene)
+    coarse = obj_fun.evaluate_coarse(indiv_gene)
+    assert coarse != full
+    assert np.isclose(coarse, full, rtol=1e-2)
+    assert obj_fun(indiv_gene) == full
+    obj_fun.bound = coarse / 3
+    assert obj_fun(indiv_gene) == coarse
+    obj_fun.bound = coarse
+    assert obj_fun(indiv_gene) == full
+    obj_fun.update(
+        OptimizeResult(x=indiv_gene, fun=full, population_energies=np.array([full, 2 * full]))
+    )
+    assert obj_fun.bound == full
+    assert (obj_fun.rtol, obj_fun.atol) == (1e-4, 1e-6)
+    obj_fun.update(
+        OptimizeResult(x=indiv_gene, fun=coarse / 3, population_energies=np.array([coarse / 3]))
+    )
+    assert np.isclose(obj_fun.rtol, 1e-5) and np.isclose(obj_fun.atol, 1e-7)
+
+
 def test_optimize():
     for x_id in range(1, 4):
         optimize(model, x_id=x_id, optimizer_options={"maxiter": 5, "workers": -1})
@@ -33,6 +247,107 @@ def test_optimize():
         ) as f:
             logs = f.readlines()
         assert logs[-1].startswith("differential_evolution step 5: ")
+        progress = load_progress(os.path.join(model.path, "out", f"{paramset:d}"))
+        assert progress["nit"].tolist() == [1, 2, 3, 4, 5]
+        assert float(logs[-1].split("=")[-1]) == progress["fun"][-1]
+        assert np.all(np.diff(progress["nfev"]) > 0)
+        assert model.results_store.get(paramset).generation == 5
+
+
+def test_optimize_many():
+    summaries = optimize_many(model, range(1, 6), n_workers=2, optimizer_options={"maxiter": 3})
+    assert [summary.x_id for summary in summaries] == [1, 2, 3, 4, 5]
+    assert [summary.status for summary in summaries] == ["skipped"] * 3 + ["finished"] * 2
+    for summary in summaries[3:]:
+        assert summary.nit == 3
+        assert summary.nfev > 0
+        assert summary.fun == model.results_store.get(summary.x_id).best_fitness
+    assert sorted(model.get_executable()) == [1, 2, 3, 4, 5]
+
+
+def test_optimize_many_time_limit():
+    n_calls = []
+
+    def wait(intermediate_result):
+        n_calls.append(intermediate_result.nit)
+        time.sleep(1)
+
+    x_id = 97
+    try:
+        (summary,) = optimize_many(
+            model, [x_id], time_limit=0.5, optimizer_options={"maxiter": 3, "callback": wait}
+        )
+    finally:
+        shutil.rmtree(os.path.join(model.path, "out", f"{x_id:d}"))
+        model.results_store.remove(x_id)
+    assert n_calls == [1]
+    assert summary.status == "stopped (budget)"
+    assert summary.nit == 1
+
+
+def test_resume_optimization():
+    class Interrupt(Exception):
+        pass
+
+    def interrupt(xk, convergence):
+        raise Interrupt
+
+    x_id = 99
+    try:
+        optimize(
+            model,
+            x_id=x_id,
+            checkpoint_every=1,
+            optimizer_options={"maxiter": 3, "callback": interrupt, "seed": 0},
+        )
+    except Interrupt:
+        pass
+    savedir = os.path.join(model.path, "out", f"{x_id:d}")
+    try:
+        assert os.listdir(savedir) == ["checkpoint.npz"]
+        with np.load(os.path.join(savedir, "checkpoint.npz")) as checkpoint:
+            assert int(checkpoint["nit"]) == 1
+        optimize(
+            model,
+            x_id=x_id,
+            checkpoint_every=1,
+            resume=True,
+            optimizer_options={"maxiter": 3, "seed": 0},
+        )
+        assert not os.path.isfile(os.path.join(savedir, "checkpoint.npz"))
+        assert model.results_store.get(x_id).generation == 3
+        with open(os.path.join(savedir, "optimization.log")) as f:
+            logs = f.readlines()
+        assert [log.split(":")[0] for log in logs] == [
+            f"differential_evolution step {i:d}" for i in range(1, 4)
+        ]
+        progress = load_progress(savedir)
+        assert progress["nit"].tolist() == [1, 2, 3]
+        assert np.all(np.diff(progress["nfev"]) > 0)
+        assert np.all(np.diff(progress["elapsed"]) > 0)
+    finally:
+        shutil.rmtree(savedir)
+        model.results_store.remove(x_id)
+
+
+def test_checkpoint_seed():
+    x_id = 98
+    best_fitness = []
+    try:
+        for checkpoint_every in [None, 1]:
+            optimize(
+                model,
+                x_id=x_id,
+                overwrite=True,
+                checkpoint_every=checkpoint_every,
+                optimizer_options={"maxiter": 2, "seed": 0},
+            )
+            best_fitness.append(model.results_store.get(x_id).best_fitness)
+    finally:
+        shutil.rmtree(os.path.join(model.path, "out", f"{x_id:d}"))
+        model.results_store.remove(x_id)
+    # An integer seed gives the same optimization with or without checkpoints
+    assert best_fitness[0] == best_fitness[1]
 
 
 def test_run_simulation():
@@ -59,8 +374,38 @@ def test_run_simulation():
             )
 
 
+def test_run_simulation_in_parallel():
+    path = os.path.join(model.path, "simulation_data", "simulations_all.npy")
+    figure_path = os.path.join(model.path, "figure", "simulation", "average")
+    shutil.rmtree(figure_path, ignore_errors=True)
+    run_simulation(model, viz_type="average", figures=False)
+    assert not os.path.isdir(figure_path)
+    desired = np.load(path)
+    run_simulation(model, viz_type="average", show_all=True, stdev=True, n_proc=2)
+    assert np.array_equal(np.load(path), desired, equal_nan=True)
+    for obs_name in model.observables:
+        assert os.path.isfile(os.path.join(figure_path, f"{obs_name}.png"))
+    # Batches simulated in workers are the same as in a single process
+    systems = SignalingSystems(model)
+    X = np.tile(model.pval(), (3, 1))
+    Y0 = np.tile(model.ival(), (3, 1))
+    with multiprocessing.Pool(
+        2, _init_worker, (model.path.replace(os.sep, "."), model.is_compiled, SignalingSystems)
+    ) as pool:
+        simulations, success = systems._simulate_paramsets(X, Y0, pool, batch_size=2)
+    desired = systems._simulate_batch(X, Y0, 2)
+    assert np.array_equal(simulations, desired[0], equal_nan=True)
+    assert np.array_equal(success, desired[1])
+
+
 def test_save_result():
     res = OptimizationResults(model)
+    df = res.to_dataframe()
+    assert df.index.tolist() == model.get_executable()
+    for x_id in df.index:
+        result = model.results_store.get(x_id)
+        assert df.loc[x_id, "best_fitness"] == result.best_fitness
+        assert np.array_equal(df.loc[x_id].iloc[2:].to_numpy(dtype=float), result.values)
     res.to_csv()
     assert os.path.isfile(
         os.path.join(
@@ -95,6 +440,20 @@ def test_save_result():
     )
 
 
+def test_export_result():
+    pytest.importorskip("pyarrow")
+    res = OptimizationResults(model)
+    for file_format in ["parquet", "feather"]:
+        res.export(file_format)
+        assert os.path.isfile(
+            os.path.join(model.path, "optimization_results", f"optimized_params.{file_format}")
+        )
+    df = pd.read_parquet(
+        os.path.join(model.path, "optimization_results", "optimized_params.parquet")
+    )
+    assert df.equals(res.to_dataframe())
+
+
 def _get_duration(
     time_course: np.ndarray,
     below_threshold: float = 0.5,
@@ -161,5 +520,138 @@ def test_sensitivity_analysis():
             assert np.isfinite(sensitivity_coefficients).all()
 
 
+def test_parallel_sensitivity_analysis():
+    for target in ["initial_condition", "reaction"]:
+        sensitivity_coefficients = []
+        for n_proc in [1, 2]:
+            run_analysis(
+                model,
+                target=target,
+                metric="argmax",
+                create_metrics={"argmax": np.argmax},
+                show_progress=False,
+                n_proc=n_proc,
+            )
+            sensitivity_coefficients.append(
+                np.load(os.path.join(model.path, "sensitivity_coefficients", target, "argmax.npy"))
+            )
+        assert np.array_equal(*sensitivity_coefficients, equal_nan=True)
+
+
+def test_incremental_sensitivity_analysis(monkeypatch):
+    path = os.path.join(model.path, "sensitivity_coefficients", "initial_condition")
+    run_analysis(model, target="initial_condition", metric="maximum", show_progress=False)
+    desired = np.load(os.path.join(path, "maximum.npy"))
+    assert os.path.isfile(os.path.join(path, "signaling_metric", "maximum.npz"))
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("Cached signaling metrics were simulated again.")
+
+    # Every signaling metric is reused, even if targets are excluded
+    monkeypatch.setattr(InitialConditionSensitivity, "_simulate", _fail)
+    nonzero_species = [name for name, val in zip(model.species, model.ival()) if val != 0.0]
+    for excluded_initials, columns in [([], slice(None)), (nonzero_species[:1], slice(1, None))]:
+        run_analysis(
+            model,
+            target="initial_condition",
+            metric="maximum",
+            show_progress=False,
+            options={"excluded_initials": excluded_initials, "overwrite": False},
+        )
+        actual = np.load(os.path.join(path, "maximum.npy"))
+        assert np.array_equal(actual, desired[:, columns], equal_nan=True)
+
+
+def test_trajectory_store(monkeypatch):
+    path = os.path.join(model.path, "sensitivity_coefficients", "initial_condition")
+    run_analysis(
+        model,
+        target="initial_condition",
+        metric="maximum",
+        show_progress=False,
+        options={"trajectories": True},
+    )
+    store = TrajectoryStore(os.path.join(path, "trajectories"))
+    assert np.all(store.load("done"))
+    n_indices = len(store.indices)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("Stored simulations were simulated again.")
+
+    # Another metric is quantified from the stored simulations
+    monkeypatch.setattr(InitialConditionSensitivity, "_simulate", _fail)
+    run_analysis(
+        model,
+        target="initial_condition",
+        metric="amplitude",
+        create_metrics={"amplitude": lambda y: np.max(y) - np.min(y)},
+        show_progress=False,
+        options={"trajectories": True, "overwrite": False},
+    )
+    assert np.load(os.path.join(path, "amplitude.npy")).shape[1] == n_indices
+    curves = store.sensitivity_curves()
+    assert curves.shape == (
+        len(store.paramsets),
+        n_indices,
+        len(model.observables),
+        len(model.problem.conditions),
+        len(model.problem.t),
+    )
+
+
+def test_axis_aware_metrics():
+    analysis = InitialConditionSensitivity(
+        model,
+        {
+            "argmax": axis_aware(functools.partial(np.argmax)),
+            "amplitude": lambda y: np.max(y) - np.min(y),
+        },
+    )
+    simulations, success = simulate_batch(
+        model.problem, np.tile(model.pval(), (3, 1)), model.ival()
+    )
+    success[1] = False
+    for metric in ["maximum", "minimum", "integral", "argmax", "amplitude"]:
+        values = analysis._quantify(metric, simulations, success)
+        assert np.all(np.isnan(values[1]))
+        for j in [0, 2]:
+            for k, _ in enumerate(model.observables):
+                for l, _ in enumerate(model.problem.conditions):
+                    assert np.isclose(
+                        values[j, k, l],
+                        analysis.quantification[metric](simulations[j, k, l]),
+                        rtol=1e-12,
+                    )
+
+
+def test_global_sensitivity_analysis():
+    n_varied = len(model.problem.idx_params) + len(model.problem.idx_initials)
+    shape = (n_varied, len(model.observables), len(model.problem.conditions))
+    morris = run_global_analysis(
+        model, method="morris", n_samples=4, n_bootstrap=50, seed=0, show_progress=False
+    )
+    assert len(morris.names) == n_varied
+    assert morris.mu_star.shape == morris.sigma.shape == shape
+    assert morris.mu_star_ci.shape == (2, *shape)
+    assert np.all(morris.mu_star >= np.abs(morris.mu) - 1e-12)
+
+    kwargs = dict(method="sobol", n_samples=8, n_bootstrap=50, seed=0, show_progress=False)
+    sobol = run_global_analysis(model, **kwargs)
+    assert sobol.first_order.shape == sobol.total.shape == shape
+    assert np.all(sobol.total_ci[0] <= sobol.total_ci[1])
+    # Resume an interrupted analysis
+    path = os.path.join(model.path, "sensitivity_coefficients", "global", "sobol")
+    done = np.load(os.path.join(path, "signaling_metric", "integral.done.npy"), mmap_mode="r+")
+    assert done.shape == ((n_varied + 2) * 8,) and done.all()
+    done[len(done) // 2 :] = False
+    done.flush()
+    del done
+    resumed = run_global_analysis(model, **kwargs)
+    for actual, desired in zip(resumed[1:], sobol[1:]):
+        assert np.allclose(actual, desired, equal_nan=True)
+    with pytest.raises(ValueError):
+        run_global_analysis(model, **dict(kwargs, n_samples=16))
+
+
 def test_cleanup():
     shutil.rmtree(MODEL_NAME)
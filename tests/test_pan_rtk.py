@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from biomass import create_model, run_simulation
+from biomass.dynamics.solver import SteadyStateCache, get_steady_state
 from biomass.models import copy_to_current
 
 MODEL_NAME: str = "pan_rtk"
@@ -20,6 +21,50 @@ def test_simulate_successful():
     assert model.problem.simulate(x, y0) is None
 
 
+def test_compile():
+    compiled = create_model(MODEL_NAME)
+    assert compiled.compile()
+    assert compiled.is_compiled
+    x = compiled.pval()
+    y0 = compiled.ival()
+    assert compiled.problem.simulate(x, y0) is None
+    assert model.problem.simulate(x, y0) is None
+    assert np.allclose(compiled.problem.simulations, model.problem.simulations, atol=1e-6)
+
+
+def test_get_steady_state():
+    x = model.pval()
+    y0 = model.ival()
+    newton = get_steady_state(model.problem.diffeq, y0, tuple(x), method="newton")
+    integrate = get_steady_state(model.problem.diffeq, y0, tuple(x))
+    assert len(newton) == len(integrate) == len(y0)
+    assert np.all(np.array(newton) >= 0)
+    dydt = np.array(model.problem.diffeq(0, newton, *x))
+    assert np.allclose(np.array(newton) + dydt, newton, rtol=1e-3)
+    assert np.allclose(newton, integrate, rtol=1e-3, atol=1e-6)
+
+
+def test_steady_state_cache():
+    x = model.pval()
+    y0 = model.ival()
+    cache = SteadyStateCache(maxsize=2, warm_start=True)
+    first = get_steady_state(model.problem.diffeq, y0, tuple(x), cache=cache)
+    second = get_steady_state(model.problem.diffeq, y0, tuple(x), cache=cache)
+    assert first == second
+    assert (cache.hits, cache.misses) == (1, 1)
+    for scale in [1.01, 1.02]:
+        x_scaled = tuple(np.array(x) * scale)
+        warm = get_steady_state(model.problem.diffeq, y0, x_scaled, method="newton", cache=cache)
+        cold = get_steady_state(model.problem.diffeq, y0, x_scaled, method="newton")
+        assert np.allclose(warm, cold, rtol=1e-2, atol=1e-4)
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert len(cache) == 2
+    get_steady_state(model.problem.diffeq, y0, tuple(x), cache=cache)
+    assert cache.misses == 4
+    cache.clear()
+    assert len(cache) == cache.hits == cache.misses == 0
+
+
 def test_run_simulation():
     assert run_simulation(model) is None
     res = np.load(os.path.join(model.path, "simulation_data", "simulations_original.npy"))
@@ -111,6 +111,31 @@ def test_run_simulation():
         print(e)
 
 
+def test_jacobian():
+    try:
+        from .text_files import Kholodenko1999
+
+        model = Model(".".join(["tests.test_text2model.text_files", "Kholodenko1999"])).create()
+        x = model.pval()
+        y = np.array(model.ival()) + 1.0
+        jac = model.problem.jacobian(0.0, y, *x)
+        assert jac.shape == (len(model.species), len(model.species))
+        approx = np.zeros_like(jac)
+        for j in range(len(y)):
+            h = 1e-6 * max(1.0, abs(y[j]))
+            e = np.zeros_like(y)
+            e[j] = h
+            approx[:, j] = (
+                np.array(model.problem.diffeq(0.0, y + e, *x))
+                - np.array(model.problem.diffeq(0.0, y - e, *x))
+            ) / (2 * h)
+        assert np.allclose(jac, approx, rtol=1e-4, atol=1e-6)
+        sparsity = model.problem.jac_sparsity()
+        assert np.all(sparsity[jac != 0])
+    except ImportError as e:
+        print(e)
+
+
 def test_text2markdown():
     for model in ["michaelis_menten", "Kholodenko1999"]:
         if model == "michaelis_menten":